@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import os
+
+import dotenv
+from web3 import AsyncWeb3
+
+from configuration.config import get_config
+from configuration.types import Configuration
+from observer.backfill import backfill, make_web3
+
+
+async def block_range_to_rounds(
+    w: AsyncWeb3, config: Configuration, from_block: int, to_block: int
+) -> tuple[int, int]:
+    vef = config.epoch.voting_epoch_factory
+
+    start = await w.eth.get_block(from_block)
+    end = await w.eth.get_block(to_block)
+    assert "timestamp" in start
+    assert "timestamp" in end
+
+    return (
+        vef.from_timestamp(start["timestamp"]).id,
+        vef.from_timestamp(end["timestamp"]).id + 1,
+    )
+
+
+async def run(config: Configuration, args: argparse.Namespace) -> None:
+    if args.from_block is not None:
+        start_round, end_round = await block_range_to_rounds(
+            make_web3(config), config, args.from_block, args.to_block
+        )
+    else:
+        start_round, end_round = args.from_epoch, args.to_epoch + 1
+
+    await backfill(
+        config,
+        start_round,
+        end_round,
+        shard_size=args.shard_size,
+        workers=args.workers,
+        concurrency=args.concurrency,
+        block_range=args.block_range,
+        log_range=args.log_range,
+        notify=args.notify,
+    )
+
+
+def main(config: Configuration, args: argparse.Namespace):
+    asyncio.run(run(config, args))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Validate past voting rounds of the configured identity."
+    )
+
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--from-epoch", type=int, help="first voting epoch")
+    group.add_argument("--from-block", type=int, help="first block")
+    parser.add_argument("--to-epoch", type=int, help="last voting epoch (inclusive)")
+    parser.add_argument("--to-block", type=int, help="last block (inclusive)")
+
+    parser.add_argument(
+        "--shard-size", type=int, default=40, help="voting epochs per shard"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="worker processes"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=16, help="concurrent requests per worker"
+    )
+    parser.add_argument(
+        "--block-range", type=int, default=500, help="blocks fetched per chunk"
+    )
+    parser.add_argument(
+        "--log-range", type=int, default=30, help="blocks per eth_getLogs request"
+    )
+    parser.add_argument(
+        "--notify", action="store_true", help="send notifications for issues"
+    )
+
+    args = parser.parse_args()
+    if args.from_epoch is not None and args.to_epoch is None:
+        parser.error("--to-epoch is required with --from-epoch")
+    if args.from_block is not None and args.to_block is None:
+        parser.error("--to-block is required with --from-block")
+
+    dotenv.load_dotenv()
+    config = get_config()
+    main(config, args)
@@ -0,0 +1,251 @@
+import random
+from typing import Self
+
+from attrs import define
+from eth_typing import ChecksumAddress
+from eth_utils.crypto import keccak
+from hexbytes import HexBytes
+from py_flare_common.fsp.messaging import (
+    parse_submit1_tx,
+    parse_submit2_tx,
+    parse_submit_signature_tx,
+)
+from web3.datastructures import AttributeDict
+from web3.types import BlockData, TxData
+
+from configuration.config import ChainId
+from configuration.types import Configuration
+from observer.registry import get_target_function_signatures
+from observer.reward_epoch_manager import (
+    Entity,
+    SigningPolicy,
+    SigningPolicyBuilder,
+    VotingRound,
+    WTxData,
+)
+from observer.types import (
+    ProtocolMessageRelayed,
+    RandomAcquisitionStarted,
+    SigningPolicyInitialized,
+    VotePowerBlockSelected,
+    VoterRegistered,
+    VoterRegistrationInfo,
+)
+from replay.encoding import (
+    encode_call,
+    encode_fdc_submit2,
+    encode_ftso_submit2,
+    encode_payload,
+    encode_submit_signatures,
+    ftso_commit,
+    sign_hash,
+)
+from replay.synthetic import Voter, make_config
+
+
+def signing_policy_builder(
+    config: Configuration, reward_epoch_id: int, voters: list[Voter]
+) -> SigningPolicyBuilder:
+    reward_epoch = config.epoch.reward_epoch(reward_epoch_id)
+    builder = SigningPolicy.builder().for_epoch(reward_epoch)
+
+    builder.add(RandomAcquisitionStarted(reward_epoch_id, reward_epoch.start_s - 9000))
+    builder.add(VotePowerBlockSelected(reward_epoch_id, 1, reward_epoch.start_s - 8000))
+
+    for i, v in enumerate(voters):
+        builder.add(
+            VoterRegistered(
+                reward_epoch_id=reward_epoch_id,
+                voter=v.identity_address,
+                signing_policy_address=v.signing_policy_address,
+                submit_address=v.submit_address,
+                submit_signatures_address=v.submit_signatures_address,
+                public_key="00" * 64,
+                registration_weight=1000 + i,
+            )
+        )
+        builder.add(
+            VoterRegistrationInfo(
+                reward_epoch_id=reward_epoch_id,
+                voter=v.identity_address,
+                delegation_address=v.delegation_address,
+                delegation_fee_bips=2000,
+                w_nat_weight=10**24,
+                w_nat_capped_weight=10**24,
+                node_ids=[keccak(text=f"node:{i}")[:20].hex()],
+                node_weights=[10**24],
+            )
+        )
+
+    builder.add(
+        SigningPolicyInitialized(
+            reward_epoch_id=reward_epoch_id,
+            start_voting_round_id=reward_epoch.to_first_voting_epoch().id,
+            threshold=len(voters) * 500,
+            seed=1,
+            voters=[v.signing_policy_address for v in voters],
+            weights=[1000 + i for i in range(len(voters))],
+            signing_policy_bytes="00",
+            timestamp=reward_epoch.start_s - 3600,
+        )
+    )
+    return builder
+
+
+@define
+class Scenario:
+    """
+    One voting round of a network of voters that each sent valid ftso and fdc
+    submit1, submit2 and submit signatures transactions.
+    """
+
+    config: Configuration
+    voters: list[Voter]
+    builder: SigningPolicyBuilder
+    signing_policy: SigningPolicy
+    voting_round: VotingRound
+
+    # submission transactions of the round with the blocks that included them
+    transactions: list[tuple[TxData, BlockData]]
+    submit_1_input: str
+    submit_2_input: str
+    submit_signatures_input: str
+
+    @classmethod
+    def make(
+        cls,
+        voters: int = 100,
+        feeds: int = 60,
+        attestation_requests: int = 30,
+        chain_id: int = ChainId.FLARE,
+        seed: int = 0,
+    ) -> Self:
+        rnd = random.Random(seed)
+
+        _voters = [Voter.make(i) for i in range(voters)]
+        config = make_config(chain_id, _voters[0].identity_address)
+
+        reward_epoch = config.epoch.reward_epoch_factory.now()
+        voting_epoch = reward_epoch.to_first_voting_epoch().next
+        rid = voting_epoch.id
+
+        builder = signing_policy_builder(config, reward_epoch.id, _voters)
+        signing_policy = builder.build()
+
+        ftso_root = rnd.randbytes(32)
+        fdc_root = rnd.randbytes(32)
+        ftso_finalization = ProtocolMessageRelayed(
+            100, rid, True, ftso_root.hex(), voting_epoch.next.start_s + 50
+        )
+        fdc_finalization = ProtocolMessageRelayed(
+            200, rid, True, fdc_root.hex(), voting_epoch.next.start_s + 50
+        )
+        bit_vector = [rnd.random() < 0.9 for _ in range(attestation_requests)]
+
+        names = get_target_function_signatures(config)
+        selectors = {v: k for k, v in names.items()}
+
+        txs: list[tuple[bytes, int, ChecksumAddress]] = []
+        for v in _voters:
+            random_value = rnd.getrandbits(256)
+            values: list[int | None] = [
+                rnd.randint(-(2**20), 2**20) for _ in range(feeds)
+            ]
+            commit = ftso_commit(v.submit_address, rid, random_value, values)
+
+            submit_1 = encode_call(
+                selectors["submit1"],
+                encode_payload(100, rid, commit),
+                encode_payload(200, rid, b""),
+            )
+            submit_2 = encode_call(
+                selectors["submit2"],
+                encode_payload(100, rid, encode_ftso_submit2(random_value, values)),
+                encode_payload(200, rid, encode_fdc_submit2(bit_vector)),
+            )
+
+            key = v.signing_policy_key
+            ftso_signature = sign_hash(key, ftso_finalization.to_message())
+            fdc_signature = sign_hash(key, fdc_finalization.to_message())
+            submit_signatures = encode_call(
+                selectors["submitSignatures"],
+                encode_payload(
+                    100,
+                    rid,
+                    encode_submit_signatures(ftso_signature, 100, rid, ftso_root),
+                ),
+                encode_payload(
+                    200,
+                    rid,
+                    encode_submit_signatures(fdc_signature, 200, rid, fdc_root),
+                ),
+            )
+
+            txs.append((submit_1, voting_epoch.start_s + 10, v.submit_address))
+            txs.append((submit_2, voting_epoch.next.start_s + 10, v.submit_address))
+            txs.append(
+                (
+                    submit_signatures,
+                    voting_epoch.next.reveal_deadline() + 2,
+                    v.submit_signatures_address,
+                )
+            )
+
+        transactions = []
+        for i, (data, ts, sender) in enumerate(txs):
+            block = AttributeDict({"number": 1_000_000 + i, "timestamp": ts})
+            tx = AttributeDict(
+                {
+                    "hash": HexBytes(keccak(data + i.to_bytes(4, "big"))),
+                    "to": config.contracts.Submission.address,
+                    "input": HexBytes(data),
+                    "blockNumber": block["number"],
+                    "transactionIndex": i % 20,
+                    "from": sender,
+                    "value": 0,
+                }
+            )
+            transactions.append((tx, block))
+
+        voting_round = VotingRound(voting_epoch)
+        voting_round.ftso.finalization = ftso_finalization
+        voting_round.fdc.finalization = fdc_finalization
+        ftso, fdc = voting_round.ftso, voting_round.fdc
+
+        mapper = signing_policy.entity_mapper
+        for tx, block in transactions:
+            wtx = WTxData.from_tx_data(tx, block)  # type: ignore
+            entity = mapper.by_omni[wtx.from_address]
+            input = wtx.input[4:].hex()
+
+            match names[wtx.input[:4].hex()]:
+                case "submit1":
+                    parsed = parse_submit1_tx(input)
+                    assert parsed.ftso is not None and parsed.fdc is not None
+                    ftso.insert_submit_1(entity, parsed.ftso, wtx)
+                    fdc.insert_submit_1(entity, parsed.fdc, wtx)
+                case "submit2":
+                    parsed = parse_submit2_tx(input)
+                    assert parsed.ftso is not None and parsed.fdc is not None
+                    ftso.insert_submit_2(entity, parsed.ftso, wtx)
+                    fdc.insert_submit_2(entity, parsed.fdc, wtx)
+                case "submitSignatures":
+                    parsed = parse_submit_signature_tx(input)
+                    assert parsed.ftso is not None and parsed.fdc is not None
+                    ftso.insert_submit_signatures(entity, parsed.ftso, wtx)
+                    fdc.insert_submit_signatures(entity, parsed.fdc, wtx)
+
+        return cls(
+            config=config,
+            voters=_voters,
+            builder=builder,
+            signing_policy=signing_policy,
+            voting_round=voting_round,
+            transactions=transactions,  # type: ignore
+            submit_1_input=txs[0][0][4:].hex(),
+            submit_2_input=txs[1][0][4:].hex(),
+            submit_signatures_input=txs[2][0][4:].hex(),
+        )
+
+    def entity(self, i: int = 0) -> Entity:
+        return self.signing_policy.entities[i]
@@ -0,0 +1,214 @@
+import argparse
+import json
+import platform
+import sys
+import timeit
+from collections.abc import Callable
+from typing import Any
+
+from attrs import evolve, frozen
+from py_flare_common.fsp.messaging import (
+    parse_submit1_tx,
+    parse_submit2_tx,
+    parse_submit_signature_tx,
+)
+
+from observer.bitvotes import RoundBitvotes
+from observer.feeds import RoundFeeds
+from observer.observer import extract, validate_fdc, validate_ftso
+from observer.reward_epoch_manager import (
+    EntityMapper,
+    PayloadIndex,
+    VotingRoundManager,
+    WTxData,
+)
+
+from .scenario import Scenario
+
+BASELINE_FILE = "benchmarks/baseline.json"
+
+
+@frozen
+class Case:
+    name: str
+    fn: Callable[[], Any]
+    # operations per call of fn, timings are reported per operation
+    ops: int = 1
+
+
+def calibration() -> int:
+    # fixed pure python workload, timings are stored relative to it so baselines
+    # can be compared across machines of different speed
+    return sum(i * i for i in range(1000))
+
+
+def make_cases(s: Scenario) -> list[Case]:
+    config = s.config
+    entity = s.entity()
+    round = s.voting_round
+    epoch = round.voting_epoch
+    tx, block = s.transactions[0]
+
+    submit_2 = list(round.ftso.submit_2.by_identity.values())
+    reveal = range(epoch.next.start_s, epoch.next.reveal_deadline())
+
+    # a single call is too short to time reliably, extract for every voter
+    def extract_all():
+        for payloads in submit_2:
+            extract(payloads, epoch.id, reveal)
+
+    # an identity that resubmitted 10 times in each of the last 100 rounds, as
+    # seen by a network-wide observer
+    retries = PayloadIndex()
+    payload, wtx = submit_2[0].latest(epoch.id, reveal)  # type: ignore
+    for r in range(epoch.id - 99, epoch.id + 1):
+        offset = (r - epoch.id) * config.epoch.voting_epoch_factory.epoch_duration
+        for i in range(10):
+            retries.insert(
+                evolve(payload, voting_round_id=r),
+                evolve(wtx, timestamp=wtx.timestamp + offset + i),
+            )
+
+    def insert_entities():
+        mapper = EntityMapper()
+        for e in s.signing_policy.entities:
+            mapper.insert(e)
+
+    # rounds that are open while following the chain, none completes at block
+    vrm = VotingRoundManager(epoch.previous.id, config.epoch.voting_epoch_factory)
+    for i in range(3):
+        vrm.get(config.epoch.voting_epoch(epoch.id + i))
+    open_block = {"timestamp": epoch.start_s}
+
+    # submissions with bogus voting round ids
+    bogus = [config.epoch.voting_epoch(epoch.id + 10 + i) for i in range(1000)]
+
+    def get_bogus():
+        for v in bogus:
+            vrm.get(v)
+
+    return [
+        Case("parse_submit1_tx", lambda: parse_submit1_tx(s.submit_1_input)),
+        Case("parse_submit2_tx", lambda: parse_submit2_tx(s.submit_2_input)),
+        Case(
+            "parse_submit_signature_tx",
+            lambda: parse_submit_signature_tx(s.submit_signatures_input),
+        ),
+        Case("WTxData.from_tx_data", lambda: WTxData.from_tx_data(tx, block)),
+        Case("extract", extract_all, ops=len(submit_2)),
+        Case("extract[1000 payloads]", lambda: extract(retries, epoch.id, reveal)),
+        Case("validate_ftso", lambda: validate_ftso(round, entity, config)),
+        Case("validate_fdc", lambda: validate_fdc(round, entity, config)),
+        Case(
+            "RoundFeeds.from_round",
+            lambda: RoundFeeds.from_round(round, s.signing_policy.entities),
+        ),
+        Case(
+            "RoundBitvotes.from_round",
+            lambda: RoundBitvotes.from_round(round, s.signing_policy.entities),
+        ),
+        Case("SigningPolicyBuilder.build", s.builder.build),
+        Case("EntityMapper.insert", insert_entities, ops=len(s.voters)),
+        Case(
+            "VotingRoundManager.finalize",
+            lambda: vrm.finalize(open_block),  # type: ignore
+        ),
+        Case("VotingRoundManager.get[bogus ids]", get_bogus, ops=len(bogus)),
+    ]
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> float:
+    # best of repeat samples of at least 0.2s each, in seconds per call
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def run(s: Scenario, repeat: int, only: str | None) -> dict[str, tuple[float, float]]:
+    # (seconds per operation, calibration seconds) of each case, calibration is
+    # measured next to every case so both see the same machine load
+    results = {}
+    for case in make_cases(s):
+        if only is not None and only not in case.name:
+            continue
+        calibration_s = measure(calibration, repeat)
+        results[case.name] = (measure(case.fn, repeat) / case.ops, calibration_s)
+    return results
+
+
+def compare(
+    results: dict[str, tuple[float, float]],
+    baseline: dict[str, Any],
+    tolerance: float,
+) -> list[str]:
+    regressions = []
+    print(f"{'case':<42}{'time':>12}{'baseline':>12}{'change':>10}")
+    for name, (seconds, calibration_s) in results.items():
+        base = baseline["relative"].get(name)
+        if base is None:
+            print(f"{name:<42}{seconds * 1e6:>10.2f}us{'-':>12}{'new':>10}")
+            continue
+
+        change = seconds / calibration_s / base - 1
+        # show the baseline scaled to the speed of this machine
+        scaled = base * calibration_s
+        flag = ""
+        if change > tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(
+            f"{name:<42}{seconds * 1e6:>10.2f}us{scaled * 1e6:>10.2f}us"
+            f"{change:>+10.1%}{flag}"
+        )
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark observer hot paths against committed baselines."
+    )
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument(
+        "--save", action="store_true", help="overwrite the baseline with this run"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.3,
+        help="allowed slowdown relative to the baseline (default 0.3 = 30%%)",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="run cases whose name contains this")
+    parser.add_argument("--voters", type=int, default=100)
+    parser.add_argument("--feeds", type=int, default=60)
+    args = parser.parse_args()
+
+    scenario = Scenario.make(voters=args.voters, feeds=args.feeds)
+    results = run(scenario, args.repeat, args.only)
+
+    if args.save:
+        data = {
+            "python": platform.python_version(),
+            "scenario": {"voters": args.voters, "feeds": args.feeds},
+            "relative": {k: t / c for k, (t, c) in results.items()},
+        }
+        with open(args.baseline, "w") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+        for name, (seconds, _) in results.items():
+            print(f"{name:<42}{seconds * 1e6:>10.2f}us")
+        print(f"saved baseline to {args.baseline}")
+        sys.exit(0)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    if baseline["scenario"] != {"voters": args.voters, "feeds": args.feeds}:
+        print(f"baseline was recorded with {baseline['scenario']}", file=sys.stderr)
+        sys.exit(2)
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
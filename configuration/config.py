@@ -1,10 +1,13 @@
 import os
+from typing import Literal
 
 from eth_utils.address import to_checksum_address
 from py_flare_common.fsp.epoch.timing import coston, coston2, flare, songbird
 from web3 import Web3
 
 from .types import (
+    Alert,
+    Balance,
     Configuration,
     Contracts,
     Epoch,
@@ -91,14 +94,79 @@ def get_notification_config() -> Notification:
     if generic_webhook is not None:
         generic = NotificationGeneric(generic_webhook)
 
+    digest_window = int(os.environ.get("NOTIFICATION_DIGEST_WINDOW", "0"))
+    if digest_window < 0:
+        raise ConfigError("NOTIFICATION_DIGEST_WINDOW must not be negative.")
+
     return Notification(
         discord=discord,
         slack=slack,
         telegram=telegram,
         generic=generic,
+        digest_window=digest_window,
     )
 
 
+def get_alert_config() -> Alert:
+    escalation_rounds = int(os.environ.get("ALERT_ESCALATION_ROUNDS", "10"))
+    suppression_rounds = int(os.environ.get("ALERT_SUPPRESSION_ROUNDS", "40"))
+
+    if escalation_rounds < 0 or suppression_rounds < 0:
+        raise ConfigError(
+            "ALERT_ESCALATION_ROUNDS and ALERT_SUPPRESSION_ROUNDS must not be negative."
+        )
+
+    warn_before_submit1 = int(os.environ.get("ALERT_WARN_BEFORE_SUBMIT1", "0"))
+    warn_before_submit2 = int(os.environ.get("ALERT_WARN_BEFORE_SUBMIT2", "10"))
+    warn_before_signatures = int(os.environ.get("ALERT_WARN_BEFORE_SIGNATURES", "10"))
+
+    if min(warn_before_submit1, warn_before_submit2, warn_before_signatures) < 0:
+        raise ConfigError("ALERT_WARN_BEFORE_* must not be negative.")
+
+    return Alert(
+        state_file=os.environ.get("ALERT_STATE_FILE"),
+        escalation_rounds=escalation_rounds,
+        suppression_rounds=suppression_rounds,
+        warn_before_submit1=warn_before_submit1,
+        warn_before_submit2=warn_before_submit2,
+        warn_before_signatures=warn_before_signatures,
+    )
+
+
+def get_balance_config() -> Balance:
+    refresh_rounds = int(os.environ.get("BALANCE_REFRESH_ROUNDS", "10"))
+    min_rounds = int(os.environ.get("BALANCE_MIN_ROUNDS", "960"))
+
+    if refresh_rounds < 0 or min_rounds < 0:
+        raise ConfigError(
+            "BALANCE_REFRESH_ROUNDS and BALANCE_MIN_ROUNDS must not be negative."
+        )
+
+    return Balance(refresh_rounds=refresh_rounds, min_rounds=min_rounds)
+
+
+def get_confirmations() -> int | Literal["safe", "finalized"]:
+    confirmations = os.environ.get("CONFIRMATIONS", "0")
+    if confirmations in ("safe", "finalized"):
+        return confirmations
+
+    if not confirmations.isdigit():
+        raise ConfigError(
+            "CONFIRMATIONS must be a non negative number, 'safe' or 'finalized'."
+        )
+    return int(confirmations)
+
+
+def get_optional_port(name: str) -> int | None:
+    port = os.environ.get(name)
+    if not port:
+        return None
+
+    if not port.isdigit() or int(port) > 65535:
+        raise ConfigError(f"{name} must be a port number.")
+    return int(port)
+
+
 def get_config() -> Configuration:
     rpc_url = os.environ.get("RPC_URL")
 
@@ -124,6 +192,15 @@ def get_config() -> Configuration:
         contracts=Contracts.get_contracts(w),
         epoch=get_epoch(chain_id),
         notification=get_notification_config(),
+        alert=get_alert_config(),
+        balance=get_balance_config(),
+        confirmations=get_confirmations(),
+        history_file=os.environ.get("HISTORY_FILE"),
+        profiling=os.environ.get("PROFILING_ENABLED", "false").lower()
+        in ("1", "true", "yes"),
+        status_port=get_optional_port("STATUS_PORT"),
+        mempool_poll_seconds=float(os.environ.get("MEMPOOL_POLL_SECONDS", "0")),
+        validator_metrics_port=get_optional_port("VALIDATOR_METRICS_PORT"),
     )
 
     return config
@@ -1,7 +1,7 @@
 import json
-from typing import Callable, Self
+from typing import Callable, Literal, Self
 
-from attrs import field, frozen
+from attrs import evolve, field, frozen
 from eth_typing import ABI, ABIEvent, ABIFunction, ChecksumAddress
 from eth_utils.address import to_checksum_address
 from py_flare_common.fsp.epoch.epoch import RewardEpoch, VotingEpoch
@@ -170,6 +170,15 @@ class Contracts:
 
         return cls(**kwargs)
 
+    def with_addresses(self, addresses: dict[str, ChecksumAddress]) -> Self:
+        """Copy with the contracts whose address differs replaced."""
+        changed = {
+            name: Contract(name, address, f"configuration/artifacts/{name}.json")
+            for name, address in addresses.items()
+            if getattr(self, name).address != address
+        }
+        return evolve(self, **changed)
+
 
 @frozen
 class Epoch:
@@ -207,6 +216,31 @@ class Notification:
     telegram: NotificationTelegram | None
     generic: NotificationGeneric | None
 
+    # seconds to coalesce non critical messages into digests, 0 disables it
+    digest_window: int
+
+
+@frozen
+class Alert:
+    # json file used to persist alert state across restarts, None keeps it in memory
+    state_file: str | None
+    escalation_rounds: int
+    suppression_rounds: int
+    # warn this many seconds before the deadline of a phase while the observed
+    # entity's transaction is still missing, 0 disables it
+    warn_before_submit1: int
+    warn_before_submit2: int
+    warn_before_signatures: int
+
+
+@frozen
+class Balance:
+    # read balances of the watched addresses every this many voting rounds,
+    # 0 disables balance monitoring
+    refresh_rounds: int
+    # warn when an address has gas for fewer than this many rounds
+    min_rounds: int
+
 
 @frozen
 class Configuration:
@@ -216,3 +250,25 @@ class Configuration:
     rpc_url: str
     epoch: Epoch
     notification: Notification
+    alert: Alert
+    balance: Balance
+
+    # blocks are processed once this many blocks behind the head, or once the
+    # node reports them safe or finalized
+    confirmations: int | Literal["safe", "finalized"]
+
+    # sqlite file per round validation results are appended to, None disables it
+    history_file: str | None
+
+    # serve the cpu profiling endpoint next to the metrics
+    profiling: bool
+
+    # port of the json status api, None disables it
+    status_port: int | None
+
+    # seconds between txpool polls for pending submissions, 0 disables it
+    mempool_poll_seconds: float
+
+    # metrics port of the validator process, None validates in the observer's
+    # own process
+    validator_metrics_port: int | None
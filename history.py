@@ -0,0 +1,144 @@
+import argparse
+import os
+import sqlite3
+import sys
+
+import dotenv
+from eth_utils.address import to_checksum_address
+
+SUMMARY_COLUMNS = [
+    "rounds",
+    "submit_1",
+    "submit_2",
+    "submit_signatures",
+    "none_values",
+    "signature_mismatches",
+    "reveal_offences",
+    "issues",
+]
+
+ROUND_COLUMNS = [
+    "voting_round_id",
+    "reward_epoch_id",
+    "submit_1_timestamp",
+    "submit_2_timestamp",
+    "submit_signatures_timestamp",
+    "none_indices",
+    "signature_valid",
+    "reveal_offence",
+    "issues",
+]
+
+PROTOCOLS = {"ftso": 100, "fdc": 200}
+
+
+def print_table(header: list[str], rows: list[tuple]) -> None:
+    rows = [tuple("" if v is None else str(v) for v in row) for row in rows]
+    widths = [max([len(h), *(len(r[i]) for r in rows)]) for i, h in enumerate(header)]
+
+    print("  ".join(h.rjust(w) for h, w in zip(header, widths)))
+    for row in rows:
+        print("  ".join(v.rjust(w) for v, w in zip(row, widths)))
+
+
+def summary(connection: sqlite3.Connection, args: argparse.Namespace) -> None:
+    where = "identity_address = ? AND protocol = ?"
+    params: list = [args.identity, PROTOCOLS[args.protocol]]
+
+    if args.from_reward_epoch is not None:
+        where += " AND reward_epoch_id >= ?"
+        params.append(args.from_reward_epoch)
+    if args.to_reward_epoch is not None:
+        where += " AND reward_epoch_id <= ?"
+        params.append(args.to_reward_epoch)
+
+    columns = ", ".join(SUMMARY_COLUMNS)
+    totals = ", ".join(f"SUM({c})" for c in SUMMARY_COLUMNS)
+
+    rows = []
+    if not args.total:
+        rows = connection.execute(
+            f"SELECT reward_epoch_id, {columns} FROM reward_epoch_summary "
+            f"WHERE {where} ORDER BY reward_epoch_id",
+            params,
+        ).fetchall()
+
+    total = connection.execute(
+        f"SELECT 'total', {totals} FROM reward_epoch_summary WHERE {where}",
+        params,
+    ).fetchone()
+
+    print_table(["reward_epoch_id", *SUMMARY_COLUMNS], [*rows, total])
+
+
+def rounds(connection: sqlite3.Connection, args: argparse.Namespace) -> None:
+    where = "identity_address = ? AND protocol = ?"
+    params: list = [args.identity, PROTOCOLS[args.protocol]]
+
+    if args.from_round is not None:
+        where += " AND voting_round_id >= ?"
+        params.append(args.from_round)
+    if args.to_round is not None:
+        where += " AND voting_round_id <= ?"
+        params.append(args.to_round)
+    if args.only_issues:
+        where += " AND issues > 0"
+
+    rows = connection.execute(
+        f"SELECT {', '.join(ROUND_COLUMNS)} FROM round_result "
+        f"WHERE {where} ORDER BY voting_round_id",
+        params,
+    ).fetchall()
+
+    print_table(ROUND_COLUMNS, rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Query per round validation results recorded by the observer."
+    )
+    parser.add_argument(
+        "--db",
+        default=os.environ.get("HISTORY_FILE"),
+        help="sqlite history file (default: HISTORY_FILE)",
+    )
+
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for name, description in [
+        ("summary", "aggregate results per reward epoch"),
+        ("rounds", "list results of individual voting rounds"),
+    ]:
+        p = subparsers.add_parser(name, help=description)
+        p.add_argument("identity", help="identity address of the entity")
+        p.add_argument("--protocol", choices=PROTOCOLS, default="ftso")
+
+    p = subparsers.choices["summary"]
+    p.add_argument("--from-reward-epoch", type=int)
+    p.add_argument("--to-reward-epoch", type=int)
+    p.add_argument("--total", action="store_true", help="only print the total")
+
+    p = subparsers.choices["rounds"]
+    p.add_argument("--from-round", type=int)
+    p.add_argument("--to-round", type=int)
+    p.add_argument("--only-issues", action="store_true")
+
+    args = parser.parse_args()
+
+    if args.db is None or not os.path.exists(args.db):
+        sys.exit("history file not found, set HISTORY_FILE or pass --db")
+
+    # identity addresses are stored checksummed
+    args.identity = to_checksum_address(args.identity)
+
+    connection = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    match args.command:
+        case "summary":
+            summary(connection, args)
+        case "rounds":
+            rounds(connection, args)
+
+
+if __name__ == "__main__":
+    dotenv.load_dotenv()
+    main()
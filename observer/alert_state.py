@@ -0,0 +1,206 @@
+import json
+import logging
+import os
+from typing import Self
+
+import attrs
+from attrs import define, field
+from eth_typing import ChecksumAddress
+
+from .message import Message, MessageBuilder, MessageLevel
+
+LOGGER = logging.getLogger(__name__)
+
+type CheckGroup = tuple[ChecksumAddress, int]
+
+
+@define
+class AlertState:
+    # voting round ids
+    first_seen: int
+    last_seen: int
+    last_notified: int
+
+    consecutive: int = 1
+    escalated: bool = False
+
+
+@define
+class AlertStateStore:
+    """
+    Remembers which checks are failing for every (identity, protocol) so that
+    notifications are only sent on state changes: when a check starts failing,
+    when it escalates, when a suppression window expires and when it resolves.
+    """
+
+    # path to the json file the state is persisted to, None keeps it in memory
+    path: str | None
+
+    # escalate to CRITICAL after this many consecutive failing rounds, 0 disables
+    escalation_rounds: int
+    # re-notify a still failing check every this many rounds, 0 disables
+    suppression_rounds: int
+
+    states: dict[CheckGroup, dict[str, AlertState]] = field(factory=dict)
+
+    def update(self, mb: MessageBuilder, issues: list[Message]) -> list[Message]:
+        """
+        Record the outcome of a single round for one (identity, protocol) and
+        return the messages that should be notified. The builder must have
+        round, protocol and identity_address set.
+        """
+        assert mb.round is not None
+        assert mb.protocol is not None
+        assert mb.identity_address is not None
+
+        round = mb.round.id
+        checks = self.states.setdefault((mb.identity_address, mb.protocol), {})
+
+        notify = []
+        failing = set()
+
+        for issue in issues:
+            if issue.check is not None:
+                failing.add(issue.check)
+            message = self._observe(checks, round, issue)
+            if message is not None:
+                notify.append(message)
+
+        for check in [c for c in checks if c not in failing]:
+            state = checks[check]
+            if state.last_seen >= round:
+                continue
+
+            checks.pop(check)
+
+            notify.append(
+                mb.build(
+                    MessageLevel.INFO,
+                    (
+                        f"resolved {check} after {state.consecutive} failing "
+                        f"rounds (since round {state.first_seen})"
+                    ),
+                    check,
+                )
+            )
+
+        return notify
+
+    def update_early(self, mb: MessageBuilder, issues: list[Message]) -> list[Message]:
+        """
+        Record issues of a round that is not complete yet and return the
+        messages that should be notified. Nothing is resolved, the complete
+        round is passed to update later and skips the checks seen here.
+        """
+        assert mb.round is not None
+        assert mb.protocol is not None
+        assert mb.identity_address is not None
+
+        checks = self.states.setdefault((mb.identity_address, mb.protocol), {})
+        notify = []
+        for issue in issues:
+            message = self._observe(checks, mb.round.id, issue)
+            if message is not None:
+                notify.append(message)
+
+        return notify
+
+    def failing(
+        self, identity_address: ChecksumAddress, protocol: int, check: str
+    ) -> bool:
+        return check in self.states.get((identity_address, protocol), {})
+
+    def _observe(
+        self, checks: dict[str, AlertState], round: int, issue: Message
+    ) -> Message | None:
+        # message to notify for a failing check, if any
+        if issue.check is None:
+            return issue
+
+        state = checks.get(issue.check)
+
+        if state is None:
+            checks[issue.check] = AlertState(round, round, round)
+            return issue
+
+        if state.last_seen >= round:
+            # already processed this round (eg. replayed after a restart)
+            return None
+
+        state.consecutive += 1
+        state.last_seen = round
+
+        if (
+            not state.escalated
+            and self.escalation_rounds
+            and state.consecutive >= self.escalation_rounds
+        ):
+            state.escalated = True
+            state.last_notified = round
+            return attrs.evolve(
+                issue,
+                level=MessageLevel.CRITICAL,
+                message=(
+                    f"{issue.message} (escalated, failing for "
+                    f"{state.consecutive} consecutive rounds)"
+                ),
+            )
+
+        if (
+            self.suppression_rounds
+            and round - state.last_notified >= self.suppression_rounds
+        ):
+            state.last_notified = round
+            return attrs.evolve(
+                issue,
+                message=(
+                    f"{issue.message} (still failing since round "
+                    f"{state.first_seen})"
+                ),
+            )
+
+        return None
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+
+        data = [
+            {
+                "identity_address": identity_address,
+                "protocol": protocol,
+                "check": check,
+                **attrs.asdict(state),
+            }
+            for (identity_address, protocol), checks in self.states.items()
+            for check, state in checks.items()
+        ]
+
+        # write to a temporary file first so a crash never leaves a partial file
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    @classmethod
+    def load(
+        cls, path: str | None, escalation_rounds: int, suppression_rounds: int
+    ) -> Self:
+        store = cls(path, escalation_rounds, suppression_rounds)
+
+        if path is None or not os.path.exists(path):
+            return store
+
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            LOGGER.warning(f"unable to read alert state from {path}: {e}")
+            return store
+
+        for d in data:
+            key = (d.pop("identity_address"), d.pop("protocol"))
+            check = d.pop("check")
+            store.states.setdefault(key, {})[check] = AlertState(**d)
+
+        return store
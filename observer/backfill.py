@@ -0,0 +1,304 @@
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from attrs import frozen
+from py_flare_common.fsp.epoch.epoch import RewardEpoch
+from web3 import AsyncWeb3
+from web3.exceptions import BlockNotFound, LogTopicError, MismatchedABI
+from web3.types import LogReceipt
+
+from configuration.types import Configuration
+
+from .bitvotes import RoundBitvotes
+from .digest import MessageCoalescer
+from .feeds import RoundFeeds
+from .history import HistoryStore, RoundResult
+from .observer import (
+    find_block_by_timestamp,
+    flush_issues,
+    get_signing_policy_events,
+    log_issue,
+    notify_issue,
+    process_log,
+    process_transaction,
+    validate_round,
+)
+from .registry import get_target_function_signatures
+from .reward_epoch_manager import SigningPolicy, VotingRoundManager, policy_for_round
+from .rpc import fetch_blocks, fetch_logs, make_web3
+
+LOGGER = logging.getLogger(__name__)
+
+# a signing policy whose events are missing or can't be decoded, its reward
+# epoch is skipped
+POLICY_ERRORS = (
+    AssertionError,
+    KeyError,
+    ValueError,
+    TypeError,
+    MismatchedABI,
+    LogTopicError,
+    BlockNotFound,
+)
+
+
+@frozen
+class Shard:
+    # voting round ids validated by the shard, end is exclusive
+    start_round: int
+    end_round: int
+
+
+@frozen
+class ShardResult:
+    reward_epoch_id: int
+    results: list[RoundResult]
+
+
+def make_shards(start_round: int, end_round: int, size: int) -> list[Shard]:
+    return [
+        Shard(s, min(s + size, end_round)) for s in range(start_round, end_round, size)
+    ]
+
+
+async def get_signing_policy(
+    w: AsyncWeb3, config: Configuration, reward_epoch: RewardEpoch
+) -> SigningPolicy:
+    # voter registration period is 2h before the reward epoch and lasts 30min
+    start_block = await find_block_by_timestamp(w, reward_epoch.start_s - 9000)
+    end_block = await find_block_by_timestamp(w, reward_epoch.start_s - 3600)
+    return await get_signing_policy_events(
+        w, config, reward_epoch, start_block, end_block
+    )
+
+
+async def resolve_signing_policies(
+    w: AsyncWeb3, config: Configuration, start_round: int, end_round: int
+) -> list[SigningPolicy]:
+    """
+    Build signing policies of every reward epoch that may cover the given
+    rounds, sorted by their start voting round.
+    """
+    ve = config.epoch.voting_epoch
+    ref = config.epoch.reward_epoch_factory
+
+    # reward epochs can be extended, so also include the one before the first
+    # expected epoch in case it was still active at start_round
+    first = ref.from_timestamp(ve(start_round).start_s).previous
+    last = ref.from_timestamp(ve(end_round).start_s)
+
+    policies = []
+    for reward_epoch_id in range(first.id, last.id + 1):
+        reward_epoch = ref.make_epoch(reward_epoch_id)
+        try:
+            policies.append(await get_signing_policy(w, config, reward_epoch))
+        except POLICY_ERRORS as e:
+            LOGGER.warning(
+                f"unable to build signing policy for {reward_epoch_id=}, "
+                f"skipping its rounds: {e!r}"
+            )
+
+    policies.sort(key=lambda p: p.start_voting_round)
+    return policies
+
+
+async def backfill_shard(
+    config: Configuration,
+    shard: Shard,
+    policies: list[SigningPolicy],
+    concurrency: int,
+    block_range: int,
+    log_range: int,
+) -> list[ShardResult]:
+    w = make_web3(config)
+    ve = config.epoch.voting_epoch
+    vef = config.epoch.voting_epoch_factory
+
+    # a round is only complete once the epoch after it has ended, so shards read
+    # one epoch past their last round; rounds in that overlap are validated by
+    # the next shard which reads them from their start
+    start_block = await find_block_by_timestamp(w, ve(shard.start_round).start_s)
+    end_block = await find_block_by_timestamp(w, ve(shard.end_round).end_s + 1)
+
+    LOGGER.info(
+        f"backfilling rounds [{shard.start_round}, {shard.end_round}) "
+        f"from blocks [{start_block}, {end_block}]"
+    )
+
+    relay = config.contracts.Relay
+    event = relay.events["ProtocolMessageRelayed"]
+    event_signatures = {event.signature: event}
+    target_function_signatures = get_target_function_signatures(config)
+
+    vrm = VotingRoundManager(shard.start_round - 1, config.epoch.voting_epoch_factory)
+    # signing policies are resolved upfront, events are never added to this
+    spb = SigningPolicy.builder()
+    feeds: RoundFeeds | None = None
+
+    results = []
+    for chunk_start in range(start_block, end_block + 1, block_range):
+        chunk_end = min(chunk_start + block_range - 1, end_block)
+        blocks, logs = await asyncio.gather(
+            fetch_blocks(w, chunk_start, chunk_end, concurrency),
+            fetch_logs(
+                w,
+                [relay.address],
+                chunk_start,
+                chunk_end,
+                log_range,
+                concurrency,
+                topics=["0x" + event.signature],
+            ),
+        )
+
+        logs_by_block: dict[int, list[LogReceipt]] = {}
+        for log in logs:
+            logs_by_block.setdefault(log["blockNumber"], []).append(log)
+
+        for block_data in blocks:
+            assert "number" in block_data
+            assert "timestamp" in block_data
+            assert "transactions" in block_data
+
+            for log in logs_by_block.get(block_data["number"], []):
+                process_log(w, config, vrm, spb, event_signatures, log, block_data)
+
+            policy = policy_for_round(
+                policies, vef.from_timestamp(block_data["timestamp"]).id
+            )
+            if policy is not None:
+                for tx in block_data["transactions"]:
+                    assert not isinstance(tx, bytes)
+                    process_transaction(
+                        config,
+                        vrm,
+                        policy.entity_mapper,
+                        target_function_signatures,
+                        tx,
+                        block_data,
+                    )
+
+            for r in vrm.finalize(block_data):
+                if not (shard.start_round <= r.voting_epoch.id < shard.end_round):
+                    continue
+
+                policy = policy_for_round(policies, r.voting_epoch.id)
+                if policy is None:
+                    continue
+
+                entity = policy.entity_mapper.by_identity_address.get(
+                    config.identity_address
+                )
+                if entity is None:
+                    continue
+
+                feeds = RoundFeeds.from_round(r, policy.entities, feeds)
+                bitvotes = RoundBitvotes.from_round(r, policy.entities)
+                results.append(
+                    ShardResult(
+                        policy.reward_epoch.id,
+                        validate_round(r, entity, config, feeds, bitvotes),
+                    )
+                )
+
+    return results
+
+
+def run_shard(
+    config: Configuration,
+    shard: Shard,
+    policies: list[SigningPolicy],
+    concurrency: int,
+    block_range: int,
+    log_range: int,
+) -> list[ShardResult]:
+    # entry point of worker processes
+    return asyncio.run(
+        backfill_shard(config, shard, policies, concurrency, block_range, log_range)
+    )
+
+
+async def backfill(
+    config: Configuration,
+    start_round: int,
+    end_round: int,
+    shard_size: int = 40,
+    workers: int = 4,
+    concurrency: int = 16,
+    block_range: int = 500,
+    log_range: int = 30,
+    notify: bool = False,
+) -> None:
+    """
+    Validate voting rounds [start_round, end_round) of the past. The range is
+    split into epoch aligned shards that are processed by worker processes,
+    results are reported in round order through the logs and history of the
+    live observer. Notifications are only sent if notify is set.
+    """
+    w = make_web3(config)
+    ve = config.epoch.voting_epoch
+    vef = config.epoch.voting_epoch_factory
+
+    # round r is only complete once a block after the end of round r + 1 exists
+    latest = await w.eth.get_block("latest")
+    assert "timestamp" in latest
+    incomplete_round = vef.from_timestamp(latest["timestamp"]).id - 1
+    if end_round > incomplete_round:
+        LOGGER.warning(f"rounds from {incomplete_round} are not complete, skipping")
+        end_round = incomplete_round
+
+    if start_round >= end_round:
+        LOGGER.warning("nothing to backfill")
+        return
+
+    policies = await resolve_signing_policies(w, config, start_round, end_round)
+    shards = make_shards(start_round, end_round, shard_size)
+
+    LOGGER.info(
+        f"backfilling rounds [{start_round}, {end_round}) "
+        f"({ve(start_round).start_s} - {ve(end_round).start_s}) "
+        f"in {len(shards)} shards with {workers} workers"
+    )
+
+    history = None
+    if config.history_file is not None:
+        history = HistoryStore.open(config.history_file)
+    coalescer = MessageCoalescer(config.notification.digest_window)
+
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            loop.run_in_executor(
+                pool,
+                run_shard,
+                config,
+                shard,
+                policies,
+                concurrency,
+                block_range,
+                log_range,
+            )
+            for shard in shards
+        ]
+
+        # shards finish out of order, report them in order as they become ready
+        for future in futures:
+            for shard_result in await future:
+                for result in shard_result.results:
+                    for i in result.issues:
+                        log_issue(config, i)
+                        if notify:
+                            notify_issue(config, coalescer, i)
+
+                if history is not None:
+                    history.insert(shard_result.results, shard_result.reward_epoch_id)
+
+            if notify:
+                flush_issues(config, coalescer)
+
+    if notify:
+        flush_issues(config, coalescer, force=True)
+
+    if history is not None:
+        history.close()
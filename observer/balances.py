@@ -0,0 +1,183 @@
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Callable
+from typing import cast
+
+from attrs import define, field
+from eth_typing import ChecksumAddress
+from web3 import AsyncWeb3
+from web3.types import Wei
+
+from .message import Message, MessageBuilder, MessageLevel
+from .metrics import record_balance
+from .reward_epoch_manager import Entity
+
+LOGGER = logging.getLogger(__name__)
+
+# observations per address used to estimate spend per round
+SPEND_WINDOW = 64
+
+
+def watched_addresses(entity: Entity) -> dict[str, ChecksumAddress]:
+    # addresses that send transactions and pay for gas, by role
+    return {
+        "submit": entity.submit_address,
+        "submit_signatures": entity.submit_signatures_address,
+        "signing_policy": entity.signing_policy_address,
+    }
+
+
+@define
+class BalanceMonitor:
+    """
+    Reads the balances of the addresses of watched entities in a single
+    json-rpc batch every refresh_rounds voting rounds, estimates their spend
+    per round and warns when the projected runway drops below min_rounds.
+    """
+
+    # read balances every this many voting rounds
+    refresh_rounds: int
+    # warn when an address has gas for fewer than this many rounds
+    min_rounds: int
+
+    # voting round id balances were last read in
+    refreshed: int | None = None
+    # (voting round id, balance in wei) observations since the last top up
+    observations: dict[ChecksumAddress, deque[tuple[int, int]]] = field(factory=dict)
+    # addresses that are currently below the threshold
+    low: set[ChecksumAddress] = field(factory=set)
+    task: asyncio.Task | None = None
+
+    def due(self, voting_round_id: int) -> bool:
+        return (
+            self.refreshed is None
+            or voting_round_id - self.refreshed >= self.refresh_rounds
+        )
+
+    def start(
+        self,
+        w: AsyncWeb3,
+        entities: list[Entity],
+        voting_round_id: int,
+        block_number: int,
+        mb: MessageBuilder,
+        notify: Callable[[list[Message]], None],
+    ) -> None:
+        """
+        Refresh in the background of the running event loop, so a slow batch
+        doesn't hold up blocks. Does nothing while a refresh is still running.
+        """
+        if self.task is not None and not self.task.done():
+            return
+        self.refreshed = voting_round_id
+        self.task = asyncio.create_task(
+            self.run(w, entities, voting_round_id, block_number, mb, notify)
+        )
+
+    async def run(
+        self,
+        w: AsyncWeb3,
+        entities: list[Entity],
+        voting_round_id: int,
+        block_number: int,
+        mb: MessageBuilder,
+        notify: Callable[[list[Message]], None],
+    ) -> None:
+        messages = await self.refresh(w, entities, voting_round_id, block_number, mb)
+        if messages:
+            notify(messages)
+
+    async def refresh(
+        self,
+        w: AsyncWeb3,
+        entities: list[Entity],
+        voting_round_id: int,
+        block_number: int,
+        mb: MessageBuilder,
+    ) -> list[Message]:
+        """
+        Read balances of all watched addresses at block_number and return
+        messages for addresses that crossed the runway threshold.
+        """
+        self.refreshed = voting_round_id
+
+        watched = [
+            (e.identity_address, role, address)
+            for e in entities
+            for role, address in watched_addresses(e).items()
+        ]
+        addresses = list(dict.fromkeys(address for _, _, address in watched))
+
+        try:
+            async with w.batch_requests() as batch:
+                for address in addresses:
+                    batch.add(w.eth.get_balance(address, block_number))
+                # get_balance results come back formatted, not as raw responses
+                results = cast(list[Wei], await batch.async_execute())
+                balances = dict(zip(addresses, results))
+        except Exception as e:
+            LOGGER.warning(f"unable to read balances: {e}")
+            return []
+
+        for address, balance in balances.items():
+            self.observe(address, voting_round_id, balance)
+
+        messages = []
+        for identity, role, address in watched:
+            balance = balances[address]
+            runway = self.runway(address)
+            record_balance(identity, role, balance, runway)
+
+            low = runway is not None and runway < self.min_rounds
+            _mb = mb.copy().add(identity_address=identity)
+            if low and address not in self.low:
+                self.low.add(address)
+                messages.append(
+                    _mb.build(
+                        MessageLevel.WARNING,
+                        f"{role} address {address} has gas for about "
+                        f"{runway:.0f} more rounds ({balance / 1e18:.2f} left)",
+                    )
+                )
+            elif not low and address in self.low:
+                self.low.discard(address)
+                messages.append(
+                    _mb.build(
+                        MessageLevel.INFO,
+                        f"{role} address {address} has enough gas again "
+                        f"({balance / 1e18:.2f} left)",
+                    )
+                )
+
+        return messages
+
+    def observe(self, address: ChecksumAddress, voting_round_id: int, balance: int):
+        observations = self.observations.setdefault(address, deque(maxlen=SPEND_WINDOW))
+        # a top up, spend before it says nothing about the new balance
+        if observations and balance > observations[-1][1]:
+            observations.clear()
+        observations.append((voting_round_id, balance))
+
+    def spend_per_round(self, address: ChecksumAddress) -> float | None:
+        observations = self.observations.get(address)
+        if not observations or len(observations) < 2:
+            return None
+
+        (first_round, first), (last_round, last) = observations[0], observations[-1]
+        if last_round == first_round:
+            return None
+        return (first - last) / (last_round - first_round)
+
+    def runway(self, address: ChecksumAddress) -> float | None:
+        """Rounds until the balance runs out at the observed spend."""
+        observations = self.observations.get(address)
+        if observations and observations[-1][1] == 0:
+            return 0.0
+
+        spend = self.spend_per_round(address)
+        if spend is None:
+            return None
+        if spend <= 0:
+            return float("inf")
+        return observations[-1][1] / spend  # type: ignore
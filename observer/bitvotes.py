@@ -0,0 +1,102 @@
+from collections import Counter
+from typing import Self
+
+from attrs import frozen
+from eth_typing import ChecksumAddress
+
+from .reward_epoch_manager import Entity, VotingRound
+
+
+def to_bitset(bit_vector: list[bool]) -> int:
+    # request i is bit i
+    return int("".join("1" if b else "0" for b in reversed(bit_vector)) or "0", 2)
+
+
+def indices(bitset: int) -> list[int]:
+    return [i for i, b in enumerate(reversed(bin(bitset)[2:])) if b == "1"]
+
+
+@frozen
+class RoundBitvotes:
+    """
+    Fdc submit2 bitvotes of all entities in a voting round as integer bitsets
+    and the consensus bitvote derived from them.
+    """
+
+    voting_round_id: int
+    # number of requests most of the weight voted on
+    number_of_requests: int
+    votes: dict[ChecksumAddress, int]
+    lengths: dict[ChecksumAddress, int]
+    # largest set of requests, taken in order of support, that more than half
+    # of the weight voted for in full
+    consensus: int
+    # the fdc result of the round was relayed on chain, so the voters reached the
+    # consensus this rebuilds
+    confirmed: bool
+
+    @classmethod
+    def from_round(cls, round: VotingRound, entities: list[Entity]) -> Self:
+        epoch = round.voting_epoch
+        reveal = range(epoch.next.start_s, epoch.next.reveal_deadline())
+
+        weights = {e.identity_address: e.normalized_weight for e in entities}
+        threshold = sum(weights.values()) / 2
+
+        votes: dict[ChecksumAddress, int] = {}
+        lengths: dict[ChecksumAddress, int] = {}
+        for identity in weights:
+            index = round.fdc.submit_2.by_identity.get(identity)
+            latest = index.latest(epoch.id, reveal) if index is not None else None
+            if latest is not None:
+                payload = latest[0].payload
+                votes[identity] = to_bitset(payload.bit_vector)
+                lengths[identity] = payload.number_of_requests
+
+        by_length: Counter[int] = Counter()
+        for identity, length in lengths.items():
+            by_length[length] += weights[identity]
+        number_of_requests = max(by_length, key=by_length.__getitem__, default=0)
+
+        # only votes on the agreed number of requests count towards consensus
+        counted = {
+            identity: vote
+            for identity, vote in votes.items()
+            if lengths[identity] == number_of_requests
+        }
+
+        support = [
+            (sum(weights[i] for i, v in counted.items() if v >> r & 1), r)
+            for r in range(number_of_requests)
+        ]
+        consensus = 0
+        for weight, r in sorted(support, key=lambda s: (-s[0], s[1])):
+            if weight <= threshold:
+                break
+            candidate = consensus | 1 << r
+            dominating = sum(
+                weights[i] for i, v in counted.items() if v & candidate == candidate
+            )
+            if dominating > threshold:
+                consensus = candidate
+
+        return cls(
+            voting_round_id=epoch.id,
+            number_of_requests=number_of_requests,
+            votes=votes,
+            lengths=lengths,
+            consensus=consensus,
+            confirmed=round.fdc.finalization is not None,
+        )
+
+    def dominates(self, identity_address: ChecksumAddress) -> bool:
+        vote = self.votes.get(identity_address, 0)
+        return vote & self.consensus == self.consensus
+
+    def missing(self, identity_address: ChecksumAddress) -> list[int]:
+        """Requests in the consensus the entity did not vote for."""
+        return indices(self.consensus & ~self.votes.get(identity_address, 0))
+
+    def unconfirmed(self, identity_address: ChecksumAddress) -> list[int]:
+        """Requests the entity voted for that did not make the consensus."""
+        return indices(self.votes.get(identity_address, 0) & ~self.consensus)
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from heapq import heappop, heappush
+
+from attrs import define, field
+from py_flare_common.fsp.epoch.epoch import VotingEpoch
+
+from .types import ProtocolMessageRelayed
+
+LOGGER = logging.getLogger(__name__)
+
+
+# phases of a round checked as soon as their window closed, before the round
+# completes, by protocol
+PHASES = {100: ("submit1", "submit2", "signatures"), 200: ("submit2", "signatures")}
+
+
+def submit_1_window(epoch: VotingEpoch) -> range:
+    return range(epoch.start_s, epoch.end_s)
+
+
+def submit_2_window(epoch: VotingEpoch) -> range:
+    return range(epoch.next.start_s, epoch.next.reveal_deadline())
+
+
+def signatures_window(
+    epoch: VotingEpoch, finalization: ProtocolMessageRelayed | None
+) -> range:
+    # grace period lasts at least 55s into the next round and until finalization
+    return range(
+        epoch.next.reveal_deadline(),
+        max(
+            epoch.next.start_s + 55 + 1,
+            (finalization and finalization.timestamp + 1) or 0,
+        ),
+    )
+
+
+def earliest_deadlines(epoch: VotingEpoch) -> dict[str, int]:
+    """Deadlines of the phases of a round, before anything is known about it."""
+    return {
+        "submit1": submit_1_window(epoch).stop,
+        "submit2": submit_2_window(epoch).stop,
+        "signatures": signatures_window(epoch, None).stop,
+    }
+
+
+@define
+class DeadlineScheduler:
+    """
+    Calls callback(epoch, phase, deadline) a configured number of seconds
+    before each phase deadline of every voting round passed to schedule. The
+    calls are timers on the event loop, so they happen between blocks too.
+
+    A call only happens once the processed blocks reached the time of the
+    warning, transactions in blocks the observer is behind on would be warned
+    about otherwise. Until then it is deferred, and dropped if the deadline
+    passed by the time processing got there.
+    """
+
+    # seconds before the deadline of each phase, 0 disables the phase
+    leads: dict[str, int]
+    callback: Callable[[VotingEpoch, str, int], None]
+
+    # voting round id timers were last scheduled for
+    scheduled: int | None = None
+    # timestamp of the last processed block
+    head: int | None = None
+    # min-heap of (time of the warning, epoch, phase, deadline) of fired timers
+    # waiting for processing to reach them
+    deferred: list[tuple[int, VotingEpoch, str, int]] = field(factory=list)
+
+    def schedule(self, epoch: VotingEpoch) -> None:
+        """Schedule the phases of epoch unless they already are."""
+        if self.scheduled is not None and epoch.id <= self.scheduled:
+            return
+        self.scheduled = epoch.id
+
+        loop = asyncio.get_running_loop()
+        now = time.time()
+        for phase, deadline in earliest_deadlines(epoch).items():
+            lead = self.leads.get(phase, 0)
+            # too late to warn, the phase is checked at its deadline anyway
+            if not lead or deadline - lead <= now:
+                continue
+
+            loop.call_later(deadline - lead - now, self._fire, epoch, phase, deadline)
+
+    def processed(self, ts: int) -> None:
+        """Make the calls deferred until a block at ts was processed."""
+        self.head = ts
+        while self.deferred and self.deferred[0][0] <= ts:
+            _, epoch, phase, deadline = heappop(self.deferred)
+            # too late to warn, the phase is checked at its deadline
+            if time.time() < deadline:
+                self._call(epoch, phase, deadline)
+
+    def _fire(self, epoch: VotingEpoch, phase: str, deadline: int) -> None:
+        at = deadline - self.leads[phase]
+        if self.head is None or self.head < at:
+            heappush(self.deferred, (at, epoch, phase, deadline))
+            return
+        self._call(epoch, phase, deadline)
+
+    def _call(self, epoch: VotingEpoch, phase: str, deadline: int) -> None:
+        try:
+            self.callback(epoch, phase, deadline)
+        except Exception as e:
+            LOGGER.exception(f"deadline warning for {phase} of {epoch.id}: {e}")
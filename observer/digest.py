@@ -0,0 +1,54 @@
+from attrs import define, field
+from eth_typing import ChecksumAddress
+
+from .message import Message, MessageLevel
+
+type DigestKey = tuple[int | None, ChecksumAddress | None, MessageLevel]
+
+
+@define
+class MessageCoalescer:
+    # seconds a digest stays open before it is flushed, 0 disables coalescing
+    window: float
+
+    pending: dict[DigestKey, list[Message]] = field(factory=dict)
+    opened_at: dict[DigestKey, float] = field(factory=dict)
+
+    @staticmethod
+    def key(message: Message) -> DigestKey:
+        return (message.round, message.identity_address, message.level)
+
+    def add(self, message: Message, now: float) -> list[list[Message]]:
+        """
+        Queue a message and return batches that are ready to be sent right away.
+        Critical messages bypass the window and are never held back.
+        """
+        if self.window <= 0 or message.level == MessageLevel.CRITICAL:
+            return [[message]]
+
+        key = self.key(message)
+        if key not in self.pending:
+            self.pending[key] = []
+            self.opened_at[key] = now
+        self.pending[key].append(message)
+
+        return []
+
+    def flush(self, now: float, force: bool = False) -> list[list[Message]]:
+        """
+        Return digests whose window elapsed (or all of them if force is set),
+        ordered by round and level.
+        """
+        due = [
+            k
+            for k, opened in self.opened_at.items()
+            if force or now - opened >= self.window
+        ]
+        due.sort(key=lambda k: (k[0] or 0, k[2].value))
+
+        batches = []
+        for k in due:
+            self.opened_at.pop(k)
+            batches.append(self.pending.pop(k))
+
+        return batches
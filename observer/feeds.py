@@ -0,0 +1,129 @@
+from typing import Self
+
+import numpy as np
+from attrs import frozen
+from eth_typing import ChecksumAddress
+
+from .reward_epoch_manager import Entity, VotingRound
+
+# a value is an outlier if it is further from the weighted median than this many
+# interquartile ranges, and further than the minimal relative band
+OUTLIER_IQR_FACTOR = 3.0
+OUTLIER_MIN_BAND = 0.005
+# a value is stale if it did not change for this many consecutive rounds while
+# the median did
+STALE_ROUNDS = 10
+
+
+def weighted_quantiles(
+    values: np.ndarray, weights: np.ndarray, quantiles: list[float]
+) -> list[np.ndarray]:
+    """
+    Per column weighted quantiles of a (rows x columns) matrix, nan values are
+    ignored. Columns without any value get nan.
+    """
+    columns = np.arange(values.shape[1])
+    # nan sorts last and gets zero weight
+    order = np.argsort(values, axis=0)
+    ordered = np.take_along_axis(values, order, axis=0)
+    cumulative = np.cumsum(np.where(np.isnan(ordered), 0, weights[order]), axis=0)
+    total = cumulative[-1]
+
+    result = []
+    for q in quantiles:
+        i = np.argmax(cumulative >= q * total, axis=0)
+        result.append(np.where(total > 0, ordered[i, columns], np.nan))
+    return result
+
+
+@frozen
+class RoundFeeds:
+    """
+    Submit2 feed values revealed by all entities in a voting round as an
+    (entities x feeds) matrix with nan for None or missing values.
+    """
+
+    voting_round_id: int
+    rows: dict[ChecksumAddress, int]
+    values: np.ndarray
+    median: np.ndarray
+    q1: np.ndarray
+    q3: np.ndarray
+
+    # consecutive rounds each value and each median stayed the same
+    unchanged: np.ndarray
+    median_unchanged: np.ndarray
+
+    @classmethod
+    def from_round(
+        cls, round: VotingRound, entities: list[Entity], previous: Self | None = None
+    ) -> Self:
+        epoch = round.voting_epoch
+        reveal = range(epoch.next.start_s, epoch.next.reveal_deadline())
+
+        rows = {e.identity_address: i for i, e in enumerate(entities)}
+        weights = np.array([e.normalized_weight for e in entities], dtype=float)
+
+        revealed: list[list[int | None]] = [[] for _ in entities]
+        for e, i in rows.items():
+            index = round.ftso.submit_2.by_identity.get(e)
+            latest = index.latest(epoch.id, reveal) if index is not None else None
+            if latest is not None:
+                revealed[i] = latest[0].payload.values
+
+        values = np.full((len(entities), max(map(len, revealed), default=0)), np.nan)
+        for i, v in enumerate(revealed):
+            # numpy converts None to nan for float arrays
+            values[i, : len(v)] = v
+
+        q1, median, q3 = weighted_quantiles(values, weights, [0.25, 0.5, 0.75])
+
+        unchanged = np.zeros(values.shape, dtype=int)
+        median_unchanged = np.zeros(values.shape[1], dtype=int)
+        if previous is not None:
+            feeds = min(values.shape[1], previous.values.shape[1])
+            prev = np.array([previous.rows.get(e, -1) for e in rows], dtype=int)
+            found = prev >= 0
+
+            same = np.zeros(values.shape, dtype=bool)
+            same[found, :feeds] = (
+                values[found, :feeds] == previous.values[prev[found], :feeds]
+            )
+            unchanged[found, :feeds] = previous.unchanged[prev[found], :feeds]
+            unchanged = np.where(same, unchanged + 1, 0)
+
+            same_median = median[:feeds] == previous.median[:feeds]
+            median_unchanged[:feeds] = np.where(
+                same_median, previous.median_unchanged[:feeds] + 1, 0
+            )
+
+        return cls(
+            voting_round_id=epoch.id,
+            rows=rows,
+            values=values,
+            median=median,
+            q1=q1,
+            q3=q3,
+            unchanged=unchanged,
+            median_unchanged=median_unchanged,
+        )
+
+    def deviation(self, identity_address: ChecksumAddress) -> np.ndarray:
+        """Relative deviation of the entity's values from the median."""
+        row = self.values[self.rows[identity_address]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (row - self.median) / np.abs(self.median)
+
+    def outliers(self, identity_address: ChecksumAddress) -> list[int]:
+        row = self.values[self.rows[identity_address]]
+        band = np.maximum(
+            OUTLIER_IQR_FACTOR * (self.q3 - self.q1),
+            OUTLIER_MIN_BAND * np.abs(self.median),
+        )
+        return np.flatnonzero(np.abs(row - self.median) > band).tolist()
+
+    def stale(self, identity_address: ChecksumAddress) -> list[int]:
+        unchanged = self.unchanged[self.rows[identity_address]]
+        return np.flatnonzero(
+            (unchanged >= STALE_ROUNDS) & (self.median_unchanged < unchanged)
+        ).tolist()
@@ -0,0 +1,143 @@
+import sqlite3
+from typing import Self
+
+from attrs import define, frozen
+from eth_typing import ChecksumAddress
+
+from .message import Message
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS round_result (
+    identity_address TEXT NOT NULL,
+    protocol INTEGER NOT NULL,
+    voting_round_id INTEGER NOT NULL,
+    reward_epoch_id INTEGER NOT NULL,
+    submit_1_timestamp INTEGER,
+    submit_2_timestamp INTEGER,
+    submit_signatures_timestamp INTEGER,
+    none_indices TEXT NOT NULL,
+    signature_valid INTEGER,
+    reveal_offence INTEGER NOT NULL,
+    issues INTEGER NOT NULL,
+    max_level INTEGER NOT NULL,
+    PRIMARY KEY (identity_address, voting_round_id, protocol)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS round_result_reward_epoch
+    ON round_result (identity_address, reward_epoch_id, protocol);
+
+CREATE TABLE IF NOT EXISTS reward_epoch_summary (
+    identity_address TEXT NOT NULL,
+    reward_epoch_id INTEGER NOT NULL,
+    protocol INTEGER NOT NULL,
+    rounds INTEGER NOT NULL,
+    submit_1 INTEGER NOT NULL,
+    submit_2 INTEGER NOT NULL,
+    submit_signatures INTEGER NOT NULL,
+    none_values INTEGER NOT NULL,
+    signature_mismatches INTEGER NOT NULL,
+    reveal_offences INTEGER NOT NULL,
+    issues INTEGER NOT NULL,
+    PRIMARY KEY (identity_address, reward_epoch_id, protocol)
+) WITHOUT ROWID;
+"""
+
+INSERT_RESULT = """
+INSERT INTO round_result VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT DO NOTHING
+"""
+
+UPSERT_SUMMARY = """
+INSERT INTO reward_epoch_summary VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT DO UPDATE SET
+    rounds = rounds + 1,
+    submit_1 = submit_1 + excluded.submit_1,
+    submit_2 = submit_2 + excluded.submit_2,
+    submit_signatures = submit_signatures + excluded.submit_signatures,
+    none_values = none_values + excluded.none_values,
+    signature_mismatches = signature_mismatches + excluded.signature_mismatches,
+    reveal_offences = reveal_offences + excluded.reveal_offences,
+    issues = issues + excluded.issues
+"""
+
+
+@frozen
+class RoundResult:
+    identity_address: ChecksumAddress
+    protocol: int
+    voting_round_id: int
+
+    # timestamps of the transactions that were accepted by validation
+    submit_1_timestamp: int | None
+    submit_2_timestamp: int | None
+    submit_signatures_timestamp: int | None
+
+    none_indices: list[int]
+    # None if there was no finalization or no submit signatures to check
+    signature_valid: bool | None
+    reveal_offence: bool
+
+    issues: list[Message]
+
+
+@define
+class HistoryStore:
+    """
+    Append only sqlite store of per round validation results. Next to the raw
+    rows it keeps a per reward epoch summary that is updated on insert, so
+    aggregations over many epochs never have to scan individual rounds.
+    """
+
+    connection: sqlite3.Connection
+
+    @classmethod
+    def open(cls, path: str) -> Self:
+        connection = sqlite3.connect(path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        return cls(connection)
+
+    def insert(self, results: list[RoundResult], reward_epoch_id: int) -> None:
+        with self.connection:
+            for r in results:
+                cursor = self.connection.execute(
+                    INSERT_RESULT,
+                    (
+                        r.identity_address,
+                        r.protocol,
+                        r.voting_round_id,
+                        reward_epoch_id,
+                        r.submit_1_timestamp,
+                        r.submit_2_timestamp,
+                        r.submit_signatures_timestamp,
+                        ",".join(str(i) for i in r.none_indices),
+                        r.signature_valid,
+                        r.reveal_offence,
+                        len(r.issues),
+                        max((i.level.value for i in r.issues), default=0),
+                    ),
+                )
+
+                # round was already recorded (eg. by an overlapping backfill)
+                if cursor.rowcount == 0:
+                    continue
+
+                self.connection.execute(
+                    UPSERT_SUMMARY,
+                    (
+                        r.identity_address,
+                        reward_epoch_id,
+                        r.protocol,
+                        r.submit_1_timestamp is not None,
+                        r.submit_2_timestamp is not None,
+                        r.submit_signatures_timestamp is not None,
+                        len(r.none_indices),
+                        r.signature_valid is False,
+                        r.reveal_offence,
+                        len(r.issues),
+                    ),
+                )
+
+    def close(self) -> None:
+        self.connection.close()
@@ -0,0 +1,196 @@
+import asyncio
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from attrs import define, field
+from eth_utils.address import to_checksum_address
+from py_flare_common.fsp.epoch.factory import VotingEpochFactory
+from web3 import AsyncWeb3
+from web3.exceptions import Web3RPCError
+
+from .deadlines import earliest_deadlines
+from .message import Message, MessageLevel
+from .metrics import record_mempool_transactions
+from .registry import DispatchTables
+from .reward_epoch_manager import Entity
+
+LOGGER = logging.getLogger(__name__)
+
+# seconds a transaction may stay pending before it is reported as stuck
+STUCK_SECONDS = 30
+
+# phase each submission function belongs to
+FUNCTION_PHASES = {
+    "submit1": "submit1",
+    "submit2": "submit2",
+    "submitSignatures": "signatures",
+}
+
+
+@define
+class MempoolWatcher:
+    """
+    Polls txpool_content for transactions of the observed entity to the
+    Submission contract and reports the ones that don't get included: queued
+    behind a nonce gap, priced below the base fee, pending for long or still
+    pending shortly before their phase deadline. Every problem is reported
+    once per transaction. Times are taken from the head block, not the clock.
+    """
+
+    poll_seconds: float
+    # warn this many seconds before a phase deadline, 0 disables the phase
+    leads: dict[str, int]
+    chain_id: int
+    factory: VotingEpochFactory
+    # current entity (None if it isn't registered) and dispatch tables
+    target: Callable[[], tuple[Entity | None, DispatchTables]]
+    notify: Callable[[list[Message]], None]
+
+    # head timestamp at which each pooled transaction was first seen
+    first_seen: dict[str, int] = field(factory=dict)
+    # (transaction hash, problem) pairs that were reported
+    reported: set[tuple[str, str]] = field(factory=set)
+    task: asyncio.Task | None = None
+
+    def start(self, w: AsyncWeb3) -> None:
+        """Poll in the background of the running event loop."""
+        self.task = asyncio.create_task(self.run(w))
+
+    async def run(self, w: AsyncWeb3) -> None:
+        while True:
+            try:
+                messages = await self.poll(w)
+            except Web3RPCError as e:
+                LOGGER.warning(f"txpool not available, stopped watching it: {e}")
+                return
+            except Exception as e:
+                LOGGER.warning(f"unable to read txpool: {e}")
+            else:
+                if messages:
+                    self.notify(messages)
+
+            await asyncio.sleep(self.poll_seconds)
+
+    async def poll(self, w: AsyncWeb3) -> list[Message]:
+        entity, tables = self.target()
+        if entity is None:
+            return []
+
+        content, head = await asyncio.gather(
+            w.geth.txpool.content(), w.eth.get_block("latest")
+        )
+        assert "timestamp" in head
+        return self.inspect(
+            content, entity, tables, head["timestamp"], head.get("baseFeePerGas")
+        )
+
+    def inspect(
+        self,
+        content: Any,
+        entity: Entity,
+        tables: DispatchTables,
+        now: int,
+        base_fee: int | None,
+    ) -> list[Message]:
+        """
+        Messages for the entity's submissions in a txpool_content result, which
+        web3 passes on in the raw json-rpc encoding.
+        """
+        senders = {entity.submit_address, entity.submit_signatures_address}
+        mb = Message.builder().add(
+            network=self.chain_id, identity_address=entity.identity_address
+        )
+
+        seen = set()
+        counts = {"pending": 0, "queued": 0}
+        messages = []
+        for section in counts:
+            for sender, txs in (content.get(section) or {}).items():
+                if to_checksum_address(sender) not in senders:
+                    continue
+
+                for tx in txs.values():
+                    to = tx.get("to")
+                    if (
+                        to is None
+                        or to_checksum_address(to) != tables.submission_address
+                    ):
+                        continue
+                    function = tables.target_function_signatures.get(
+                        tx["input"].removeprefix("0x")[:8].lower()
+                    )
+                    if function is None:
+                        continue
+
+                    tx_hash = tx["hash"].lower()
+                    seen.add(tx_hash)
+                    counts[section] += 1
+                    first_seen = self.first_seen.setdefault(tx_hash, now)
+
+                    for problem, message in self.problems(
+                        tx, section, function, now - first_seen, now, base_fee
+                    ):
+                        if (tx_hash, problem) in self.reported:
+                            continue
+                        self.reported.add((tx_hash, problem))
+                        messages.append(
+                            mb.build(
+                                MessageLevel.WARNING,
+                                f"{function} transaction {tx_hash} {message}",
+                            )
+                        )
+
+        # forget transactions that left the pool
+        self.first_seen = {h: t for h, t in self.first_seen.items() if h in seen}
+        self.reported = {(h, p) for h, p in self.reported if h in seen}
+        record_mempool_transactions(counts)
+
+        return messages
+
+    def problems(
+        self,
+        tx: Any,
+        section: str,
+        function: str,
+        age: int,
+        now: int,
+        base_fee: int | None,
+    ) -> list[tuple[str, str]]:
+        problems = []
+
+        nonce = int(tx["nonce"], 16)
+        if section == "queued":
+            problems.append(
+                ("queued", f"is queued at nonce {nonce}, an earlier one is missing")
+            )
+
+        price = tx.get("maxFeePerGas", tx.get("gasPrice"))
+        price = price and int(price, 16)
+        if base_fee is not None and price is not None and price < base_fee:
+            problems.append(
+                (
+                    "underpriced",
+                    f"pays at most {price / 1e9:.2f} gwei, below the base fee of "
+                    f"{base_fee / 1e9:.2f} gwei",
+                )
+            )
+
+        if section == "pending" and age >= STUCK_SECONDS:
+            problems.append(("stuck", f"has been pending for {age}s at nonce {nonce}"))
+
+        phase = FUNCTION_PHASES[function]
+        lead = self.leads.get(phase, 0)
+        epoch = self.factory.from_timestamp(now)
+        # reveals and signatures are sent in the round after the one they are for
+        round = epoch if phase == "submit1" else epoch.previous
+        deadline = earliest_deadlines(round)[phase]
+        if lead and 0 <= deadline - now <= lead:
+            problems.append(
+                (
+                    "deadline",
+                    f"is not included yet, {deadline - now}s before the deadline",
+                )
+            )
+
+        return problems
@@ -4,6 +4,7 @@ import io
 from typing import Self
 
 from attrs import define, frozen
+from eth_typing import ChecksumAddress
 from py_flare_common.fsp.epoch.epoch import VotingEpoch
 
 from configuration.config import ChainId
@@ -22,6 +23,15 @@ class Message:
     level: MessageLevel
     message: str
 
+    # structured context the message was built with, used for grouping
+    network: int | None = None
+    round: int | None = None
+    protocol: int | None = None
+    identity_address: ChecksumAddress | None = None
+
+    # stable name of the check that produced the message, used for alert state
+    check: str | None = None
+
     @classmethod
     def builder(cls) -> "MessageBuilder":
         return MessageBuilder()
@@ -35,11 +45,12 @@ class MessageBuilder:
     network: int | None = None
     round: VotingEpoch | None = None
     protocol: int | None = None
+    identity_address: ChecksumAddress | None = None
 
     def copy(self) -> Self:
         return copy.copy(self)
 
-    def _build(self) -> Message:
+    def _build(self, check: str | None = None) -> Message:
         assert self.level is not None
         assert self.message is not None
 
@@ -61,10 +72,20 @@ class MessageBuilder:
         s.write(self.message)
 
         s.seek(0)
-        return Message(level=self.level, message=s.read())
-
-    def build(self, level: MessageLevel, message: str) -> Message:
-        return self.copy().add(level=level, message=message)._build()
+        return Message(
+            level=self.level,
+            message=s.read(),
+            network=self.network,
+            round=self.round.id if self.round is not None else None,
+            protocol=self.protocol,
+            identity_address=self.identity_address,
+            check=check,
+        )
+
+    def build(
+        self, level: MessageLevel, message: str, check: str | None = None
+    ) -> Message:
+        return self.copy().add(level=level, message=message)._build(check)
 
     def add(
         self,
@@ -73,6 +94,7 @@ class MessageBuilder:
         network: int | None = None,
         round: VotingEpoch | None = None,
         protocol: int | None = None,
+        identity_address: ChecksumAddress | None = None,
         message: str | None = None,
     ) -> Self:
         if level is not None:
@@ -87,6 +109,9 @@ class MessageBuilder:
         if protocol is not None:
             self.protocol = protocol
 
+        if identity_address is not None:
+            self.identity_address = identity_address
+
         if message is not None:
             self.message = message
 
@@ -1,43 +1,236 @@
-from prometheus_client import Counter, Gauge, start_http_server
 import logging
+from collections import OrderedDict
 
-from .message import MessageLevel
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram, start_http_server
+
+from .profiling import start_http_server_with_profiling
 
 LOGGER = logging.getLogger(__name__)
 
 # Metrics
 # General metrics
-observer_info = Gauge("observer_info", "Observer information", ["identity_address", "chain_id"])
-reward_epoch_info = Gauge("reward_epoch_info", "Current reward epoch information", ["reward_epoch_id"])
-voting_epoch_info = Gauge("voting_epoch_info", "Current voting epoch information", ["voting_epoch_id"])
+observer_info = Gauge(
+    "observer_info", "Observer information", ["identity_address", "chain_id"]
+)
+reward_epoch_info = Gauge(
+    "reward_epoch_info", "Current reward epoch information", ["reward_epoch_id"]
+)
+voting_epoch_info = Gauge(
+    "voting_epoch_info", "Current voting epoch information", ["voting_epoch_id"]
+)
+current_reward_epoch_id = Gauge("current_reward_epoch_id", "Current reward epoch id")
+current_voting_epoch_id = Gauge("current_voting_epoch_id", "Current voting epoch id")
 
 # Protocol specific metrics
-ftso_submit1_total = Counter("ftso_submit1_total", "Total FTSO submit1 transactions", ["identity_address"])
-ftso_submit2_total = Counter("ftso_submit2_total", "Total FTSO submit2 transactions", ["identity_address"])
-ftso_submit_signatures_total = Counter("ftso_submit_signatures_total", "Total FTSO submit signatures transactions", ["identity_address"])
-ftso_reveal_offence_total = Counter("ftso_reveal_offence_total", "Total FTSO reveal offences", ["identity_address"])
-ftso_none_values_total = Counter("ftso_none_values_total", "Total FTSO None values submitted", ["identity_address", "index"])
-ftso_signature_mismatch_total = Counter("ftso_signature_mismatch_total", "Total FTSO signature mismatches", ["identity_address"])
-
-fdc_submit1_total = Counter("fdc_submit1_total", "Total FDC submit1 transactions", ["identity_address"])
-fdc_submit2_total = Counter("fdc_submit2_total", "Total FDC submit2 transactions", ["identity_address"])
-fdc_submit_signatures_total = Counter("fdc_submit_signatures_total", "Total FDC submit signatures transactions", ["identity_address"])
-fdc_reveal_offence_total = Counter("fdc_reveal_offence_total", "Total FDC reveal offences", ["identity_address"])
-fdc_signature_mismatch_total = Counter("fdc_signature_mismatch_total", "Total FDC signature mismatches", ["identity_address"])
+ftso_submit1_total = Counter(
+    "ftso_submit1_total", "Total FTSO submit1 transactions", ["identity_address"]
+)
+ftso_submit2_total = Counter(
+    "ftso_submit2_total", "Total FTSO submit2 transactions", ["identity_address"]
+)
+ftso_submit_signatures_total = Counter(
+    "ftso_submit_signatures_total",
+    "Total FTSO submit signatures transactions",
+    ["identity_address"],
+)
+ftso_reveal_offence_total = Counter(
+    "ftso_reveal_offence_total", "Total FTSO reveal offences", ["identity_address"]
+)
+ftso_none_values_total = Counter(
+    "ftso_none_values_total",
+    "Total FTSO None values submitted",
+    ["identity_address", "index"],
+)
+ftso_signature_mismatch_total = Counter(
+    "ftso_signature_mismatch_total",
+    "Total FTSO signature mismatches",
+    ["identity_address"],
+)
+ftso_outlier_values_total = Counter(
+    "ftso_outlier_values_total",
+    "Total FTSO values far from the weighted median",
+    ["identity_address", "index"],
+)
+ftso_stale_values_total = Counter(
+    "ftso_stale_values_total",
+    "Total FTSO values unchanged for many rounds while the median moved",
+    ["identity_address", "index"],
+)
+ftso_feed_deviation = Gauge(
+    "ftso_feed_deviation",
+    "Relative deviation of the last FTSO value from the weighted median",
+    ["identity_address", "index"],
+)
+
+fdc_submit1_total = Counter(
+    "fdc_submit1_total", "Total FDC submit1 transactions", ["identity_address"]
+)
+fdc_submit2_total = Counter(
+    "fdc_submit2_total", "Total FDC submit2 transactions", ["identity_address"]
+)
+fdc_submit_signatures_total = Counter(
+    "fdc_submit_signatures_total",
+    "Total FDC submit signatures transactions",
+    ["identity_address"],
+)
+fdc_reveal_offence_total = Counter(
+    "fdc_reveal_offence_total", "Total FDC reveal offences", ["identity_address"]
+)
+fdc_signature_mismatch_total = Counter(
+    "fdc_signature_mismatch_total",
+    "Total FDC signature mismatches",
+    ["identity_address"],
+)
+fdc_bitvote_not_dominating_total = Counter(
+    "fdc_bitvote_not_dominating_total",
+    "Total FDC bitvotes that didn't dominate the consensus bitvote",
+    ["identity_address"],
+)
+fdc_unconfirmed_requests_total = Counter(
+    "fdc_unconfirmed_requests_total",
+    "Total FDC requests voted for that didn't make consensus",
+    ["identity_address"],
+)
 
 # Message level counters
-message_total = Counter("message_total", "Total messages by level", ["level", "identity_address"])
+message_total = Counter(
+    "message_total", "Total messages by level", ["level", "identity_address"]
+)
 
 # Entity metrics
-entity_wnat_weight = Gauge("entity_wnat_weight", "Entity WNAT weight", ["identity_address"])
-entity_wnat_capped_weight = Gauge("entity_wnat_capped_weight", "Entity WNAT capped weight", ["identity_address"])
-entity_registration_weight = Gauge("entity_registration_weight", "Entity registration weight", ["identity_address"])
-entity_normalized_weight = Gauge("entity_normalized_weight", "Entity normalized weight", ["identity_address"])
-
-def init_metrics(port=8000):
+entity_wnat_weight = Gauge(
+    "entity_wnat_weight", "Entity WNAT weight", ["identity_address"]
+)
+entity_wnat_capped_weight = Gauge(
+    "entity_wnat_capped_weight", "Entity WNAT capped weight", ["identity_address"]
+)
+entity_registration_weight = Gauge(
+    "entity_registration_weight", "Entity registration weight", ["identity_address"]
+)
+entity_normalized_weight = Gauge(
+    "entity_normalized_weight", "Entity normalized weight", ["identity_address"]
+)
+
+# Pipeline metrics
+rpc_request_duration_seconds = Histogram(
+    "rpc_request_duration_seconds", "Duration of json-rpc requests", ["method"]
+)
+block_stage_duration_seconds = Histogram(
+    "block_stage_duration_seconds", "Duration of block processing stages", ["stage"]
+)
+block_logs = Histogram(
+    "block_logs",
+    "Observed contract logs per processed block",
+    buckets=[0, 1, 2, 5, 10, 20, 50, 100, 200, 500],
+)
+block_transactions = Histogram(
+    "block_transactions",
+    "Transactions per processed block",
+    buckets=[0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000],
+)
+head_lag_blocks = Gauge(
+    "head_lag_blocks", "Blocks between the chain head and the last processed block"
+)
+head_lag_seconds = Gauge(
+    "head_lag_seconds",
+    "Seconds between now and the timestamp of the last processed block",
+)
+rounds_pending = Gauge(
+    "rounds_pending", "Voting rounds held in the voting round manager"
+)
+notification_delay_seconds = Gauge(
+    "notification_delay_seconds",
+    "Seconds from round completion to delivery of its last notification",
+)
+catching_up = Gauge(
+    "catching_up", "1 while blocks are fetched in chunks to catch up with the head"
+)
+reorgs_total = Counter(
+    "reorgs_total", "Chain reorganizations detected from parent hashes"
+)
+reorged_blocks_total = Counter(
+    "reorged_blocks_total",
+    "Processed blocks undone because they left the canonical chain",
+)
+mempool_transactions = Gauge(
+    "mempool_transactions",
+    "Submissions of the observed entity waiting in the txpool",
+    ["section"],
+)
+detection_latency_seconds = Histogram(
+    "detection_latency_seconds",
+    "Seconds from the deadline of a round phase until it was checked",
+    ["phase"],
+    buckets=[1, 2, 5, 10, 20, 30, 60, 90, 120, 300, 600],
+)
+
+# Balance metrics
+address_balance = Gauge(
+    "address_balance",
+    "Balance of an entity address in native tokens",
+    ["identity_address", "role"],
+)
+address_runway_rounds = Gauge(
+    "address_runway_rounds",
+    "Voting rounds an entity address can pay gas for at the observed spend",
+    ["identity_address", "role"],
+)
+
+# Memory metrics
+round_payloads = Gauge(
+    "round_payloads",
+    "Submission payloads held in pending voting rounds",
+    ["protocol", "submission"],
+)
+rounds_rejected_total = Counter(
+    "rounds_rejected_total",
+    "Voting round ids not held by the voting round manager",
+    ["reason"],
+)
+structure_size = Gauge(
+    "structure_size",
+    "Number of items held in long-lived in-process structures",
+    ["structure"],
+)
+
+# Label children are cached so hot paths don't look them up on every call, and
+# a gauge keeps at most MAX_CHILDREN of them so the number of series exported
+# stays bounded. The least recently used child is removed first. Counters and
+# histograms keep all of theirs, a removed one would start from zero again and
+# rate() would read that as a reset; their label values are bounded anyway.
+MAX_CHILDREN = 1000
+_children = {}
+
+
+def child(metric, *values, limit=MAX_CHILDREN):
+    """Label child of metric for values given in the order of its label names"""
+    key = tuple(str(v) for v in values)
+    children = _children.setdefault(metric, OrderedDict())
+    c = children.get(key)
+    if c is None:
+        c = children[key] = metric.labels(*key)
+        while isinstance(metric, Gauge) and len(children) > limit:
+            metric.remove(*children.popitem(last=False)[0])
+    else:
+        children.move_to_end(key)
+    return c
+
+
+def retire(metric, stale):
+    """Remove label children of metric whose label values stale returns True for"""
+    children = _children.get(metric, {})
+    for key in [k for k in children if stale(k)]:
+        del children[key]
+        metric.remove(*key)
+
+
+def init_metrics(port=8000, profiling=False):
     """Initialize and start the Prometheus metrics server"""
     try:
-        start_http_server(port)
+        if profiling:
+            start_http_server_with_profiling(port)
+        else:
+            start_http_server(port)
         LOGGER.info(f"Prometheus metrics server started on port {port}")
     except Exception as e:
         LOGGER.error(f"Failed to start Prometheus metrics server: {e}")
@@ -45,67 +238,200 @@ def init_metrics(port=8000):
 
 def update_entity_metrics(entity):
     """Update metrics for an entity"""
-    entity_wnat_weight.labels(identity_address=entity.identity_address).set(entity.w_nat_weight)
-    entity_wnat_capped_weight.labels(identity_address=entity.identity_address).set(entity.w_nat_capped_weight)
-    entity_registration_weight.labels(identity_address=entity.identity_address).set(entity.registration_weight)
-    entity_normalized_weight.labels(identity_address=entity.identity_address).set(entity.normalized_weight)
+    child(entity_wnat_weight, entity.identity_address).set(entity.w_nat_weight)
+    child(entity_wnat_capped_weight, entity.identity_address).set(
+        entity.w_nat_capped_weight
+    )
+    child(entity_registration_weight, entity.identity_address).set(
+        entity.registration_weight
+    )
+    child(entity_normalized_weight, entity.identity_address).set(
+        entity.normalized_weight
+    )
+
+
+def record_reward_epoch(reward_epoch_id):
+    """Record the current reward epoch, older epochs are removed from the info gauge"""
+    current_reward_epoch_id.set(reward_epoch_id)
+    child(reward_epoch_info, reward_epoch_id, limit=1).set(1)
+
+
+def record_voting_epoch(voting_epoch_id):
+    """Record the current voting epoch, older epochs are removed from the info gauge"""
+    current_voting_epoch_id.set(voting_epoch_id)
+    child(voting_epoch_info, voting_epoch_id, limit=1).set(1)
 
 
 def record_message(message, identity_address):
     """Record a message in the metrics"""
-    message_total.labels(level=message.level.name, identity_address=identity_address).inc()
+    child(message_total, message.level.name, identity_address).inc()
 
 
 def record_ftso_submit1(identity_address):
     """Record a FTSO submit1 transaction"""
-    ftso_submit1_total.labels(identity_address=identity_address).inc()
+    child(ftso_submit1_total, identity_address).inc()
 
 
 def record_ftso_submit2(identity_address):
     """Record a FTSO submit2 transaction"""
-    ftso_submit2_total.labels(identity_address=identity_address).inc()
+    child(ftso_submit2_total, identity_address).inc()
 
 
 def record_ftso_submit_signatures(identity_address):
     """Record a FTSO submit signatures transaction"""
-    ftso_submit_signatures_total.labels(identity_address=identity_address).inc()
+    child(ftso_submit_signatures_total, identity_address).inc()
 
 
 def record_ftso_reveal_offence(identity_address):
     """Record a FTSO reveal offence"""
-    ftso_reveal_offence_total.labels(identity_address=identity_address).inc()
+    child(ftso_reveal_offence_total, identity_address).inc()
 
 
 def record_ftso_none_value(identity_address, index):
     """Record a FTSO None value"""
-    ftso_none_values_total.labels(identity_address=identity_address, index=index).inc()
+    child(ftso_none_values_total, identity_address, index).inc()
+
+
+def record_ftso_outlier_value(identity_address, index):
+    """Record a FTSO value far from the weighted median"""
+    child(ftso_outlier_values_total, identity_address, index).inc()
+
+
+def record_ftso_stale_value(identity_address, index):
+    """Record a FTSO value that stayed the same while the median moved"""
+    child(ftso_stale_values_total, identity_address, index).inc()
+
+
+def record_ftso_feed_deviation(identity_address, deviations):
+    """Record the relative deviation of every FTSO value from the weighted median"""
+    retire(
+        ftso_feed_deviation,
+        lambda k: k[0] == identity_address and int(k[1]) >= len(deviations),
+    )
+    for index, deviation in enumerate(deviations):
+        child(ftso_feed_deviation, identity_address, index).set(deviation)
 
 
 def record_ftso_signature_mismatch(identity_address):
     """Record a FTSO signature mismatch"""
-    ftso_signature_mismatch_total.labels(identity_address=identity_address).inc()
+    child(ftso_signature_mismatch_total, identity_address).inc()
 
 
 def record_fdc_submit1(identity_address):
     """Record a FDC submit1 transaction"""
-    fdc_submit1_total.labels(identity_address=identity_address).inc()
+    child(fdc_submit1_total, identity_address).inc()
 
 
 def record_fdc_submit2(identity_address):
     """Record a FDC submit2 transaction"""
-    fdc_submit2_total.labels(identity_address=identity_address).inc()
+    child(fdc_submit2_total, identity_address).inc()
 
 
 def record_fdc_submit_signatures(identity_address):
     """Record a FDC submit signatures transaction"""
-    fdc_submit_signatures_total.labels(identity_address=identity_address).inc()
+    child(fdc_submit_signatures_total, identity_address).inc()
 
 
 def record_fdc_reveal_offence(identity_address):
     """Record a FDC reveal offence"""
-    fdc_reveal_offence_total.labels(identity_address=identity_address).inc()
+    child(fdc_reveal_offence_total, identity_address).inc()
 
 
 def record_fdc_signature_mismatch(identity_address):
     """Record a FDC signature mismatch"""
-    fdc_signature_mismatch_total.labels(identity_address=identity_address).inc()
\ No newline at end of file
+    child(fdc_signature_mismatch_total, identity_address).inc()
+
+
+def record_fdc_bitvote_not_dominating(identity_address):
+    """Record a FDC bitvote that didn't dominate the consensus bitvote"""
+    child(fdc_bitvote_not_dominating_total, identity_address).inc()
+
+
+def record_fdc_unconfirmed_requests(identity_address, requests):
+    """Record FDC requests voted for that didn't make consensus"""
+    child(fdc_unconfirmed_requests_total, identity_address).inc(requests)
+
+
+def record_rpc_request(method, seconds):
+    """Record the duration of a json-rpc request"""
+    child(rpc_request_duration_seconds, method).observe(seconds)
+
+
+def time_stage(stage):
+    """Context manager timing a block processing stage"""
+    return child(block_stage_duration_seconds, stage).time()
+
+
+def record_block(logs, transactions, lag_blocks, lag_seconds):
+    """Record counts and head lag of a processed block"""
+    block_logs.observe(logs)
+    block_transactions.observe(transactions)
+    head_lag_blocks.set(lag_blocks)
+    head_lag_seconds.set(lag_seconds)
+
+
+def record_catching_up(active):
+    """Record whether the observer is catching up with the head"""
+    catching_up.set(1 if active else 0)
+
+
+def record_reorg(depth):
+    """Record a reorganization and the number of processed blocks it undid"""
+    reorgs_total.inc()
+    reorged_blocks_total.inc(depth)
+
+
+def record_rounds_pending(rounds):
+    """Record the number of voting rounds held in memory"""
+    rounds_pending.set(rounds)
+
+
+def record_notification_delay(seconds):
+    """Record the delay between round completion and notification delivery"""
+    notification_delay_seconds.set(seconds)
+
+
+def record_detection_latency(phase, seconds):
+    """Record the delay between the deadline of a round phase and its check"""
+    child(detection_latency_seconds, phase).observe(seconds)
+
+
+def record_mempool_transactions(counts):
+    """Record the observed entity's submissions in the txpool by section"""
+    for section, count in counts.items():
+        child(mempool_transactions, section).set(count)
+
+
+def record_round_rejected(reason):
+    """Record a voting round id that was rejected or evicted"""
+    child(rounds_rejected_total, reason).inc()
+
+
+def record_balance(identity_address, role, balance, runway):
+    """Record an address balance in native tokens, converted from wei, and its runway"""
+    child(address_balance, identity_address, role).set(balance / 1e18)
+    # unknown until spend was observed over two refreshes after a top up
+    child(address_runway_rounds, identity_address, role).set(
+        runway if runway is not None else float("nan")
+    )
+
+
+def record_memory(vrm, signing_policy, alert_state, coalescer):
+    """Record the size of structures that grow while the observer runs"""
+    for protocol in ("ftso", "fdc"):
+        for submission in ("submit_1", "submit_2", "submit_signatures"):
+            n = sum(
+                len(getattr(getattr(r, protocol), submission))
+                for r in vrm.rounds.values()
+            )
+            child(round_payloads, protocol, submission).set(n)
+
+    child(structure_size, "rounds").set(len(vrm.rounds))
+    child(structure_size, "entities").set(len(signing_policy.entities))
+    child(structure_size, "alert_states").set(
+        sum(len(s) for s in alert_state.states.values())
+    )
+    child(structure_size, "digests").set(len(coalescer.pending))
+    child(structure_size, "metric_series").set(
+        sum(len(m.samples) for m in REGISTRY.collect())
+    )
@@ -2,6 +2,7 @@ from typing import Any
 
 import requests
 
+from configuration.config import ChainId
 from configuration.types import (
     NotificationDiscord,
     NotificationGeneric,
@@ -66,3 +67,36 @@ def notify_generic(
         headers={"Content-Type": "application/json"},
         json={"level": issue.level.value, "message": issue.message},
     )
+
+
+def notify_generic_batch(
+    config: NotificationGeneric, issues: list["Message"]
+) -> requests.Response | None:
+    return notify(
+        config.webhook_url,
+        "POST",
+        headers={"Content-Type": "application/json"},
+        json={
+            "level": max(i.level.value for i in issues),
+            "messages": [
+                {"level": i.level.value, "message": i.message} for i in issues
+            ],
+        },
+    )
+
+
+def format_digest(issues: list["Message"]) -> str:
+    if len(issues) == 1:
+        return issues[0].level.name + " " + issues[0].message
+
+    first = issues[0]
+
+    header = f"{first.level.name} digest ({len(issues)} messages)"
+    if first.network is not None:
+        header += f" network:{ChainId.id_to_name(first.network)}"
+    if first.round is not None:
+        header += f" round:{first.round}"
+    if first.identity_address is not None:
+        header += f" identity:{first.identity_address}"
+
+    return "\n".join([header, *(f"- {i.message}" for i in issues)])
@@ -1,10 +1,14 @@
+import asyncio
 import logging
 import time
-from typing import Self
+from collections import deque
+from typing import Any, Self
 
+from attrs import evolve
 from eth_account._utils.signing import to_standard_v
 from eth_keys.datatypes import Signature as EthSignature
-from py_flare_common.fsp.epoch.epoch import RewardEpoch
+from eth_typing import ChecksumAddress
+from py_flare_common.fsp.epoch.epoch import RewardEpoch, VotingEpoch
 from py_flare_common.fsp.messaging import (
     parse_generic_tx,
     parse_submit1_tx,
@@ -17,17 +21,23 @@ from py_flare_common.fsp.messaging.types import Signature as SSignature
 from py_flare_common.ftso.commit import commit_hash
 from web3 import AsyncWeb3
 from web3._utils.events import get_event_data
-from web3.middleware import ExtraDataToPOAMiddleware
+from web3.types import BlockData, LogReceipt, TxData
 
 from configuration.types import (
     Configuration,
+    Event,
 )
 from observer.reward_epoch_manager import (
     Entity,
+    EntityMapper,
+    ParsedPayloadMapper,
+    PayloadIndex,
     SigningPolicy,
+    SigningPolicyBuilder,
     VotingRound,
     VotingRoundManager,
     WTxData,
+    policy_for_round,
 )
 from observer.types import (
     ProtocolMessageRelayed,
@@ -39,16 +49,65 @@ from observer.types import (
     VoterRemoved,
 )
 
+from .alert_state import AlertStateStore
+from .balances import BalanceMonitor
+from .bitvotes import RoundBitvotes
+from .deadlines import (
+    PHASES,
+    DeadlineScheduler,
+    signatures_window,
+    submit_1_window,
+    submit_2_window,
+)
+from .digest import MessageCoalescer
+from .feeds import STALE_ROUNDS, RoundFeeds
+from .history import HistoryStore, RoundResult
+from .mempool import MempoolWatcher
 from .message import Message, MessageLevel
-from .notification import notify_discord, notify_generic, notify_slack, notify_telegram
 from .metrics import (
-    init_metrics, update_entity_metrics, record_message,
-    record_ftso_submit1, record_ftso_submit2, record_ftso_submit_signatures,
-    record_ftso_reveal_offence, record_ftso_none_value, record_ftso_signature_mismatch,
-    record_fdc_submit1, record_fdc_submit2, record_fdc_submit_signatures,
-    record_fdc_reveal_offence, record_fdc_signature_mismatch,
-    observer_info, reward_epoch_info, voting_epoch_info
+    init_metrics,
+    observer_info,
+    record_block,
+    record_catching_up,
+    record_detection_latency,
+    record_fdc_bitvote_not_dominating,
+    record_fdc_reveal_offence,
+    record_fdc_signature_mismatch,
+    record_fdc_submit1,
+    record_fdc_submit2,
+    record_fdc_submit_signatures,
+    record_fdc_unconfirmed_requests,
+    record_ftso_feed_deviation,
+    record_ftso_none_value,
+    record_ftso_outlier_value,
+    record_ftso_reveal_offence,
+    record_ftso_signature_mismatch,
+    record_ftso_stale_value,
+    record_ftso_submit1,
+    record_ftso_submit2,
+    record_ftso_submit_signatures,
+    record_memory,
+    record_message,
+    record_notification_delay,
+    record_reward_epoch,
+    record_rounds_pending,
+    record_voting_epoch,
+    time_stage,
+    update_entity_metrics,
+)
+from .notification import (
+    format_digest,
+    notify_discord,
+    notify_generic,
+    notify_generic_batch,
+    notify_slack,
+    notify_telegram,
 )
+from .registry import DispatchTables, check_registry
+from .reorg import BlockUndo, Chain, PolicySwap
+from .rpc import fetch_blocks, fetch_logs, make_web3
+from .status import Status, start_status_server
+from .validator import RoundRecord, Validator, ValidatorProcess
 
 LOGGER = logging.getLogger(__name__)
 logging.basicConfig(
@@ -56,6 +115,17 @@ logging.basicConfig(
     level="INFO",
 )
 
+# further behind the head than this many blocks, blocks are fetched in chunks
+# and rounds validated from them are reported in one digest per chunk
+CATCHUP_LAG = 50
+# catching up ends within this many blocks of the head, so a lag that hovers
+# around CATCHUP_LAG doesn't switch modes on every poll
+CAUGHT_UP_LAG = CATCHUP_LAG // 2
+CATCHUP_CHUNK = 500
+# concurrent requests while fetching a chunk and blocks per log request
+CATCHUP_CONCURRENCY = 16
+CATCHUP_LOG_RANGE = 30
+
 
 class Signature(EthSignature):
     @classmethod
@@ -72,11 +142,11 @@ class Signature(EthSignature):
 async def find_voter_registration_blocks(
     w: AsyncWeb3,
     current_block_id: int,
+    current_ts: int,
     reward_epoch: RewardEpoch,
 ) -> tuple[int, int]:
     # there are roughly 3600 blocks in an hour
     avg_block_time = 3600 / 3600
-    current_ts = int(time.time())
 
     # find timestamp that is more than 2h30min (=9000s) before start_of_epoch_ts
     target_start_ts = reward_epoch.start_s - 9000
@@ -109,6 +179,50 @@ async def find_voter_registration_blocks(
     return (start_block_id, end_block_id)
 
 
+async def find_block_by_timestamp(
+    w: AsyncWeb3, ts: int, lo: int = 0, hi: int | None = None
+) -> int:
+    """
+    Return the first block in [lo, hi] with timestamp >= ts, or hi + 1 if there
+    is no such block.
+    """
+    if hi is None:
+        hi = await w.eth.block_number
+
+    async def timestamp(block_id: int) -> int:
+        block = await w.eth.get_block(block_id)
+        assert "timestamp" in block
+        return block["timestamp"]
+
+    lo_ts = await timestamp(lo)
+    if ts <= lo_ts:
+        return lo
+
+    hi_ts = await timestamp(hi)
+    if ts > hi_ts:
+        return hi + 1
+
+    # invariant: timestamp(lo) < ts <= timestamp(hi)
+    step = 0
+    while hi - lo > 1:
+        # block times are close to constant so interpolating converges in a few
+        # steps, every other step bisects to bound the worst case
+        if step % 2 == 0:
+            mid = lo + (ts - lo_ts) * (hi - lo) // (hi_ts - lo_ts)
+        else:
+            mid = (lo + hi) // 2
+        mid = min(max(mid, lo + 1), hi - 1)
+        step += 1
+
+        mid_ts = await timestamp(mid)
+        if mid_ts < ts:
+            lo, lo_ts = mid, mid_ts
+        else:
+            hi, hi_ts = mid, mid_ts
+
+    return hi
+
+
 async def get_signing_policy_events(
     w: AsyncWeb3,
     config: Configuration,
@@ -187,86 +301,107 @@ async def get_signing_policy_events(
     return builder.build()
 
 
-def log_issue(config: Configuration, issue: Message):
-    LOGGER.log(issue.level.value, issue.message)
-
+def send_notifications(config: Configuration, issues: list[Message]):
     n = config.notification
+    text = format_digest(issues)
 
     if n.discord is not None:
-        notify_discord(n.discord, issue.level.name + " " + issue.message)
+        notify_discord(n.discord, text)
 
     if n.slack is not None:
-        notify_slack(n.slack, issue.level.name + " " + issue.message)
+        notify_slack(n.slack, text)
 
     if n.telegram is not None:
-        notify_telegram(n.telegram, issue.level.name + " " + issue.message)
+        notify_telegram(n.telegram, text)
 
     if n.generic is not None:
-        notify_generic(n.generic, issue)
-        
+        if len(issues) == 1:
+            notify_generic(n.generic, issues[0])
+        else:
+            notify_generic_batch(n.generic, issues)
+
+    # a round is complete once the epoch after it has ended
+    completed = [
+        config.epoch.voting_epoch(i.round).next.end_s
+        for i in issues
+        if i.round is not None
+    ]
+    if completed:
+        record_notification_delay(time.time() - min(completed))
+
+
+def log_issue(config: Configuration, issue: Message):
+    LOGGER.log(issue.level.value, issue.message)
+
     # Record in metrics
     record_message(issue, config.identity_address)
 
 
+def notify_issue(config: Configuration, coalescer: MessageCoalescer, issue: Message):
+    for batch in coalescer.add(issue, time.time()):
+        send_notifications(config, batch)
+
+
+def flush_issues(config: Configuration, coalescer: MessageCoalescer, force=False):
+    for batch in coalescer.flush(time.time(), force=force):
+        send_notifications(config, batch)
+
+
 def extract[T](
-    payloads: list[tuple[ParsedPayload[T], WTxData]],
+    payloads: PayloadIndex[T] | None,
     round: int,
     time_range: range,
 ) -> tuple[ParsedPayload[T], WTxData] | None:
-    if not payloads:
+    if payloads is None:
         return
 
-    latest: tuple[ParsedPayload[T], WTxData] | None = None
+    return payloads.latest(round, time_range)
 
-    for pl, wtx in payloads:
-        if pl.voting_round_id != round:
-            continue
-        if not (time_range.start <= wtx.timestamp < time_range.stop):
-            continue
 
-        if latest is None or wtx.timestamp > latest[1].timestamp:
-            latest = (pl, wtx)
+def submitted(
+    payloads: PayloadIndex[Any] | None, round: int, time_range: range
+) -> bool:
+    # takes the payloads of either protocol, for checks that don't read them
+    return extract(payloads, round, time_range) is not None
 
-    return latest
 
-
-def validate_ftso(round: VotingRound, entity: Entity, config: Configuration):
+def validate_ftso(
+    round: VotingRound,
+    entity: Entity,
+    config: Configuration,
+    feeds: RoundFeeds | None = None,
+) -> RoundResult:
     mb = Message.builder().add(
         network=config.chain_id,
         round=round.voting_epoch,
         protocol=100,
+        identity_address=entity.identity_address,
     )
 
     epoch = round.voting_epoch
     ftso = round.ftso
     finalization = ftso.finalization
 
-    _submit1 = ftso.submit_1.by_identity.get(entity.identity_address, [])
-    submit_1 = extract(_submit1, epoch.id, range(epoch.start_s, epoch.end_s))
+    _submit1 = ftso.submit_1.by_identity.get(entity.identity_address)
+    submit_1 = extract(_submit1, epoch.id, submit_1_window(epoch))
 
-    _submit2 = ftso.submit_2.by_identity.get(entity.identity_address, [])
-    submit_2 = extract(
-        _submit2, epoch.id, range(epoch.next.start_s, epoch.next.reveal_deadline())
-    )
+    _submit2 = ftso.submit_2.by_identity.get(entity.identity_address)
+    submit_2 = extract(_submit2, epoch.id, submit_2_window(epoch))
 
-    sig_grace = max(
-        epoch.next.start_s + 55 + 1, (finalization and finalization.timestamp + 1) or 0
-    )
-    _submit_sig = ftso.submit_signatures.by_identity.get(entity.identity_address, [])
-    submit_sig = extract(
-        _submit_sig,
-        epoch.id,
-        range(epoch.next.reveal_deadline(), sig_grace),
-    )
+    _submit_sig = ftso.submit_signatures.by_identity.get(entity.identity_address)
+    submit_sig = extract(_submit_sig, epoch.id, signatures_window(epoch, finalization))
 
     # TODO:(matej) check for transactions that happened too late (or too early)
 
     issues = []
+    indices = []
+    reveal_offence = False
+    signature_valid = None
 
     s1 = submit_1 is not None
     s2 = submit_2 is not None
     ss = submit_sig is not None
-    
+
     # Record metrics for transaction presence
     if s1:
         record_ftso_submit1(entity.identity_address)
@@ -276,31 +411,66 @@ def validate_ftso(round: VotingRound, entity: Entity, config: Configuration):
         record_ftso_submit_signatures(entity.identity_address)
 
     if not s1:
-        issues.append(mb.build(MessageLevel.INFO, "no submit1 transaction"))
+        issues.append(
+            mb.build(MessageLevel.INFO, "no submit1 transaction", "submit1_missing")
+        )
 
     if s1 and not s2:
         issues.append(
             mb.build(
-                MessageLevel.CRITICAL, "no submit2 transaction, causing reveal offence"
+                MessageLevel.CRITICAL,
+                "no submit2 transaction, causing reveal offence",
+                "submit2_missing",
             )
         )
+        reveal_offence = True
         record_ftso_reveal_offence(entity.identity_address)
 
     if s2:
-        indices = [
-            str(i) for i, v in enumerate(submit_2[0].payload.values) if v is None
-        ]
+        indices = [i for i, v in enumerate(submit_2[0].payload.values) if v is None]
 
         if indices:
             issues.append(
                 mb.build(
                     MessageLevel.WARNING,
-                    f"submit 2 had 'None' on indices {', '.join(indices)}",
+                    f"submit 2 had 'None' on indices {', '.join(map(str, indices))}",
+                    "none_values",
                 )
             )
             for index in indices:
                 record_ftso_none_value(entity.identity_address, index)
 
+    if s2 and feeds is not None and entity.identity_address in feeds.rows:
+        outliers = feeds.outliers(entity.identity_address)
+        if outliers:
+            issues.append(
+                mb.build(
+                    MessageLevel.WARNING,
+                    "submit 2 values far from the median on indices "
+                    f"{', '.join(map(str, outliers))}",
+                    "outlier_values",
+                )
+            )
+            for index in outliers:
+                record_ftso_outlier_value(entity.identity_address, index)
+
+        stale = feeds.stale(entity.identity_address)
+        if stale:
+            issues.append(
+                mb.build(
+                    MessageLevel.WARNING,
+                    f"submit 2 values unchanged for {STALE_ROUNDS} or more rounds "
+                    f"while the median moved on indices {', '.join(map(str, stale))}",
+                    "stale_values",
+                )
+            )
+            for index in stale:
+                record_ftso_stale_value(entity.identity_address, index)
+
+        record_ftso_feed_deviation(
+            entity.identity_address, feeds.deviation(entity.identity_address)
+        )
+
     if s1 and s2:
         # TODO:(matej) should just build back from parsed message
         bp = ByteParser(parse_generic_tx(submit_2[1].input).ftso.payload)  # type: ignore
@@ -314,13 +484,19 @@ def validate_ftso(round: VotingRound, entity: Entity, config: Configuration):
                 mb.build(
                     MessageLevel.CRITICAL,
                     "commit hash and reveal didn't match, causing reveal offence",
+                    "commit_mismatch",
                 ),
             )
+            reveal_offence = True
             record_ftso_reveal_offence(entity.identity_address)
 
     if not ss:
         issues.append(
-            mb.build(MessageLevel.ERROR, "no submit signatures transaction"),
+            mb.build(
+                MessageLevel.ERROR,
+                "no submit signatures transaction",
+                "submit_signatures_missing",
+            ),
         )
 
     if finalization and ss:
@@ -329,46 +505,56 @@ def validate_ftso(round: VotingRound, entity: Entity, config: Configuration):
             finalization.to_message()
         ).to_checksum_address()
 
-        if addr != entity.signing_policy_address:
+        signature_valid = addr == entity.signing_policy_address
+        if not signature_valid:
             issues.append(
                 mb.build(
                     MessageLevel.ERROR,
                     "submit signatures signature doesn't match finalization",
+                    "signature_mismatch",
                 ),
             )
             record_ftso_signature_mismatch(entity.identity_address)
 
-    return issues
+    return RoundResult(
+        identity_address=entity.identity_address,
+        protocol=100,
+        voting_round_id=epoch.id,
+        submit_1_timestamp=submit_1[1].timestamp if submit_1 else None,
+        submit_2_timestamp=submit_2[1].timestamp if submit_2 else None,
+        submit_signatures_timestamp=submit_sig[1].timestamp if submit_sig else None,
+        none_indices=indices,
+        signature_valid=signature_valid,
+        reveal_offence=reveal_offence,
+        issues=issues,
+    )
 
 
-def validate_fdc(round: VotingRound, entity: Entity, config: Configuration):
+def validate_fdc(
+    round: VotingRound,
+    entity: Entity,
+    config: Configuration,
+    bitvotes: RoundBitvotes | None = None,
+) -> RoundResult:
     mb = Message.builder().add(
         network=config.chain_id,
         round=round.voting_epoch,
         protocol=200,
+        identity_address=entity.identity_address,
     )
 
     epoch = round.voting_epoch
     fdc = round.fdc
     finalization = fdc.finalization
 
-    _submit1 = fdc.submit_1.by_identity.get(entity.identity_address, [])
-    submit_1 = extract(_submit1, epoch.id, range(epoch.start_s, epoch.end_s))
+    _submit1 = fdc.submit_1.by_identity.get(entity.identity_address)
+    submit_1 = extract(_submit1, epoch.id, submit_1_window(epoch))
 
-    _submit2 = fdc.submit_2.by_identity.get(entity.identity_address, [])
-    submit_2 = extract(
-        _submit2, epoch.id, range(epoch.next.start_s, epoch.next.reveal_deadline())
-    )
+    _submit2 = fdc.submit_2.by_identity.get(entity.identity_address)
+    submit_2 = extract(_submit2, epoch.id, submit_2_window(epoch))
 
-    sig_grace = max(
-        epoch.next.start_s + 55 + 1, (finalization and finalization.timestamp + 1) or 0
-    )
-    _submit_sig = fdc.submit_signatures.by_identity.get(entity.identity_address, [])
-    submit_sig = extract(
-        _submit_sig,
-        epoch.id,
-        range(epoch.next.reveal_deadline(), sig_grace),
-    )
+    _submit_sig = fdc.submit_signatures.by_identity.get(entity.identity_address)
+    submit_sig = extract(_submit_sig, epoch.id, signatures_window(epoch, finalization))
     submit_sig_deadline = extract(
         _submit_sig,
         epoch.id,
@@ -378,12 +564,14 @@ def validate_fdc(round: VotingRound, entity: Entity, config: Configuration):
     # TODO:(matej) check for transactions that happened too late (or too early)
 
     issues = []
+    reveal_offence = False
+    signature_valid = None
 
     s1 = submit_1 is not None
     s2 = submit_2 is not None
     ss = submit_sig is not None
     ssd = submit_sig_deadline is not None
-    
+
     # Record metrics for transaction presence
     if s1:
         record_fdc_submit1(entity.identity_address)
@@ -397,23 +585,62 @@ def validate_fdc(round: VotingRound, entity: Entity, config: Configuration):
         pass
 
     if not s2:
-        issues.append(mb.build(MessageLevel.ERROR, "no submit2 transaction"))
+        issues.append(
+            mb.build(MessageLevel.ERROR, "no submit2 transaction", "submit2_missing")
+        )
 
-    if s2:
-        # TODO:(matej) analize request array and report unproven errors
-        ...
+    # signatures are only required if the bitvote dominated the consensus, which
+    # can only be ruled out against a consensus confirmed on chain
+    dominated = True
+    if s2 and bitvotes is not None:
+        identity = entity.identity_address
+        length = submit_2[0].payload.number_of_requests
+
+        if length != bitvotes.number_of_requests:
+            issues.append(
+                mb.build(
+                    MessageLevel.ERROR,
+                    f"submit 2 bitvote has length {length}, "
+                    f"consensus length is {bitvotes.number_of_requests}",
+                    "bitvote_length",
+                )
+            )
+        elif identity in bitvotes.votes and not bitvotes.dominates(identity):
+            dominated = not bitvotes.confirmed
+            issues.append(
+                mb.build(
+                    MessageLevel.ERROR,
+                    "submit 2 bitvote didn't dominate consensus bitvote, missing "
+                    f"requests {', '.join(map(str, bitvotes.missing(identity)))}",
+                    "bitvote_not_dominating",
+                )
+            )
+            record_fdc_bitvote_not_dominating(identity)
 
-    if s2 and not ssd:
-        # TODO:(matej) check if submit2 bitvote dominated consensus bitvote
+        unconfirmed = bitvotes.unconfirmed(identity)
+        if length == bitvotes.number_of_requests and unconfirmed:
+            issues.append(
+                mb.build(
+                    MessageLevel.WARNING,
+                    "submit 2 bitvote voted for requests that didn't make "
+                    f"consensus {', '.join(map(str, unconfirmed))}",
+                    "unconfirmed_requests",
+                )
+            )
+            record_fdc_unconfirmed_requests(identity, len(unconfirmed))
+
+    if s2 and dominated and not ssd:
         issues.append(
             mb.build(
                 MessageLevel.CRITICAL,
                 "no submit signatures transaction, causing reveal offence",
+                "reveal_offence",
             )
         )
+        reveal_offence = True
         record_fdc_reveal_offence(entity.identity_address)
 
-    if s2 and ssd and not ss:
+    if s2 and dominated and ssd and not ss:
         issues.append(
             mb.build(
                 MessageLevel.ERROR,
@@ -421,13 +648,18 @@ def validate_fdc(round: VotingRound, entity: Entity, config: Configuration):
                     "no submit signatures transaction during grace period, "
                     "causing loss of rewards"
                 ),
+                "grace_period_missed",
             )
         )
         record_fdc_reveal_offence(entity.identity_address)
 
     if not s2 and not ss:
         issues.append(
-            mb.build(MessageLevel.ERROR, "no submit signatures transaction"),
+            mb.build(
+                MessageLevel.ERROR,
+                "no submit signatures transaction",
+                "submit_signatures_missing",
+            ),
         )
 
     if finalization and ss:
@@ -436,26 +668,414 @@ def validate_fdc(round: VotingRound, entity: Entity, config: Configuration):
             finalization.to_message()
         ).to_checksum_address()
 
-        if addr != entity.signing_policy_address:
+        signature_valid = addr == entity.signing_policy_address
+        if not signature_valid:
             issues.append(
                 mb.build(
                     MessageLevel.ERROR,
                     "submit signatures signature doesn't match finalization",
+                    "signature_mismatch",
                 )
             )
             record_fdc_signature_mismatch(entity.identity_address)
 
-    return issues
+    return RoundResult(
+        identity_address=entity.identity_address,
+        protocol=200,
+        voting_round_id=epoch.id,
+        submit_1_timestamp=submit_1[1].timestamp if submit_1 else None,
+        submit_2_timestamp=submit_2[1].timestamp if submit_2 else None,
+        submit_signatures_timestamp=submit_sig[1].timestamp if submit_sig else None,
+        none_indices=[],
+        signature_valid=signature_valid,
+        reveal_offence=reveal_offence,
+        issues=issues,
+    )
+
+
+def validate_round(
+    round: VotingRound,
+    entity: Entity,
+    config: Configuration,
+    feeds: RoundFeeds | None = None,
+    bitvotes: RoundBitvotes | None = None,
+) -> list[RoundResult]:
+    return [
+        validate_ftso(round, entity, config, feeds),
+        validate_fdc(round, entity, config, bitvotes),
+    ]
+
+
+def round_record(
+    round: VotingRound, policies: list[SigningPolicy], identity: ChecksumAddress
+) -> tuple[int, RoundRecord] | None:
+    """
+    Reward epoch id and record of a completed round, with the signing policy
+    that was active in it. None if identity was not registered in that policy.
+    """
+    policy = policy_for_round(policies, round.voting_epoch.id)
+    if policy is None:
+        return None
+    entity = policy.entity_mapper.by_identity_address.get(identity)
+    if entity is None:
+        return None
+    return policy.reward_epoch.id, RoundRecord(round, entity, policy.entities)
+
+
+def drop_finished_policies(policies: list[SigningPolicy], finalized: int) -> None:
+    """Drop policies whose rounds all completed, the latest one is kept."""
+    while len(policies) > 1 and policies[1].start_voting_round <= finalized + 1:
+        del policies[0]
+
+
+def phase_deadline(round: VotingRound, protocol: int, phase: str) -> int | None:
+    """End of the window of a phase, None while it is not known yet."""
+    epoch = round.voting_epoch
+    match phase:
+        case "submit1":
+            return submit_1_window(epoch).stop
+        case "submit2":
+            return submit_2_window(epoch).stop
+        case _:
+            p = round.ftso if protocol == 100 else round.fdc
+            # the grace period is extended until the finalization
+            if p.finalization is None:
+                return None
+            return signatures_window(epoch, p.finalization).stop
+
+
+def validate_phase(
+    round: VotingRound,
+    entity: Entity,
+    config: Configuration,
+    protocol: int,
+    phase: str,
+) -> list[Message]:
+    """
+    Missing transaction issues of a phase whose window closed. They are the
+    same validate_ftso and validate_fdc report once the round completes.
+    """
+    mb = Message.builder().add(
+        network=config.chain_id,
+        round=round.voting_epoch,
+        protocol=protocol,
+        identity_address=entity.identity_address,
+    )
+
+    epoch = round.voting_epoch
+    p = round.ftso if protocol == 100 else round.fdc
+
+    _submit1 = p.submit_1.by_identity.get(entity.identity_address)
+    s1 = submitted(_submit1, epoch.id, submit_1_window(epoch))
+
+    _submit2 = p.submit_2.by_identity.get(entity.identity_address)
+    s2 = submitted(_submit2, epoch.id, submit_2_window(epoch))
+
+    match protocol, phase:
+        case 100, "submit1" if not s1:
+            return [
+                mb.build(MessageLevel.INFO, "no submit1 transaction", "submit1_missing")
+            ]
+        case 100, "submit2" if s1 and not s2:
+            return [
+                mb.build(
+                    MessageLevel.CRITICAL,
+                    "no submit2 transaction, causing reveal offence",
+                    "submit2_missing",
+                )
+            ]
+        case 200, "submit2" if not s2:
+            return [
+                mb.build(
+                    MessageLevel.ERROR, "no submit2 transaction", "submit2_missing"
+                )
+            ]
+        case _, "signatures" if protocol == 100 or not s2:
+            # fdc signatures of a submitted bitvote are checked against the
+            # consensus when the round completes
+            _submit_sig = p.submit_signatures.by_identity.get(entity.identity_address)
+            window = signatures_window(epoch, p.finalization)
+            if extract(_submit_sig, epoch.id, window) is None:
+                return [
+                    mb.build(
+                        MessageLevel.ERROR,
+                        "no submit signatures transaction",
+                        "submit_signatures_missing",
+                    )
+                ]
+
+    return []
+
+
+def check_phases(
+    vrm: VotingRoundManager, entity: Entity, config: Configuration, ts: int
+) -> list[tuple[VotingRound, int, list[Message]]]:
+    """
+    Check the phases of pending rounds whose deadline is before ts, the same
+    way finalize completes rounds, so a round completing at ts is validated
+    before any phase of the next one. Returns the ones with issues.
+    """
+    checked = []
+    for round, protocol, phase in vrm.due_phases(ts):
+        if (protocol, phase) in round.phases_checked:
+            continue
+        deadline = phase_deadline(round, protocol, phase)
+        if deadline is None or deadline >= ts:
+            # the grace period lasts until the finalization, until it is relayed
+            # the phase is checked again on the next block
+            vrm.defer_phase(round, protocol, phase, deadline or ts)
+            continue
+
+        round.phases_checked.add((protocol, phase))
+        record_detection_latency(phase, time.time() - deadline)
+        issues = validate_phase(round, entity, config, protocol, phase)
+        if issues:
+            round.reported.update((protocol, i.check) for i in issues)
+            checked.append((round, protocol, issues))
+
+    return checked
+
+
+# transaction each phase is about, for warnings
+PHASE_TRANSACTIONS = {
+    "submit1": "submit1",
+    "submit2": "submit2",
+    "signatures": "submit signatures",
+}
+
+
+def deadline_warnings(
+    vrm: VotingRoundManager,
+    entity: Entity,
+    config: Configuration,
+    alert_state: AlertStateStore,
+    epoch: VotingEpoch,
+    phase: str,
+    deadline: int,
+) -> list[Message]:
+    """
+    Warnings for transactions of a phase that are still missing before its
+    deadline. Checks that are already failing in the alert state are known
+    to the operator and not warned about.
+    """
+    round = vrm.rounds.get(epoch) or VotingRound(epoch)
+    seconds = max(0, deadline - int(time.time()))
+
+    warnings = []
+    for protocol, phases in PHASES.items():
+        if phase not in phases:
+            continue
+
+        for issue in validate_phase(round, entity, config, protocol, phase):
+            if issue.check is not None and alert_state.failing(
+                entity.identity_address, protocol, issue.check
+            ):
+                continue
+
+            warnings.append(
+                evolve(
+                    issue,
+                    level=MessageLevel.WARNING,
+                    message=f"no {PHASE_TRANSACTIONS[phase]} transaction yet, "
+                    f"{seconds}s before the deadline",
+                    check=None,
+                )
+            )
+
+    return warnings
+
+
+def process_log(
+    w: AsyncWeb3,
+    config: Configuration,
+    vrm: VotingRoundManager,
+    spb: SigningPolicyBuilder,
+    event_signatures: dict[str, Event],
+    log: LogReceipt,
+    block_data: BlockData,
+    undo: BlockUndo | None = None,
+) -> None:
+    ve = config.epoch.voting_epoch
+
+    sig = log["topics"][0]
+    if sig.hex() not in event_signatures:
+        return
+
+    event = event_signatures[sig.hex()]
+    data = get_event_data(w.eth.codec, event.abi, log)
+    match event.name:
+        case "ProtocolMessageRelayed":
+            e = ProtocolMessageRelayed.from_dict(data["args"], block_data)
+            voting_round = vrm.get(ve(e.voting_round_id))
+            protocol = None
+            if e.protocol_id == 100:
+                protocol = voting_round.ftso
+            if e.protocol_id == 200:
+                protocol = voting_round.fdc
+            if protocol is not None:
+                if undo is not None:
+                    undo.finalizations.append((protocol, protocol.finalization))
+                protocol.finalization = e
+            return
+
+        case "SigningPolicyInitialized":
+            e = SigningPolicyInitialized.from_dict(data["args"])
+        case "VoterRegistered":
+            e = VoterRegistered.from_dict(data["args"])
+        case "VoterRemoved":
+            e = VoterRemoved.from_dict(data["args"])
+        case "VoterRegistrationInfo":
+            e = VoterRegistrationInfo.from_dict(data["args"])
+        case "VotePowerBlockSelected":
+            e = VotePowerBlockSelected.from_dict(data["args"])
+        case "RandomAcquisitionStarted":
+            e = RandomAcquisitionStarted.from_dict(data["args"])
+        case _:
+            return
+
+    spb.add(e)
+    if undo is not None:
+        undo.events.append((spb, e))
+
+
+def process_transaction(
+    config: Configuration,
+    vrm: VotingRoundManager,
+    entity_mapper: EntityMapper,
+    target_function_signatures: dict[str, str],
+    tx: TxData,
+    block_data: BlockData,
+    undo: BlockUndo | None = None,
+    submission_address: ChecksumAddress | None = None,
+) -> Message | None:
+    """
+    Insert the payloads of a submission transaction into their voting rounds.
+    If submission_address is given, calls to any other contract are not
+    inserted and an error message for the sending entity is returned instead.
+    """
+    ve = config.epoch.voting_epoch
+
+    wtx = WTxData.from_tx_data(tx, block_data)
+
+    called_function_sig = wtx.input[:4].hex()
+    input = wtx.input[4:].hex()
+    sender_address = wtx.from_address
+    entity = entity_mapper.by_omni.get(sender_address)
+    if entity is None:
+        return
+
+    if called_function_sig not in target_function_signatures:
+        return
+
+    def insert(mapper: ParsedPayloadMapper, payload: ParsedPayload) -> None:
+        index = mapper.insert(entity, payload, wtx)
+        if undo is not None:
+            undo.payloads.append((index, payload, wtx))
+
+    mode = target_function_signatures[called_function_sig]
+    if submission_address is not None and wtx.to_address != submission_address:
+        return (
+            Message.builder()
+            .add(network=config.chain_id, identity_address=entity.identity_address)
+            .build(
+                MessageLevel.ERROR,
+                f"{mode} transaction {wtx.hash.to_0x_hex()} was sent to "
+                f"{wtx.to_address}, not to the Submission contract "
+                f"{submission_address}",
+            )
+        )
+
+    match mode:
+        case "submit1":
+            try:
+                parsed = parse_submit1_tx(input)
+                if parsed.ftso is not None:
+                    round = vrm.get(ve(parsed.ftso.voting_round_id))
+                    insert(round.ftso.submit_1, parsed.ftso)
+                if parsed.fdc is not None:
+                    round = vrm.get(ve(parsed.fdc.voting_round_id))
+                    insert(round.fdc.submit_1, parsed.fdc)
+            except Exception:
+                pass
+
+        case "submit2":
+            try:
+                parsed = parse_submit2_tx(input)
+                if parsed.ftso is not None:
+                    round = vrm.get(ve(parsed.ftso.voting_round_id))
+                    insert(round.ftso.submit_2, parsed.ftso)
+                if parsed.fdc is not None:
+                    round = vrm.get(ve(parsed.fdc.voting_round_id))
+                    insert(round.fdc.submit_2, parsed.fdc)
+            except Exception:
+                pass
+
+        case "submitSignatures":
+            try:
+                parsed = parse_submit_signature_tx(input)
+                if parsed.ftso is not None:
+                    round = vrm.get(ve(parsed.ftso.voting_round_id))
+                    insert(round.ftso.submit_signatures, parsed.ftso)
+                if parsed.fdc is not None:
+                    round = vrm.get(ve(parsed.fdc.voting_round_id))
+                    insert(round.fdc.submit_signatures, parsed.fdc)
+            except Exception:
+                pass
+
+
+async def fetch_chunk(
+    w: AsyncWeb3, addresses: list[ChecksumAddress], start_block: int, end_block: int
+) -> dict[int, tuple[BlockData, list[LogReceipt]]]:
+    """Blocks [start_block, end_block] with their logs, read concurrently."""
+    blocks, logs = await asyncio.gather(
+        fetch_blocks(w, start_block, end_block, CATCHUP_CONCURRENCY),
+        fetch_logs(
+            w, addresses, start_block, end_block, CATCHUP_LOG_RANGE, CATCHUP_CONCURRENCY
+        ),
+    )
+
+    logs_by_block: dict[int, list[LogReceipt]] = {}
+    for log in logs:
+        logs_by_block.setdefault(log["blockNumber"], []).append(log)
+
+    chunk = {}
+    for block_data in blocks:
+        assert "number" in block_data
+        chunk[block_data["number"]] = (
+            block_data,
+            logs_by_block.get(block_data["number"], []),
+        )
+    return chunk
+
+
+async def confirmed_block_number(w: AsyncWeb3, config: Configuration) -> int:
+    """Number of the newest block that has the configured confirmations."""
+    if isinstance(config.confirmations, str):
+        block = await w.eth.get_block(config.confirmations)
+        assert "number" in block
+        return block["number"]
+    return await w.eth.block_number - config.confirmations
 
 
 async def observer_loop(config: Configuration) -> None:
     # Initialize Prometheus metrics server on port 8000
-    init_metrics()
-    
-    w = AsyncWeb3(
-        AsyncWeb3.AsyncHTTPProvider(config.rpc_url),
-        middleware=[ExtraDataToPOAMiddleware],
+    init_metrics(profiling=config.profiling)
+
+    status = Status(config.identity_address, config.chain_id)
+    if config.status_port is not None:
+        await start_status_server(status, config.status_port)
+
+    coalescer = MessageCoalescer(config.notification.digest_window)
+    alert_state = AlertStateStore.load(
+        config.alert.state_file,
+        config.alert.escalation_rounds,
+        config.alert.suppression_rounds,
     )
+    history = None
+    if config.history_file is not None:
+        history = HistoryStore.open(config.history_file)
+
+    w = make_web3(config)
 
     # log_issue(
     #     config,
@@ -471,7 +1091,6 @@ async def observer_loop(config: Configuration) -> None:
     # return
 
     # reasignments for quick access
-    ve = config.epoch.voting_epoch
     # re = config.epoch.reward_epoch
     vef = config.epoch.voting_epoch_factory
     ref = config.epoch.reward_epoch_factory
@@ -482,10 +1101,10 @@ async def observer_loop(config: Configuration) -> None:
     assert "number" in block
     reward_epoch = ref.from_timestamp(block["timestamp"])
     voting_epoch = vef.from_timestamp(block["timestamp"])
-    
+
     # Set initial epoch metrics
-    reward_epoch_info.labels(reward_epoch_id=reward_epoch.id).set(1)
-    voting_epoch_info.labels(voting_epoch_id=voting_epoch.id).set(1)
+    record_reward_epoch(reward_epoch.id)
+    record_voting_epoch(voting_epoch.id)
 
     # we first fill signing policy for current reward epoch
 
@@ -493,7 +1112,7 @@ async def observer_loop(config: Configuration) -> None:
     # find block that has timestamp approx. 2h30min before the reward epoch
     # and block that has timestamp approx. 1h before the reward epoch
     lower_block_id, end_block_id = await find_voter_registration_blocks(
-        w, block["number"], reward_epoch
+        w, block["number"], block["timestamp"], reward_epoch
     )
 
     # get informations for events that build the current signing policy
@@ -512,25 +1131,26 @@ async def observer_loop(config: Configuration) -> None:
 
     # set up target address from config
     tia = w.to_checksum_address(config.identity_address)
-    
+
     # Set observer info metric
     observer_info.labels(identity_address=tia, chain_id=config.chain_id).set(1)
-    
-    log_issue(
-        config,
+
+    message = (
         Message.builder()
         .add(network=config.chain_id)
         .build(
             MessageLevel.INFO,
             f"Initialized observer for identity_address={tia}",
-        ),
+        )
     )
-    
+    log_issue(config, message)
+    notify_issue(config, coalescer, message)
+
     # Update entity metrics if entity exists in signing policy
     if tia in signing_policy.entity_mapper.by_identity_address:
         entity = signing_policy.entity_mapper.by_identity_address[tia]
         update_entity_metrics(entity)
-    
+
     # target_voter = signing_policy.entity_mapper.by_identity_address[tia]
     # notify_discord(
     #     config,
@@ -549,7 +1169,7 @@ async def observer_loop(config: Configuration) -> None:
     while True:
         latest_block = await w.eth.block_number
         if block_number == latest_block:
-            time.sleep(2)
+            await asyncio.sleep(2)
             continue
 
         block_number += 1
@@ -561,183 +1181,376 @@ async def observer_loop(config: Configuration) -> None:
         if _ve == voting_epoch.next:
             voting_epoch = voting_epoch.next
             # Update voting epoch metric
-            voting_epoch_info.labels(voting_epoch_id=voting_epoch.id).set(1)
+            record_voting_epoch(voting_epoch.id)
             break
 
-    vrm = VotingRoundManager(voting_epoch.previous.id)
-
-    # set up contracts and events (from config)
-    # TODO: (nejc) set this up with a function on class
-    # or contracts = attrs.asdict(config.contracts) <- this doesn't work
-    contracts = [
-        config.contracts.Relay,
-        config.contracts.VoterRegistry,
-        config.contracts.FlareSystemsManager,
-        config.contracts.FlareSystemsCalculator,
-    ]
-    event_signatures = {e.signature: e for c in contracts for e in c.events.values()}
-
-    # start listener
-    # print("Listener started from block number", block_number)
-    # check transactions for submit transactions
-    target_function_signatures = {
-        config.contracts.Submission.functions[
-            "submitSignatures"
-        ].signature: "submitSignatures",
-        config.contracts.Submission.functions["submit1"].signature: "submit1",
-        config.contracts.Submission.functions["submit2"].signature: "submit2",
+    vrm = VotingRoundManager(voting_epoch.previous.id, vef)
+    # the last round of a reward epoch completes after the next signing policy
+    # took over, so policies are kept until their rounds completed
+    policies = [signing_policy]
+    # completed rounds are validated in order, in a separate process if the
+    # validator has its own metrics port
+    validator: Validator | ValidatorProcess = Validator(config)
+    if config.validator_metrics_port is not None:
+        validator = ValidatorProcess.start(config, config.validator_metrics_port)
+    # rounds whose results were not dispatched yet, with their reward epoch id
+    validations: deque[tuple[RoundRecord, int, asyncio.Future[list[RoundResult]]]] = (
+        deque()
+    )
+    balances = BalanceMonitor(config.balance.refresh_rounds, config.balance.min_rounds)
+    # batching is a mode of the provider, a batch open in the background would take
+    # in the requests of this loop, so balances are read through their own
+    balances_w = make_web3(config)
+
+    # contracts, events and submit functions to look for, the registry is
+    # checked for moved contracts once per voting round
+    tables = DispatchTables.from_config(config)
+    registry_checked = voting_epoch.id
+
+    # hashes and undo records of processed blocks
+    chain = Chain()
+
+    def warn(epoch: VotingEpoch, phase: str, deadline: int) -> None:
+        entity = signing_policy.entity_mapper.by_identity_address.get(tia)
+        if catching_up or entity is None:
+            return
+
+        for message in deadline_warnings(
+            vrm, entity, config, alert_state, epoch, phase, deadline
+        ):
+            log_issue(config, message)
+            # sent right away, a digest window could hold it past the deadline
+            send_notifications(config, [message])
+
+    # warnings for missing transactions shortly before phase deadlines
+    leads = {
+        "submit1": config.alert.warn_before_submit1,
+        "submit2": config.alert.warn_before_submit2,
+        "signatures": config.alert.warn_before_signatures,
     }
+    deadlines = DeadlineScheduler(leads, warn)
+
+    def dispatch_validations(bulk: bool) -> None:
+        # results of validated rounds in round order, up to the first round
+        # that is still being validated
+        results = []
+        while validations and validations[0][2].done():
+            record, reward_epoch_id, future = validations.popleft()
+            r = record.round
+            try:
+                round_results = future.result()
+            except Exception as e:
+                log_issue(
+                    config,
+                    Message.builder()
+                    .add(
+                        network=config.chain_id,
+                        round=r.voting_epoch,
+                        identity_address=tia,
+                    )
+                    .build(MessageLevel.ERROR, f"validation failed: {e!r}"),
+                )
+                round_results = validator.recover(record)
+            results.extend(round_results)
+
+            for result in round_results:
+                issues = result.issues
+                for i in issues:
+                    # already logged by the phase checks
+                    if (result.protocol, i.check) not in r.reported:
+                        log_issue(config, i)
+
+                mb = Message.builder().add(
+                    network=config.chain_id,
+                    round=r.voting_epoch,
+                    protocol=result.protocol,
+                    identity_address=tia,
+                )
+                for i in alert_state.update(mb, issues):
+                    if bulk:
+                        stale.append(i)
+                    else:
+                        notify_issue(config, coalescer, i)
+
+            if history is not None:
+                history.insert(round_results, reward_epoch_id)
+
+        if results:
+            if not bulk:
+                alert_state.save()
+            status.add_results(results)
+
+    def notify_now(messages: list[Message]) -> None:
+        for message in messages:
+            log_issue(config, message)
+        send_notifications(config, messages)
+
+    def notify_balances(messages: list[Message]) -> None:
+        for message in messages:
+            log_issue(config, message)
+            notify_issue(config, coalescer, message)
+
+    # watches the txpool for submissions that don't get included
+    mempool = MempoolWatcher(
+        config.mempool_poll_seconds,
+        leads,
+        config.chain_id,
+        vef,
+        lambda: (signing_policy.entity_mapper.by_identity_address.get(tia), tables),
+        notify_now,
+    )
+    if config.mempool_poll_seconds:
+        mempool.start(w)
+
+    # blocks of the current catch up chunk that were not processed yet, and
+    # notifications of the rounds validated from it
+    chunk: dict[int, tuple[BlockData, list[LogReceipt]]] = {}
+    catching_up = False
+    stale: list[Message] = []
 
     while True:
-        latest_block = await w.eth.block_number
-        if block_number == latest_block:
-            time.sleep(2)
+        flush_issues(config, coalescer)
+
+        latest_block = await confirmed_block_number(w, config)
+        if block_number >= latest_block:
+            if validations:
+                # wake up for results of the validator while waiting for blocks
+                await asyncio.wait([f for _, _, f in validations], timeout=2)
+                dispatch_validations(catching_up)
+            else:
+                await asyncio.sleep(2)
             continue
 
-        for block in range(block_number, latest_block):
+        block = block_number
+        while block < latest_block:
             LOGGER.debug(f"processing {block}")
-            block_data = await w.eth.get_block(block, full_transactions=True)
+            lag = latest_block - block
+            bulk = (
+                block in chunk
+                or lag > CATCHUP_LAG
+                or (catching_up and lag > CAUGHT_UP_LAG)
+            )
+            if bulk != catching_up:
+                catching_up = bulk
+                record_catching_up(catching_up)
+                if catching_up:
+                    LOGGER.info(f"{lag} blocks behind, catching up")
+                else:
+                    LOGGER.info("caught up, following the head")
+
+            with time_stage("fetch"):
+                if bulk and block not in chunk:
+                    end = min(block + CATCHUP_CHUNK, latest_block) - 1
+                    addresses = [contract.address for contract in tables.contracts]
+                    chunk = await fetch_chunk(w, addresses, block, end)
+
+                if bulk:
+                    block_data, block_logs = chunk.pop(block)
+                else:
+                    block_data = await w.eth.get_block(block, full_transactions=True)
+                    block_logs = await w.eth.get_logs(
+                        {
+                            "address": [c.address for c in tables.contracts],
+                            "fromBlock": block,
+                            "toBlock": block,
+                        }
+                    )
             assert "transactions" in block_data
             assert "timestamp" in block_data
             block_ts = block_data["timestamp"]
 
+            if not chain.extends(block_data):
+                chunk.clear()
+                block, swap = await chain.rollback(w, block_data)
+                if swap is not None:
+                    # the signing policy took over in a block that left the
+                    # chain, it is built again once its first round is reached
+                    signing_policy, spb = swap.previous, swap.previous_builder
+                    start = swap.policy.start_voting_round
+                    policies[:] = [p for p in policies if p.start_voting_round < start]
+                    if not policies:
+                        policies.append(signing_policy)
+                    record_reward_epoch(signing_policy.reward_epoch.id)
+                continue
+
             voting_epoch = vef.from_timestamp(block_ts)
             # Update voting epoch metric if it changed
-            voting_epoch_info.labels(voting_epoch_id=voting_epoch.id).set(1)
+            record_voting_epoch(voting_epoch.id)
+            if not bulk:
+                deadlines.schedule(voting_epoch)
+
+            if voting_epoch.id != registry_checked:
+                registry_checked = voting_epoch.id
+                moved = await check_registry(w, config.contracts, block)
+                if moved:
+                    for name, (old, new) in moved.items():
+                        message = (
+                            Message.builder()
+                            .add(network=config.chain_id)
+                            .build(
+                                MessageLevel.WARNING,
+                                f"{name} contract moved from {old} to {new}",
+                            )
+                        )
+                        log_issue(config, message)
+                        notify_issue(config, coalescer, message)
+
+                    # swap before anything of this block is decoded, and read
+                    # it again with logs of the new contracts
+                    config = evolve(
+                        config,
+                        contracts=config.contracts.with_addresses(
+                            {name: new for name, (_, new) in moved.items()}
+                        ),
+                    )
+                    tables = DispatchTables.from_config(config)
+                    chunk.clear()
+                    continue
+
+            undo = chain.push(block_data)
 
             if (
                 spb.signing_policy_initialized is not None
-                and spb.signing_policy_initialized.start_voting_round_id == voting_epoch
+                and spb.signing_policy_initialized.start_voting_round_id
+                == voting_epoch.id
             ):
                 # TODO:(matej) this could fail if the observer is started during
                 # last two hours of the reward epoch
+                previous, previous_builder = signing_policy, spb
                 signing_policy = spb.build()
-                
+                policies.append(signing_policy)
+                undo.policy_swap = PolicySwap(
+                    signing_policy, previous, previous_builder
+                )
+
                 # Update reward epoch metric if it changed
-                reward_epoch_info.labels(reward_epoch_id=signing_policy.reward_epoch.id).set(1)
-                
+                record_reward_epoch(signing_policy.reward_epoch.id)
+
                 # Update entity metrics if target entity exists in signing policy
                 if tia in signing_policy.entity_mapper.by_identity_address:
                     entity = signing_policy.entity_mapper.by_identity_address[tia]
                     update_entity_metrics(entity)
-                
+
                 spb = SigningPolicy.builder().for_epoch(
                     signing_policy.reward_epoch.next
                 )
 
-            block_logs = await w.eth.get_logs(
-                {
-                    "address": [contract.address for contract in contracts],
-                    "fromBlock": block,
-                    "toBlock": block,
-                }
+            with time_stage("decode"):
+                for log in block_logs:
+                    process_log(
+                        w,
+                        config,
+                        vrm,
+                        spb,
+                        tables.event_signatures,
+                        log,
+                        block_data,
+                        undo,
+                    )
+
+                for tx in block_data["transactions"]:
+                    assert not isinstance(tx, bytes)
+                    issue = process_transaction(
+                        config,
+                        vrm,
+                        signing_policy.entity_mapper,
+                        tables.target_function_signatures,
+                        tx,
+                        block_data,
+                        undo,
+                        tables.submission_address,
+                    )
+                    if issue is not None and issue.identity_address == tia:
+                        log_issue(config, issue)
+                        if bulk:
+                            stale.append(issue)
+                        else:
+                            notify_issue(config, coalescer, issue)
+
+            record_block(
+                len(block_logs),
+                len(block_data["transactions"]),
+                latest_block - block,
+                time.time() - block_ts,
             )
 
-            for log in block_logs:
-                sig = log["topics"][0]
+            with time_stage("validate"):
+                rounds = vrm.finalize(block_data)
+                for r in rounds:
+                    record_detection_latency(
+                        "complete", time.time() - r.voting_epoch.next.end_s
+                    )
+                    found = round_record(r, policies, tia)
+                    if found is not None:
+                        reward_epoch_id, record = found
+                        validations.append(
+                            (record, reward_epoch_id, validator.submit(record))
+                        )
+                drop_finished_policies(policies, vrm.finalized)
+
+                # while catching up the rounds complete soon anyway, and phases
+                # wait until earlier rounds updated the alert state
+                entity = signing_policy.entity_mapper.by_identity_address.get(tia)
+                early = []
+                if (
+                    entity is not None
+                    and not bulk
+                    and all(f.done() for _, _, f in validations)
+                ):
+                    early = check_phases(vrm, entity, config, block_ts)
+            record_rounds_pending(len(vrm.rounds))
+            if rounds and not bulk:
+                record_memory(vrm, signing_policy, alert_state, coalescer)
+
+            with time_stage("dispatch"):
+                dispatch_validations(bulk)
+
+                for r, protocol, issues in early:
+                    for i in issues:
+                        log_issue(config, i)
+
+                    mb = Message.builder().add(
+                        network=config.chain_id,
+                        round=r.voting_epoch,
+                        protocol=protocol,
+                        identity_address=tia,
+                    )
+                    for i in alert_state.update_early(mb, issues):
+                        notify_issue(config, coalescer, i)
+
+                if early:
+                    alert_state.save()
+
+                # deadline warnings that waited for this block
+                deadlines.processed(block_ts)
+            status.update_block(
+                block, block_ts, latest_block - block, signing_policy, vrm
+            )
 
-                if sig.hex() in event_signatures:
-                    event = event_signatures[sig.hex()]
-                    data = get_event_data(w.eth.codec, event.abi, log)
-                    match event.name:
-                        case "ProtocolMessageRelayed":
-                            e = ProtocolMessageRelayed.from_dict(
-                                data["args"], block_data
-                            )
-                            voting_round = vrm.get(ve(e.voting_round_id))
-                            if e.protocol_id == 100:
-                                voting_round.ftso.finalization = e
-                            if e.protocol_id == 200:
-                                voting_round.fdc.finalization = e
-
-                        case "SigningPolicyInitialized":
-                            e = SigningPolicyInitialized.from_dict(data["args"])
-                            spb.add(e)
-                        case "VoterRegistered":
-                            e = VoterRegistered.from_dict(data["args"])
-                            spb.add(e)
-                        case "VoterRemoved":
-                            e = VoterRemoved.from_dict(data["args"])
-                            spb.add(e)
-                        case "VoterRegistrationInfo":
-                            e = VoterRegistrationInfo.from_dict(data["args"])
-                            spb.add(e)
-                        case "VotePowerBlockSelected":
-                            e = VotePowerBlockSelected.from_dict(data["args"])
-                            spb.add(e)
-                        case "RandomAcquisitionStarted":
-                            e = RandomAcquisitionStarted.from_dict(data["args"])
-                            spb.add(e)
-
-            for tx in block_data["transactions"]:
-                assert not isinstance(tx, bytes)
-                wtx = WTxData.from_tx_data(tx, block_data)
-
-                called_function_sig = wtx.input[:4].hex()
-                input = wtx.input[4:].hex()
-                sender_address = wtx.from_address
-                entity = signing_policy.entity_mapper.by_omni.get(sender_address)
-                if entity is None:
-                    continue
+            if bulk and not chunk:
+                # end of a catch up chunk, rounds in it completed long ago so
+                # their notifications go out as a single digest
+                if validations:
+                    await asyncio.wait([f for _, _, f in validations])
+                    dispatch_validations(bulk)
+                record_memory(vrm, signing_policy, alert_state, coalescer)
+                alert_state.save()
+                if stale:
+                    send_notifications(config, stale)
+                    stale = []
+
+            entity = signing_policy.entity_mapper.by_identity_address.get(tia)
+            if (
+                config.balance.refresh_rounds
+                and not bulk
+                and entity is not None
+                and balances.due(voting_epoch.id)
+            ):
+                mb = Message.builder().add(network=config.chain_id)
+                balances.start(
+                    balances_w, [entity], voting_epoch.id, block, mb, notify_balances
+                )
 
-                if called_function_sig in target_function_signatures:
-                    mode = target_function_signatures[called_function_sig]
-                    match mode:
-                        case "submit1":
-                            try:
-                                parsed = parse_submit1_tx(input)
-                                if parsed.ftso is not None:
-                                    vrm.get(
-                                        ve(parsed.ftso.voting_round_id)
-                                    ).ftso.insert_submit_1(entity, parsed.ftso, wtx)
-                                if parsed.fdc is not None:
-                                    vrm.get(
-                                        ve(parsed.fdc.voting_round_id)
-                                    ).fdc.insert_submit_1(entity, parsed.fdc, wtx)
-                            except Exception:
-                                pass
-
-                        case "submit2":
-                            try:
-                                parsed = parse_submit2_tx(input)
-                                if parsed.ftso is not None:
-                                    vrm.get(
-                                        ve(parsed.ftso.voting_round_id)
-                                    ).ftso.insert_submit_2(entity, parsed.ftso, wtx)
-                                if parsed.fdc is not None:
-                                    vrm.get(
-                                        ve(parsed.fdc.voting_round_id)
-                                    ).fdc.insert_submit_2(entity, parsed.fdc, wtx)
-                            except Exception:
-                                pass
-
-                        case "submitSignatures":
-                            try:
-                                parsed = parse_submit_signature_tx(input)
-                                if parsed.ftso is not None:
-                                    vrm.get(
-                                        ve(parsed.ftso.voting_round_id)
-                                    ).ftso.insert_submit_signatures(
-                                        entity, parsed.ftso, wtx
-                                    )
-                                if parsed.fdc is not None:
-                                    vrm.get(
-                                        ve(parsed.fdc.voting_round_id)
-                                    ).fdc.insert_submit_signatures(
-                                        entity, parsed.fdc, wtx
-                                    )
-                            except Exception:
-                                pass
-
-            rounds = vrm.finalize(block_data)
-            for r in rounds:
-                for i in validate_ftso(
-                    r, signing_policy.entity_mapper.by_identity_address[tia], config
-                ):
-                    log_issue(config, i)
-                for i in validate_fdc(
-                    r, signing_policy.entity_mapper.by_identity_address[tia], config
-                ):
-                    log_issue(config, i)
+            block += 1
 
         block_number = latest_block
@@ -0,0 +1,178 @@
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from prometheus_client import make_wsgi_app
+
+LOGGER = logging.getLogger(__name__)
+
+PROFILE_PATH = "/debug/profile"
+MEMORY_PATH = "/debug/memory"
+MAX_SECONDS = 300
+
+# only one profile (cpu or memory) runs at a time
+_profiling = threading.Lock()
+
+
+def frame_name(frame) -> str:
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def sample_stacks(seconds: float, interval: float) -> Counter[str]:
+    """
+    Sample stacks of all other threads every interval seconds and count them
+    in collapsed form (root;...;leaf). Sampling only holds the GIL for the
+    duration of a single snapshot, the sampled threads keep running.
+    """
+    own = threading.get_ident()
+    names = {t.ident: t.name for t in threading.enumerate()}
+
+    stacks: Counter[str] = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+
+            frames = []
+            f = frame
+            while f is not None:
+                frames.append(frame_name(f))
+                f = f.f_back
+            frames.append(names.get(ident, str(ident)))
+            stacks[";".join(reversed(frames))] += 1
+
+        time.sleep(interval)
+
+    return stacks
+
+
+def collapse(stacks: Counter[str]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def profile_app(environ, start_response):
+    query = parse_qs(environ.get("QUERY_STRING", ""))
+    try:
+        seconds = float(query.get("seconds", ["10"])[0])
+        hz = float(query.get("hz", ["100"])[0])
+    except ValueError:
+        start_response("400 Bad Request", [("Content-Type", "text/plain")])
+        return [b"seconds and hz must be numbers\n"]
+
+    if not (0 < seconds <= MAX_SECONDS and 0 < hz <= 1000):
+        start_response("400 Bad Request", [("Content-Type", "text/plain")])
+        return [f"0 < seconds <= {MAX_SECONDS} and 0 < hz <= 1000\n".encode()]
+
+    if not _profiling.acquire(blocking=False):
+        start_response("409 Conflict", [("Content-Type", "text/plain")])
+        return [b"a profile is already running\n"]
+
+    try:
+        LOGGER.info(f"profiling for {seconds}s at {hz}hz")
+        body = collapse(sample_stacks(seconds, 1 / hz)).encode()
+    finally:
+        _profiling.release()
+
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [body]
+
+
+def memory_diff(seconds: float, top: int) -> str:
+    """
+    Trace allocations for the given seconds and report the allocation sites
+    that grew the most. Tracing is only enabled for the duration of the call
+    unless it was already enabled (eg. with PYTHONTRACEMALLOC).
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+
+    try:
+        before = tracemalloc.take_snapshot()
+        time.sleep(seconds)
+        after = tracemalloc.take_snapshot()
+    finally:
+        if started:
+            tracemalloc.stop()
+
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    stats = after.filter_traces(filters).compare_to(
+        before.filter_traces(filters), "lineno"
+    )
+
+    total = sum(s.size_diff for s in stats)
+    lines = [f"total growth: {total / 1024:.1f} KiB over {seconds}s"]
+    lines += [str(s) for s in stats[:top]]
+    return "\n".join(lines) + "\n"
+
+
+def memory_app(environ, start_response):
+    query = parse_qs(environ.get("QUERY_STRING", ""))
+    try:
+        seconds = float(query.get("seconds", ["60"])[0])
+        top = int(query.get("top", ["25"])[0])
+    except ValueError:
+        start_response("400 Bad Request", [("Content-Type", "text/plain")])
+        return [b"seconds and top must be numbers\n"]
+
+    if not (0 < seconds <= MAX_SECONDS and top > 0):
+        start_response("400 Bad Request", [("Content-Type", "text/plain")])
+        return [f"0 < seconds <= {MAX_SECONDS} and top > 0\n".encode()]
+
+    if not _profiling.acquire(blocking=False):
+        start_response("409 Conflict", [("Content-Type", "text/plain")])
+        return [b"a profile is already running\n"]
+
+    try:
+        LOGGER.info(f"tracing allocations for {seconds}s")
+        body = memory_diff(seconds, top).encode()
+    finally:
+        _profiling.release()
+
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [body]
+
+
+def make_app():
+    metrics_app = make_wsgi_app()
+
+    def app(environ, start_response):
+        match environ.get("PATH_INFO"):
+            case path if path == PROFILE_PATH:
+                return profile_app(environ, start_response)
+            case path if path == MEMORY_PATH:
+                return memory_app(environ, start_response)
+        return metrics_app(environ, start_response)
+
+    return app
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class SilentHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server_with_profiling(port: int) -> None:
+    """Serve metrics and the profiling endpoints from a background thread."""
+    server = make_server(
+        "",
+        port,
+        make_app(),
+        server_class=ThreadingWSGIServer,
+        handler_class=SilentHandler,
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
@@ -0,0 +1,100 @@
+import logging
+from typing import Self
+
+from attrs import frozen
+from eth_typing import ChecksumAddress
+from eth_utils.address import to_checksum_address
+from web3 import AsyncWeb3
+
+from configuration.types import (
+    FLARE_CONTRACT_REGISTRY_ABI,
+    FLARE_CONTRACT_REGISTRY_ADDRESS,
+    Configuration,
+    Contract,
+    Contracts,
+    Event,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+CONTRACT_NAMES: list[str] = [a.name for a in Contracts.__attrs_attrs__]  # type: ignore
+
+
+def get_observed_contracts(config: Configuration) -> list[Contract]:
+    # contracts whose events are followed by the observer
+    # TODO: (nejc) set this up with a function on class
+    # or contracts = attrs.asdict(config.contracts) <- this doesn't work
+    return [
+        config.contracts.Relay,
+        config.contracts.VoterRegistry,
+        config.contracts.FlareSystemsManager,
+        config.contracts.FlareSystemsCalculator,
+    ]
+
+
+def get_target_function_signatures(config: Configuration) -> dict[str, str]:
+    submission = config.contracts.Submission
+    return {
+        submission.functions["submitSignatures"].signature: "submitSignatures",
+        submission.functions["submit1"].signature: "submit1",
+        submission.functions["submit2"].signature: "submit2",
+    }
+
+
+@frozen
+class DispatchTables:
+    """
+    Lookups derived from the contract addresses. Replaced as a whole when the
+    registry points to new contracts, so a block is never decoded with a mix
+    of old and new tables.
+    """
+
+    contracts: list[Contract]
+    event_signatures: dict[str, Event]
+    target_function_signatures: dict[str, str]
+    submission_address: ChecksumAddress
+
+    @classmethod
+    def from_config(cls, config: Configuration) -> Self:
+        contracts = get_observed_contracts(config)
+        return cls(
+            contracts=contracts,
+            event_signatures={
+                e.signature: e for c in contracts for e in c.events.values()
+            },
+            target_function_signatures=get_target_function_signatures(config),
+            submission_address=config.contracts.Submission.address,
+        )
+
+
+async def read_contract_addresses(
+    w: AsyncWeb3, block_number: int
+) -> dict[str, ChecksumAddress]:
+    """Addresses of all used contracts at block_number, in a single eth_call."""
+    registry = w.eth.contract(
+        address=FLARE_CONTRACT_REGISTRY_ADDRESS, abi=FLARE_CONTRACT_REGISTRY_ABI
+    )
+    addresses = await registry.functions.getContractAddressesByName(
+        CONTRACT_NAMES
+    ).call(block_identifier=block_number)
+    return dict(zip(CONTRACT_NAMES, map(to_checksum_address, addresses)))
+
+
+async def check_registry(
+    w: AsyncWeb3, contracts: Contracts, block_number: int
+) -> dict[str, tuple[ChecksumAddress, ChecksumAddress]]:
+    """
+    Contracts whose registry address at block_number differs from contracts,
+    as name -> (old address, new address). Empty if the registry can't be read.
+    """
+    try:
+        addresses = await read_contract_addresses(w, block_number)
+    except Exception as e:
+        LOGGER.warning(f"unable to read contract registry: {e}")
+        return {}
+
+    return {
+        name: (getattr(contracts, name).address, address)
+        for name, address in addresses.items()
+        if getattr(contracts, name).address != address
+    }
@@ -0,0 +1,140 @@
+import logging
+from collections import deque
+
+from attrs import define, field, frozen
+from hexbytes import HexBytes
+from py_flare_common.fsp.messaging.types import ParsedPayload
+from web3 import AsyncWeb3
+from web3.types import BlockData
+
+from .metrics import record_reorg
+from .reward_epoch_manager import (
+    PayloadIndex,
+    SigningPolicy,
+    SigningPolicyBuilder,
+    VotingRoundProtocol,
+    WTxData,
+)
+from .types import (
+    ProtocolMessageRelayed,
+    RandomAcquisitionStarted,
+    SigningPolicyInitialized,
+    VotePowerBlockSelected,
+    VoterRegistered,
+    VoterRegistrationInfo,
+    VoterRemoved,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+# processed blocks that can be undone, a deeper reorg is only logged
+UNDO_DEPTH = 64
+
+type SigningPolicyEvent = (
+    RandomAcquisitionStarted
+    | VotePowerBlockSelected
+    | VoterRegistered
+    | VoterRegistrationInfo
+    | VoterRemoved
+    | SigningPolicyInitialized
+)
+
+
+@frozen
+class PolicySwap:
+    """A signing policy that took over in a block, and what it replaced."""
+
+    policy: SigningPolicy
+    previous: SigningPolicy
+    # builder the policy was built from, holding the events of its epoch
+    previous_builder: SigningPolicyBuilder
+
+
+@define
+class BlockUndo:
+    """Everything a processed block added to the observer's state."""
+
+    number: int
+    hash: HexBytes
+    parent_hash: HexBytes
+
+    payloads: list[tuple[PayloadIndex, ParsedPayload, WTxData]] = field(factory=list)
+    # finalizations the block set, with the one they replaced
+    finalizations: list[tuple[VotingRoundProtocol, ProtocolMessageRelayed | None]] = (
+        field(factory=list)
+    )
+    events: list[tuple[SigningPolicyBuilder, SigningPolicyEvent]] = field(factory=list)
+    # set if the block started the rounds of a new signing policy
+    policy_swap: PolicySwap | None = None
+
+    def undo(self) -> None:
+        for builder, event in reversed(self.events):
+            builder.remove(event)
+        for protocol, previous in reversed(self.finalizations):
+            protocol.finalization = previous
+        for index, payload, tx in reversed(self.payloads):
+            index.remove(payload, tx)
+
+
+@define
+class Chain:
+    """
+    Hashes and undo records of the last processed blocks. A block whose parent
+    is not the last processed block means the chain reorganized, processed
+    blocks that left the canonical chain are then undone newest first.
+
+    Rounds that were already validated are not reopened, sent alerts can't be
+    taken back. Confirmations keep reorgs from reaching that far.
+    """
+
+    blocks: deque[BlockUndo] = field(factory=lambda: deque(maxlen=UNDO_DEPTH))
+
+    def extends(self, block: BlockData) -> bool:
+        assert "parentHash" in block
+        return not self.blocks or self.blocks[-1].hash == block["parentHash"]
+
+    def push(self, block: BlockData) -> BlockUndo:
+        assert "number" in block
+        assert "hash" in block
+        assert "parentHash" in block
+        undo = BlockUndo(block["number"], block["hash"], block["parentHash"])
+        self.blocks.append(undo)
+        return undo
+
+    async def rollback(
+        self, w: AsyncWeb3, block: BlockData
+    ) -> tuple[int, PolicySwap | None]:
+        """
+        Undo processed blocks that are not ancestors of block and return the
+        number of the first block to process again, with the earliest signing
+        policy swap that was undone. The caller restores the policy it
+        replaced. Only headers of the undone heights are read, and only while
+        the fork point is not found.
+        """
+        assert "number" in block
+        assert "parentHash" in block
+        number, parent_hash = block["number"], block["parentHash"]
+
+        depth = 0
+        swap = None
+        while self.blocks and self.blocks[-1].hash != parent_hash:
+            undo = self.blocks.pop()
+            undo.undo()
+            depth += 1
+            number = undo.number
+            swap = undo.policy_swap or swap
+
+            if self.blocks:
+                canonical = await w.eth.get_block(number)
+                assert "parentHash" in canonical
+                parent_hash = canonical["parentHash"]
+
+        if self.blocks:
+            LOGGER.warning(f"reorg of {depth} blocks, processing again from {number}")
+        else:
+            LOGGER.error(
+                f"reorg deeper than {depth} blocks, state before block {number} "
+                "may contain transactions that are no longer canonical"
+            )
+        record_reorg(depth)
+        return number, swap
@@ -1,9 +1,13 @@
+import sys
+from bisect import bisect_left, bisect_right
+from heapq import heappop, heappush
 from typing import Self
 
-from attrs import define, field, frozen
+from attrs import Factory, define, field, frozen
 from eth_typing import ChecksumAddress
 from hexbytes import HexBytes
 from py_flare_common.fsp.epoch.epoch import RewardEpoch, VotingEpoch
+from py_flare_common.fsp.epoch.factory import VotingEpochFactory
 from py_flare_common.fsp.messaging.types import (
     FdcSubmit1,
     FdcSubmit2,
@@ -14,6 +18,8 @@ from py_flare_common.fsp.messaging.types import (
 )
 from web3.types import BlockData, TxData
 
+from .deadlines import PHASES, earliest_deadlines
+from .metrics import record_round_rejected
 from .types import (
     ProtocolMessageRelayed,
     RandomAcquisitionStarted,
@@ -27,7 +33,12 @@ from .types import (
 
 @frozen
 class WTxData:
-    wrapped: TxData
+    """
+    The fields of a transaction the observer needs. Held for every submission
+    of every pending round, so the full TxData is not kept and addresses are
+    interned as the same few senders repeat in every round.
+    """
+
     hash: HexBytes
     to_address: ChecksumAddress | None
     input: HexBytes
@@ -55,14 +66,14 @@ class WTxData:
 
         assert "timestamp" in block_data
 
+        to_address = tx_data.get("to")
         return cls(
-            wrapped=tx_data,
             hash=tx_data["hash"],
-            to_address=tx_data.get("to"),
+            to_address=to_address and sys.intern(to_address),  # type: ignore
             input=tx_data["input"],
             block_number=tx_data["blockNumber"],
             transaction_index=tx_data["transactionIndex"],
-            from_address=tx_data["from"],
+            from_address=sys.intern(tx_data["from"]),  # type: ignore
             value=tx_data["value"],
             timestamp=block_data["timestamp"],
         )
@@ -139,6 +150,18 @@ class SigningPolicy:
         return SigningPolicyBuilder()
 
 
+def policy_for_round(
+    policies: list[SigningPolicy], voting_round_id: int
+) -> SigningPolicy | None:
+    """The policy active in a voting round, policies sorted by their start."""
+    active = None
+    for p in policies:
+        if p.start_voting_round > voting_round_id:
+            break
+        active = p
+    return active
+
+
 @define
 class SigningPolicyBuilder:
     reward_epoch: RewardEpoch | None = None
@@ -188,6 +211,36 @@ class SigningPolicyBuilder:
 
         return self
 
+    def remove(
+        self,
+        event: RandomAcquisitionStarted
+        | VotePowerBlockSelected
+        | VoterRegistered
+        | VoterRegistrationInfo
+        | VoterRemoved
+        | SigningPolicyInitialized,
+    ) -> Self:
+        """Undo add, for events of blocks that left the canonical chain."""
+        if isinstance(event, RandomAcquisitionStarted):
+            self.random_acquisation_started = None
+
+        if isinstance(event, VotePowerBlockSelected):
+            self.vote_power_block_selected = None
+
+        if isinstance(event, VoterRegistered):
+            self.voter_registered.remove(event)
+
+        if isinstance(event, VoterRegistrationInfo):
+            self.voter_registration_info.remove(event)
+
+        if isinstance(event, VoterRemoved):
+            self.voter_removed.remove(event)
+
+        if isinstance(event, SigningPolicyInitialized):
+            self.signing_policy_initialized = None
+
+        return self
+
     # def status(self, config: Configuration) -> str | None:
     #     ts_now = int(time.time())
     #     next_expected_ts = config.epoch.reward_epoch(self.id + 1).start_s
@@ -280,10 +333,69 @@ class SigningPolicyBuilder:
 
 
 @define
-class ParsedPayloadMapper[T]:
-    by_identity: dict[ChecksumAddress, list[tuple[ParsedPayload[T], WTxData]]] = field(
-        factory=dict
+class PayloadIndex[T]:
+    """
+    Payloads of a single identity grouped by voting round and sorted by the
+    timestamp of their transaction, ties keep insertion order.
+    """
+
+    # voting round id -> (timestamps, payloads) in the same order
+    by_round: dict[int, tuple[list[int], list[tuple[ParsedPayload[T], WTxData]]]] = (
+        field(factory=dict)
     )
+
+    def insert(self, s: ParsedPayload[T], tx: WTxData) -> None:
+        if s.voting_round_id not in self.by_round:
+            self.by_round[s.voting_round_id] = ([], [])
+        timestamps, payloads = self.by_round[s.voting_round_id]
+
+        # blocks are processed in order so this is almost always an append
+        i = bisect_right(timestamps, tx.timestamp)
+        timestamps.insert(i, tx.timestamp)
+        payloads.insert(i, (s, tx))
+
+    def remove(self, s: ParsedPayload[T], tx: WTxData) -> None:
+        timestamps, payloads = self.by_round[s.voting_round_id]
+
+        # undone blocks are the latest ones so this is almost always the end
+        for i in range(len(payloads) - 1, -1, -1):
+            if payloads[i][0] is s and payloads[i][1] is tx:
+                del timestamps[i], payloads[i]
+                break
+
+        if not payloads:
+            del self.by_round[s.voting_round_id]
+
+    def latest(
+        self, round: int, time_range: range
+    ) -> tuple[ParsedPayload[T], WTxData] | None:
+        """
+        Return the payload for round with the latest timestamp in time_range,
+        the first inserted one if several share that timestamp.
+        """
+        entry = self.by_round.get(round)
+        if entry is None:
+            return None
+        timestamps, payloads = entry
+
+        # the window usually ends after the last payload of the round
+        i = len(timestamps) - 1
+        if timestamps[i] >= time_range.stop:
+            i = bisect_left(timestamps, time_range.stop) - 1
+        if i < 0 or timestamps[i] < time_range.start:
+            return None
+
+        if i > 0 and timestamps[i - 1] == timestamps[i]:
+            i = bisect_left(timestamps, timestamps[i], hi=i)
+        return payloads[i]
+
+    def __len__(self) -> int:
+        return sum(len(timestamps) for timestamps, _ in self.by_round.values())
+
+
+@define
+class ParsedPayloadMapper[T]:
+    by_identity: dict[ChecksumAddress, PayloadIndex[T]] = field(factory=dict)
     # by_submit: dict[ChecksumAddress, list[ParsedMessage[T, U]]] = field(factory=dict)
     # by_signatures: dict[ChecksumAddress, list[ParsedMessage[T, U]]] = field(
     #     factory=dict
@@ -293,10 +405,15 @@ class ParsedPayloadMapper[T]:
     #     factory=dict
     # )
 
-    def insert(self, r: Entity, s: ParsedPayload[T], tx: WTxData):
+    def insert(self, r: Entity, s: ParsedPayload[T], tx: WTxData) -> PayloadIndex[T]:
         if r.identity_address not in self.by_identity:
-            self.by_identity[r.identity_address] = []
-        self.by_identity[r.identity_address].append((s, tx))
+            self.by_identity[r.identity_address] = PayloadIndex()
+        index = self.by_identity[r.identity_address]
+        index.insert(s, tx)
+        return index
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self.by_identity.values())
 
 
 @define
@@ -330,32 +447,95 @@ class VotingRound:
         factory=VotingRoundProtocol
     )
 
+    # (protocol, phase) pairs already checked before the round completed and
+    # (protocol, check) pairs of the issues those checks reported
+    phases_checked: set[tuple[int, str]] = field(factory=set)
+    reported: set[tuple[int, str | None]] = field(factory=set)
+
 
 @define
 class VotingRoundManager:
+    """
+    Holds voting rounds until they complete. Rounds are only created for ids
+    in a window around the last processed block, payloads for other ids
+    (already finalized or bogus far-future ids) go to a round that is never
+    stored.
+    """
+
     finalized: int
+    factory: VotingEpochFactory
+    # voting round id of the last block passed to finalize
+    head: int = field(default=Factory(lambda self: self.finalized + 1, takes_self=True))
+    # rounds further ahead of head than this are rejected
+    max_ahead: int = 3
+    # most rounds held at once, the furthest ahead is evicted when exceeded
+    max_rounds: int = 16
+
     rounds: dict[VotingEpoch, VotingRound] = field(factory=dict)
+    # min-heap of (completion timestamp, round), may contain evicted rounds
+    deadlines: list[tuple[int, VotingEpoch]] = field(factory=list)
+    # min-heap of (phase deadline, round, protocol, phase) of the phases checked
+    # before their round completes, may contain evicted rounds
+    phase_deadlines: list[tuple[int, VotingEpoch, int, str]] = field(factory=list)
 
     def get(self, v: VotingEpoch) -> VotingRound:
-        if v not in self.rounds:
-            self.rounds[v] = VotingRound(v)
+        if v in self.rounds:
+            return self.rounds[v]
+
+        if v.id <= self.finalized:
+            record_round_rejected("finalized")
+            return VotingRound(v)
+        if v.id > self.head + self.max_ahead:
+            record_round_rejected("ahead")
+            return VotingRound(v)
+
+        if len(self.rounds) >= self.max_rounds:
+            furthest = max(self.rounds)
+            if furthest < v:
+                record_round_rejected("full")
+                return VotingRound(v)
+            del self.rounds[furthest]
+            record_round_rejected("evicted")
+
+        self.rounds[v] = VotingRound(v)
+        # need to wait until end of next epoch for fdc reveal offence condition
+        heappush(self.deadlines, (v.next.end_s, v))
+        # the signatures deadline is only known once the round is finalized
+        earliest = earliest_deadlines(v)
+        for protocol, phases in PHASES.items():
+            for phase in phases:
+                heappush(self.phase_deadlines, (earliest[phase], v, protocol, phase))
         return self.rounds[v]
 
+    def due_phases(self, ts: int) -> list[tuple[VotingRound, int, str]]:
+        """Phases of held rounds whose deadline, as far as known, is before ts."""
+        due = []
+        while self.phase_deadlines and self.phase_deadlines[0][0] < ts:
+            _, v, protocol, phase = heappop(self.phase_deadlines)
+            round = self.rounds.get(v)
+            if round is not None:
+                due.append((round, protocol, phase))
+        return due
+
+    def defer_phase(
+        self, round: VotingRound, protocol: int, phase: str, deadline: int
+    ) -> None:
+        """Return a phase taken with due_phases until its later deadline."""
+        heappush(self.phase_deadlines, (deadline, round.voting_epoch, protocol, phase))
+
     def finalize(self, block: BlockData) -> list[VotingRound]:
         assert "timestamp" in block
-        keys = list(self.rounds.keys())
+        ts = block["timestamp"]
+        self.head = max(self.head, self.factory.from_timestamp(ts).id)
 
         rounds = []
-        for k in keys:
-            if k.id <= self.finalized:
-                self.rounds.pop(k, None)
+        while self.deadlines and self.deadlines[0][0] < ts:
+            _, v = heappop(self.deadlines)
+            round = self.rounds.pop(v, None)
+            if round is None:
                 continue
 
-            # need to wait until end of next epoch for fdc reveal offence condition
-            round_completed = k.next.end_s < block["timestamp"]
-
-            if round_completed:
-                self.finalized = max(self.finalized, k.id)
-                rounds.append(self.rounds.pop(k))
+            self.finalized = max(self.finalized, v.id)
+            rounds.append(round)
 
         return rounds
@@ -0,0 +1,84 @@
+import asyncio
+import time
+from typing import Any
+
+from eth_typing import ChecksumAddress
+from web3 import AsyncWeb3
+from web3.middleware import ExtraDataToPOAMiddleware, Web3Middleware
+from web3.types import BlockData, LogReceipt, RPCEndpoint, RPCResponse
+
+from configuration.types import Configuration
+
+from .metrics import record_rpc_request
+
+
+class RpcMetricsMiddleware(Web3Middleware):
+    """Records the duration of every json-rpc request by method."""
+
+    async def async_wrap_make_request(self, make_request):
+        async def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+            start = time.perf_counter()
+            try:
+                return await make_request(method, params)
+            finally:
+                record_rpc_request(method, time.perf_counter() - start)
+
+        return middleware
+
+    async def async_wrap_make_batch_request(self, make_batch_request):
+        async def middleware(requests_info):
+            start = time.perf_counter()
+            try:
+                return await make_batch_request(requests_info)
+            finally:
+                record_rpc_request("batch", time.perf_counter() - start)
+
+        return middleware
+
+
+def make_web3(config: Configuration) -> AsyncWeb3:
+    return AsyncWeb3(
+        AsyncWeb3.AsyncHTTPProvider(config.rpc_url),
+        middleware=[ExtraDataToPOAMiddleware, RpcMetricsMiddleware],
+    )
+
+
+async def fetch_blocks(
+    w: AsyncWeb3, start_block: int, end_block: int, concurrency: int
+) -> list[BlockData]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(block_id: int) -> BlockData:
+        async with semaphore:
+            return await w.eth.get_block(block_id, full_transactions=True)
+
+    return await asyncio.gather(*(fetch(b) for b in range(start_block, end_block + 1)))
+
+
+async def fetch_logs(
+    w: AsyncWeb3,
+    addresses: list[ChecksumAddress],
+    start_block: int,
+    end_block: int,
+    log_range: int,
+    concurrency: int,
+    topics: list[str] | None = None,
+) -> list[LogReceipt]:
+    """Logs of [start_block, end_block] read in windows of log_range blocks."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(start: int) -> list[LogReceipt]:
+        async with semaphore:
+            return await w.eth.get_logs(
+                {
+                    "address": addresses,
+                    "topics": topics or [],  # type: ignore
+                    "fromBlock": start,
+                    "toBlock": min(start + log_range - 1, end_block),
+                }
+            )
+
+    chunks = await asyncio.gather(
+        *(fetch(s) for s in range(start_block, end_block + 1, log_range))
+    )
+    return [log for chunk in chunks for log in chunk]
@@ -0,0 +1,221 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import deque
+from typing import Any
+
+from attrs import define, field
+from eth_typing import ChecksumAddress
+
+from .history import RoundResult
+from .reward_epoch_manager import SigningPolicy, VotingRoundManager
+
+LOGGER = logging.getLogger(__name__)
+
+# validation results kept per identity
+RESULTS_PER_IDENTITY = 20
+
+# dashboards may poll every second, responses can be reused for that long
+CACHE_CONTROL = "max-age=1"
+
+
+def result_to_dict(r: RoundResult) -> dict[str, Any]:
+    return {
+        "voting_round_id": r.voting_round_id,
+        "protocol": r.protocol,
+        "submit_1_timestamp": r.submit_1_timestamp,
+        "submit_2_timestamp": r.submit_2_timestamp,
+        "submit_signatures_timestamp": r.submit_signatures_timestamp,
+        "none_indices": r.none_indices,
+        "signature_valid": r.signature_valid,
+        "reveal_offence": r.reveal_offence,
+        "issues": [
+            {"level": i.level.name, "check": i.check, "message": i.message}
+            for i in r.issues
+        ],
+    }
+
+
+@define
+class Status:
+    """
+    In-memory state of the observer served as json. The observer loop updates
+    it and the served documents are rendered at most once per update, so
+    polling costs neither rpc calls nor rendering.
+    """
+
+    identity_address: ChecksumAddress
+    chain_id: int
+
+    block_number: int | None = None
+    block_timestamp: int | None = None
+    lag_blocks: int | None = None
+    lag_seconds: float | None = None
+    signing_policy: SigningPolicy | None = None
+    vrm: VotingRoundManager | None = None
+    results: dict[ChecksumAddress, deque[RoundResult]] = field(factory=dict)
+
+    # bumped on every update, rendered documents are cached per version
+    version: int = 0
+    _rendered: dict[str, tuple[int, bytes]] = field(factory=dict)
+    # bumped when results are added, the etag is cached per round and version
+    results_version: int = 0
+    _etag: tuple[tuple[int | None, int], str] | None = None
+
+    def update_block(
+        self,
+        block_number: int,
+        block_timestamp: int,
+        lag_blocks: int,
+        signing_policy: SigningPolicy,
+        vrm: VotingRoundManager,
+    ) -> None:
+        self.block_number = block_number
+        self.block_timestamp = block_timestamp
+        self.lag_blocks = lag_blocks
+        self.lag_seconds = time.time() - block_timestamp
+        self.signing_policy = signing_policy
+        self.vrm = vrm
+        self.version += 1
+
+    def add_results(self, results: list[RoundResult]) -> None:
+        for r in results:
+            self.results.setdefault(
+                r.identity_address, deque(maxlen=RESULTS_PER_IDENTITY)
+            ).append(r)
+        self.version += 1
+        self.results_version += 1
+
+    def status(self) -> dict[str, Any]:
+        signing_policy = None
+        if (sp := self.signing_policy) is not None:
+            entity = sp.entity_mapper.by_identity_address.get(self.identity_address)
+            signing_policy = {
+                "reward_epoch_id": sp.reward_epoch.id,
+                "start_voting_round_id": sp.start_voting_round,
+                "threshold": sp.threshold,
+                "entities": len(sp.entities),
+                "total_weight": sum(e.normalized_weight for e in sp.entities),
+                "identity_weight": entity and entity.normalized_weight,
+            }
+
+        return {
+            "identity_address": self.identity_address,
+            "chain_id": self.chain_id,
+            "block": {
+                "number": self.block_number,
+                "timestamp": self.block_timestamp,
+                "lag_blocks": self.lag_blocks,
+                "lag_seconds": self.lag_seconds,
+            },
+            "signing_policy": signing_policy,
+            "open_rounds": [
+                {
+                    "voting_round_id": v.id,
+                    "completes_at": v.next.end_s,
+                    "ftso": {
+                        "submit_1": len(r.ftso.submit_1),
+                        "submit_2": len(r.ftso.submit_2),
+                        "submit_signatures": len(r.ftso.submit_signatures),
+                        "finalized": r.ftso.finalization is not None,
+                    },
+                    "fdc": {
+                        "submit_1": len(r.fdc.submit_1),
+                        "submit_2": len(r.fdc.submit_2),
+                        "submit_signatures": len(r.fdc.submit_signatures),
+                        "finalized": r.fdc.finalization is not None,
+                    },
+                }
+                for v, r in sorted((self.vrm.rounds if self.vrm else {}).items())
+            ],
+        }
+
+    def etag(self) -> str:
+        """
+        Etag of the documents, derived from the reported voting round and the
+        results and their issues only, so it stays the same between blocks.
+        """
+        round = self.vrm.head if self.vrm is not None else None
+        key = (round, self.results_version)
+        if self._etag is None or self._etag[0] != key:
+            state = [
+                (identity, r.voting_round_id, r.protocol, [i.check for i in r.issues])
+                for identity, results in self.results.items()
+                for r in results
+            ]
+            digest = hashlib.sha1(json.dumps([round, state]).encode()).hexdigest()
+            self._etag = (key, f'"{digest[:16]}"')
+        return self._etag[1]
+
+    def render(self, path: str) -> tuple[bytes, str] | None:
+        """Json body and etag of the document at path, None if there is none."""
+        cached = self._rendered.get(path)
+        if cached is not None and cached[0] == self.version:
+            return cached[1], self.etag()
+
+        match path:
+            case "/status":
+                document = self.status()
+            case "/results":
+                document = {
+                    identity: [result_to_dict(r) for r in reversed(results)]
+                    for identity, results in self.results.items()
+                }
+            case _:
+                return None
+
+        body = json.dumps(document).encode()
+        self._rendered[path] = (self.version, body)
+        return body, self.etag()
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+            lines = request.decode("latin-1").split("\r\n")
+            method, target, _ = lines[0].split(" ", 2)
+            headers = {
+                k.strip().lower(): v.strip()
+                for k, _, v in (line.partition(":") for line in lines[1:] if line)
+            }
+
+            rendered = self.render(target.split("?", 1)[0])
+            if method != "GET":
+                status, body, extra = "405 Method Not Allowed", b"", {}
+            elif rendered is None:
+                status, body, extra = "404 Not Found", b"", {}
+            elif headers.get("if-none-match") == rendered[1]:
+                status, body, extra = "304 Not Modified", b"", {"ETag": rendered[1]}
+            else:
+                status, body, extra = "200 OK", rendered[0], {"ETag": rendered[1]}
+
+            response = {
+                "Content-Type": "application/json",
+                "Content-Length": str(len(body)),
+                "Cache-Control": CACHE_CONTROL,
+                "Connection": "close",
+                **extra,
+            }
+            head = "".join(f"{k}: {v}\r\n" for k, v in response.items())
+            writer.write(f"HTTP/1.1 {status}\r\n{head}\r\n".encode() + body)
+            await writer.drain()
+        except (
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,
+            ConnectionError,
+            ValueError,
+        ):
+            # malformed request or client went away, just close the connection
+            pass
+        finally:
+            writer.close()
+
+
+async def start_status_server(status: Status, port: int) -> asyncio.Server:
+    """Serve the status documents from the running event loop."""
+    server = await asyncio.start_server(status.handle, port=port)
+    LOGGER.info(f"status server started on port {port}")
+    return server
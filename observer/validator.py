@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Self
+
+from attrs import define, evolve, frozen
+from eth_typing import ChecksumAddress
+
+from configuration.types import Configuration
+
+from .bitvotes import RoundBitvotes
+from .deadlines import submit_2_window
+from .feeds import RoundFeeds
+from .history import RoundResult
+from .metrics import init_metrics
+from .reward_epoch_manager import (
+    Entity,
+    ParsedPayloadMapper,
+    PayloadIndex,
+    VotingRound,
+    VotingRoundProtocol,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+
+@frozen
+class RoundRecord:
+    """A completed voting round with everything needed to validate it."""
+
+    round: VotingRound
+    entity: Entity
+    entities: list[Entity]
+
+
+def compact_protocol(
+    p: VotingRoundProtocol, round: int, reveal: range, identity: ChecksumAddress
+) -> VotingRoundProtocol:
+    # other entities only matter for their latest reveal, used by the feed
+    # medians and the consensus bitvote
+    submit_2: ParsedPayloadMapper = ParsedPayloadMapper()
+    for address, index in p.submit_2.by_identity.items():
+        if address == identity:
+            submit_2.by_identity[address] = index
+        elif (latest := index.latest(round, reveal)) is not None:
+            submit_2.by_identity[address] = compact = PayloadIndex()
+            compact.insert(*latest)
+
+    def only(mapper: ParsedPayloadMapper) -> ParsedPayloadMapper:
+        index = mapper.by_identity.get(identity)
+        return ParsedPayloadMapper({identity: index} if index is not None else {})
+
+    return VotingRoundProtocol(
+        submit_1=only(p.submit_1),
+        submit_2=submit_2,
+        submit_signatures=only(p.submit_signatures),
+        finalization=p.finalization,
+    )
+
+
+def compact_round(round: VotingRound, identity: ChecksumAddress) -> VotingRound:
+    """The parts of round validate_round reads for identity."""
+    epoch = round.voting_epoch
+    reveal = submit_2_window(epoch)
+    return VotingRound(
+        epoch,
+        ftso=compact_protocol(round.ftso, epoch.id, reveal, identity),
+        fdc=compact_protocol(round.fdc, epoch.id, reveal, identity),
+    )
+
+
+@define
+class Validator:
+    """
+    Validates completed rounds in order, keeping the feed values of the last
+    one to tell which values went stale.
+    """
+
+    config: Configuration
+    feeds: RoundFeeds | None = None
+
+    def validate(self, record: RoundRecord) -> list[RoundResult]:
+        # observer imports this module for its loop
+        from .observer import validate_round
+
+        self.feeds = RoundFeeds.from_round(record.round, record.entities, self.feeds)
+        bitvotes = RoundBitvotes.from_round(record.round, record.entities)
+        return validate_round(
+            record.round, record.entity, self.config, self.feeds, bitvotes
+        )
+
+    def submit(self, record: RoundRecord) -> asyncio.Future[list[RoundResult]]:
+        future = asyncio.get_running_loop().create_future()
+        try:
+            future.set_result(self.validate(record))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def recover(self, record: RoundRecord) -> list[RoundResult]:
+        """Results of a round whose validation failed, it would fail again."""
+        return []
+
+
+# validator of the worker process
+_validator: Validator | None = None
+
+
+def _init_worker(config: Configuration, metrics_port: int) -> None:
+    global _validator
+    _validator = Validator(config)
+    # protocol metrics are recorded during validation, so they are served here
+    init_metrics(metrics_port, profiling=config.profiling)
+
+
+def _warm_up() -> None:
+    # start the worker and import the validation code before the first round
+    from . import observer  # noqa: F401
+
+
+def _validate(record: RoundRecord) -> list[RoundResult]:
+    assert _validator is not None
+    return _validator.validate(record)
+
+
+def _start_pool(config: Configuration, metrics_port: int) -> ProcessPoolExecutor:
+    pool = ProcessPoolExecutor(
+        max_workers=1,
+        # a clean interpreter, not a copy of the running event loop
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(config, metrics_port),
+    )
+    pool.submit(_warm_up)
+    return pool
+
+
+@define
+class ValidatorProcess:
+    """
+    Validates rounds in a separate process, so validation never holds the
+    event loop that fetches blocks. A single worker runs the rounds in the
+    order they were submitted, rounds are compacted to what validation reads
+    before they are sent. A worker that died is replaced, rounds it failed on
+    are recovered in this process.
+    """
+
+    config: Configuration
+    metrics_port: int
+    pool: ProcessPoolExecutor
+    # validates rounds the worker failed on
+    fallback: Validator
+
+    @classmethod
+    def start(cls, config: Configuration, metrics_port: int) -> Self:
+        pool = _start_pool(config, metrics_port)
+        return cls(config, metrics_port, pool, Validator(config))
+
+    def submit(self, record: RoundRecord) -> asyncio.Future[list[RoundResult]]:
+        compact = evolve(
+            record,
+            round=compact_round(record.round, record.entity.identity_address),
+        )
+        return asyncio.ensure_future(self._run(compact))
+
+    async def _run(self, compact: RoundRecord) -> list[RoundResult]:
+        pool = self.pool
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                pool, _validate, compact
+            )
+        except BrokenProcessPool:
+            # every round queued on a dead worker fails, it is replaced once
+            if pool is self.pool:
+                LOGGER.error("validator process died, starting a new one")
+                pool.shutdown(wait=False)
+                self.pool = _start_pool(self.config, self.metrics_port)
+            raise
+
+    def recover(self, record: RoundRecord) -> list[RoundResult]:
+        """Results of a round the worker failed on, validated in this process."""
+        try:
+            return self.fallback.validate(record)
+        except Exception:
+            LOGGER.exception(f"unable to validate round {record.round.voting_epoch.id}")
+            return []
@@ -0,0 +1,180 @@
+import argparse
+import asyncio
+import logging
+import math
+import os
+import re
+import statistics
+import time
+
+from attrs import frozen
+
+from configuration.config import get_config, get_epoch
+from observer.observer import observer_loop
+
+from .fixture import Fixture
+from .node import FakeNode
+
+LOGGER = logging.getLogger(__name__)
+
+
+@frozen
+class BenchmarkResult:
+    blocks: int
+    seconds: float
+    rpc_calls: dict[str, int]
+    # seconds from serving the block that completed a round to the notification,
+    # negative for alerts of phases checked before the round completed
+    alert_latencies: list[float]
+
+    @property
+    def blocks_per_second(self) -> float:
+        return self.blocks / self.seconds if self.seconds else 0.0
+
+    @property
+    def rpc_calls_per_block(self) -> float:
+        return sum(self.rpc_calls.values()) / self.blocks if self.blocks else 0.0
+
+    def report(self) -> str:
+        lines = [
+            f"blocks:              {self.blocks}",
+            f"seconds:             {self.seconds:.3f}",
+            f"blocks/sec:          {self.blocks_per_second:.1f}",
+            f"rpc calls/block:     {self.rpc_calls_per_block:.2f}",
+        ]
+        for method, count in sorted(self.rpc_calls.items()):
+            lines.append(f"  {method}: {count}")
+
+        if self.alert_latencies:
+            lat = sorted(self.alert_latencies)
+            lines += [
+                f"alerts:              {len(lat)}",
+                f"alert latency p50:   {statistics.median(lat) * 1000:.1f}ms",
+                f"alert latency max:   {lat[-1] * 1000:.1f}ms",
+            ]
+
+        return "\n".join(lines)
+
+
+def alert_latencies(node: FakeNode) -> list[float]:
+    fixture = node.fixture
+    ve = get_epoch(fixture.chain_id).voting_epoch
+
+    served = node.stats.served_blocks
+    numbers = sorted(served)
+
+    latencies = []
+    for received_at, payload in node.stats.webhooks:
+        messages = payload.get("messages", [payload])
+        for message in messages:
+            m = re.search(r"round:(\d+)", message.get("message", ""))
+            if m is None:
+                continue
+
+            # a round is complete with the first block after the end of next epoch
+            deadline = ve(int(m.group(1))).next.end_s
+            completing = next(
+                (n for n in numbers if node.timestamp(n) > deadline), None
+            )
+            if completing is None:
+                continue
+
+            latencies.append(received_at - served[completing])
+
+    return latencies
+
+
+async def run_observer(node: FakeNode, timeout: float) -> None:
+    config = get_config()
+    task = asyncio.create_task(observer_loop(config))
+
+    deadline = time.perf_counter() + timeout
+    while not node.idle.is_set():
+        if task.done():
+            # surface exceptions raised by the observer
+            task.result()
+            return
+        if time.perf_counter() > deadline:
+            LOGGER.warning("timed out before the observer reached the end block")
+            break
+        await asyncio.sleep(0.05)
+
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+def benchmark(
+    fixture: Fixture,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    identity_address: str | None = None,
+    timeout: float = 600,
+    blocks_per_second: float = math.inf,
+) -> BenchmarkResult:
+    """
+    Run observer_loop against a fake node serving the fixture until every
+    block was processed and measure throughput, rpc usage and alert latency.
+    """
+    node = FakeNode(
+        fixture, latency=latency, jitter=jitter, blocks_per_second=blocks_per_second
+    )
+    url = node.start()
+
+    identity_address = identity_address or fixture.identity_address
+    assert identity_address is not None
+
+    # only notify the fake node and never touch state files of a real deployment
+    for name in list(os.environ):
+        if name.startswith("NOTIFICATION_") or name.endswith("_FILE"):
+            del os.environ[name]
+    os.environ["RPC_URL"] = url
+    os.environ["IDENTITY_ADDRESS"] = identity_address
+    os.environ["NOTIFICATION_GENERIC_WEBHOOK"] = f"{url}/webhook"
+
+    try:
+        asyncio.run(run_observer(node, timeout))
+    finally:
+        node.stop()
+
+    served = node.stats.served_blocks
+    seconds = max(served.values()) - min(served.values()) if served else 0.0
+
+    return BenchmarkResult(
+        blocks=len(served),
+        seconds=seconds,
+        rpc_calls=dict(node.stats.calls),
+        alert_latencies=alert_latencies(node),
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level="WARNING")
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark observer_loop against a recorded fixture."
+    )
+    parser.add_argument("fixture")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument("--identity-address")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds")
+    parser.add_argument(
+        "--blocks-per-second",
+        type=float,
+        default=math.inf,
+        help="head growth, by default the head is at the last block right away",
+    )
+    args = parser.parse_args()
+
+    result = benchmark(
+        Fixture.load(args.fixture),
+        latency=args.latency,
+        jitter=args.jitter,
+        identity_address=args.identity_address,
+        timeout=args.timeout,
+        blocks_per_second=args.blocks_per_second,
+    )
+    print(result.report())
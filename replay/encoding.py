@@ -0,0 +1,96 @@
+from collections.abc import Sequence
+from typing import Any
+
+from eth_abi.abi import encode
+from eth_keys.datatypes import PrivateKey
+from eth_typing import ABIComponentIndexed
+from eth_utils.crypto import keccak
+from py_flare_common.ftso.commit import commit_hash
+
+from configuration.types import Event
+
+# inverse of the parsers in py_flare_common.fsp.messaging, used to build valid
+# submission calldata for benchmarks and generated chains
+
+
+def private_key(seed: str) -> PrivateKey:
+    return PrivateKey(keccak(text=seed))
+
+
+def encode_payload(protocol_id: int, voting_round_id: int, payload: bytes) -> bytes:
+    return (
+        protocol_id.to_bytes(1, "big")
+        + voting_round_id.to_bytes(4, "big")
+        + len(payload).to_bytes(2, "big")
+        + payload
+    )
+
+
+def encode_call(selector: str, *payloads: bytes) -> bytes:
+    return bytes.fromhex(selector) + b"".join(payloads)
+
+
+def encode_feed_values(values: list[int | None]) -> bytes:
+    return b"".join((0 if v is None else v + 2**31).to_bytes(4, "big") for v in values)
+
+
+def encode_ftso_submit2(random: int, values: list[int | None]) -> bytes:
+    return random.to_bytes(32, "big") + encode_feed_values(values)
+
+
+def ftso_commit(
+    submit_address: str, voting_round_id: int, random: int, values: list[int | None]
+) -> bytes:
+    return bytes.fromhex(
+        commit_hash(submit_address, voting_round_id, random, encode_feed_values(values))
+    )
+
+
+def encode_fdc_submit2(bit_vector: list[bool]) -> bytes:
+    n = len(bit_vector)
+    # bit i of the vector is bit n - 1 - i of the big endian number
+    votes = sum(1 << (n - 1 - i) for i, b in enumerate(bit_vector) if b)
+    return n.to_bytes(2, "big") + votes.to_bytes((n + 7) // 8, "big")
+
+
+def sign_hash(key: PrivateKey, msg_hash: bytes) -> bytes:
+    signature = key.sign_msg_hash(msg_hash)
+    return (
+        (signature.v + 27).to_bytes(1, "big")
+        + signature.r.to_bytes(32, "big")
+        + signature.s.to_bytes(32, "big")
+    )
+
+
+def encode_submit_signatures(
+    signature: bytes,
+    protocol_id: int,
+    voting_round_id: int,
+    merkle_root: bytes,
+    random_quality_score: int = 0,
+    unsigned_message: bytes = b"",
+) -> bytes:
+    # type 0 payload, signed message followed by the signature
+    message = (
+        protocol_id.to_bytes(1, "big")
+        + voting_round_id.to_bytes(4, "big")
+        + random_quality_score.to_bytes(1, "big")
+        + merkle_root
+    )
+    return b"\x00" + message + signature + unsigned_message
+
+
+def encode_event(event: Event, args: dict[str, Any]) -> tuple[list[str], str]:
+    # topics and data of a log emitting event, indexed arguments must be static
+    topics = ["0x" + event.signature]
+    types, values = [], []
+    inputs: Sequence[ABIComponentIndexed] = event.abi.get("inputs", [])
+    for i in inputs:
+        assert "name" in i
+        if i.get("indexed"):
+            topics.append("0x" + encode([i["type"]], [args[i["name"]]]).hex())
+        else:
+            types.append(i["type"])
+            values.append(args[i["name"]])
+
+    return topics, "0x" + encode(types, values).hex()
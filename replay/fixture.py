@@ -0,0 +1,90 @@
+import gzip
+import json
+from typing import Any, Self
+
+from attrs import define, field
+
+type RawBlock = dict[str, Any]
+type RawLog = dict[str, Any]
+type RawTx = dict[str, Any]
+
+
+def call_key(to: str, data: str) -> str:
+    return f"{to.lower()}:{data.lower()}"
+
+
+@define
+class Fixture:
+    """
+    Chain data recorded from (or generated for) a span of blocks, stored in the
+    raw json-rpc encoding so it can be served back as is.
+    """
+
+    chain_id: int
+    client_version: str
+
+    # identity address the fixture was recorded for
+    identity_address: str | None = None
+
+    # full blocks (with transactions) by number
+    blocks: dict[int, RawBlock] = field(factory=dict)
+    # sparse (number, timestamp) pairs used to answer header requests for blocks
+    # that were not recorded in full, eg. while searching for registration blocks
+    anchors: dict[int, int] = field(factory=dict)
+    # logs by block number
+    logs: dict[int, list[RawLog]] = field(factory=dict)
+    # eth_call results keyed by call_key
+    calls: dict[str, str] = field(factory=dict)
+    # transactions that sit in the txpool and are never included, by txpool
+    # section ("pending" or "queued")
+    txpool: dict[str, list[RawTx]] = field(factory=dict)
+
+    # block the replay starts from and the last block that is served
+    start_block: int = 0
+    end_block: int = 0
+
+    def add_block(self, block: RawBlock) -> None:
+        number = int(block["number"], 16)
+        self.blocks[number] = block
+        self.anchors[number] = int(block["timestamp"], 16)
+
+    def add_log(self, log: RawLog) -> None:
+        self.logs.setdefault(int(log["blockNumber"], 16), []).append(log)
+
+    def save(self, path: str) -> None:
+        data = {
+            "chain_id": self.chain_id,
+            "client_version": self.client_version,
+            "identity_address": self.identity_address,
+            "start_block": self.start_block,
+            "end_block": self.end_block,
+            "blocks": list(self.blocks.values()),
+            "anchors": sorted(self.anchors.items()),
+            "logs": [log for logs in self.logs.values() for log in logs],
+            "calls": self.calls,
+            "txpool": self.txpool,
+        }
+        with gzip.open(path, "wt") as f:
+            json.dump(data, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> Self:
+        with gzip.open(path, "rt") as f:
+            data = json.load(f)
+
+        fixture = cls(
+            chain_id=data["chain_id"],
+            client_version=data["client_version"],
+            identity_address=data["identity_address"],
+            calls=data["calls"],
+            txpool=data.get("txpool", {}),
+            start_block=data["start_block"],
+            end_block=data["end_block"],
+        )
+        fixture.anchors = dict(data["anchors"])
+        for block in data["blocks"]:
+            fixture.add_block(block)
+        for log in data["logs"]:
+            fixture.add_log(log)
+
+        return fixture
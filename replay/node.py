@@ -0,0 +1,306 @@
+import argparse
+import bisect
+import hashlib
+import json
+import logging
+import math
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from attrs import define, field
+
+from .fixture import Fixture, RawBlock, RawTx, call_key
+
+LOGGER = logging.getLogger(__name__)
+
+# transactions of this many blocks after the head are pending in the txpool
+TXPOOL_BLOCKS = 2
+
+
+class RpcError(Exception):
+    pass
+
+
+def fake_hash(number: int) -> str:
+    return "0x" + hashlib.sha256(number.to_bytes(8, "big")).hexdigest()
+
+
+@define
+class NodeStats:
+    # number of requests per json-rpc method
+    calls: Counter[str] = field(factory=Counter)
+    # perf_counter time at which each full block was first served
+    served_blocks: dict[int, float] = field(factory=dict)
+    # (perf_counter time, json payload) of every webhook notification received
+    webhooks: list[tuple[float, Any]] = field(factory=list)
+
+
+@define
+class FakeNode:
+    """
+    Minimal json-rpc node serving a fixture. The head starts at the fixture's
+    start block and advances with blocks_per_second (inf jumps to the end block
+    right after the first request), every request is delayed by latency +-
+    jitter seconds. POST requests to /webhook are recorded as notifications.
+    The txpool holds the transactions of the next blocks and the fixture's
+    txpool transactions.
+    """
+
+    fixture: Fixture
+    latency: float = 0.0
+    jitter: float = 0.0
+    blocks_per_second: float = math.inf
+    seed: int = 0
+    port: int = 0
+
+    stats: NodeStats = field(factory=NodeStats)
+    # set once the head reached the end block and every block was served
+    idle: threading.Event = field(factory=threading.Event)
+
+    _lock: threading.Lock = field(factory=threading.Lock)
+    _random: random.Random = field(init=False)
+    _started_at: float | None = field(init=False, default=None)
+    _anchor_numbers: list[int] = field(init=False)
+    _server: ThreadingHTTPServer | None = field(init=False, default=None)
+
+    def __attrs_post_init__(self):
+        self._random = random.Random(self.seed)
+        self._anchor_numbers = sorted(self.fixture.anchors)
+
+    @property
+    def url(self) -> str:
+        assert self._server is not None
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> str:
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):  # noqa: N802
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+                node.delay()
+                if self.path.startswith("/webhook"):
+                    node.stats.webhooks.append((time.perf_counter(), body))
+                    response = {}
+                elif isinstance(body, list):
+                    response = [node.handle(r) for r in body]
+                else:
+                    response = node.handle(body)
+
+                data = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def delay(self) -> None:
+        with self._lock:
+            d = self.latency + self.jitter * self._random.uniform(-1, 1)
+        if d > 0:
+            time.sleep(d)
+
+    def head(self) -> int:
+        start, end = self.fixture.start_block, self.fixture.end_block
+        now = time.perf_counter()
+
+        with self._lock:
+            if self._started_at is None:
+                self._started_at = now
+                return start
+
+        if math.isinf(self.blocks_per_second):
+            return end
+
+        elapsed = now - self._started_at
+        return min(end, start + int(elapsed * self.blocks_per_second))
+
+    def timestamp(self, number: int) -> int:
+        # interpolate between the closest anchors, 1s blocks outside of them
+        anchors = self.fixture.anchors
+        if number in anchors:
+            return anchors[number]
+
+        numbers = self._anchor_numbers
+        i = bisect.bisect_left(numbers, number)
+        if i == 0:
+            return anchors[numbers[0]] - (numbers[0] - number)
+        if i == len(numbers):
+            return anchors[numbers[-1]] + (number - numbers[-1])
+
+        lo, hi = numbers[i - 1], numbers[i]
+        lo_ts, hi_ts = anchors[lo], anchors[hi]
+        return lo_ts + (hi_ts - lo_ts) * (number - lo) // (hi - lo)
+
+    def block_number(self, tag: str) -> int:
+        if tag in ("latest", "safe", "finalized", "pending"):
+            return self.head()
+        if tag == "earliest":
+            return 0
+        return int(tag, 16)
+
+    def get_block(self, tag: str, full_transactions: bool) -> RawBlock | None:
+        number = self.block_number(tag)
+        if number > self.head():
+            return None
+
+        block = self.fixture.blocks.get(number)
+        if block is None:
+            return {
+                "number": hex(number),
+                "hash": fake_hash(number),
+                "parentHash": fake_hash(number - 1),
+                "timestamp": hex(self.timestamp(number)),
+                "extraData": "0x",
+                "transactions": [],
+            }
+
+        if not full_transactions:
+            return {
+                **block,
+                "transactions": [tx["hash"] for tx in block["transactions"]],
+            }
+
+        with self._lock:
+            self.stats.served_blocks.setdefault(number, time.perf_counter())
+
+        return block
+
+    def get_logs(self, f: dict[str, Any]) -> list[dict[str, Any]]:
+        head = self.head()
+        start = self.block_number(f.get("fromBlock", "latest"))
+        end = min(self.block_number(f.get("toBlock", "latest")), head)
+
+        address = f.get("address")
+        if isinstance(address, str):
+            address = [address]
+        addresses = {a.lower() for a in address} if address else None
+
+        topics = f.get("topics") or []
+
+        logs = []
+        for number in range(start, end + 1):
+            for log in self.fixture.logs.get(number, []):
+                if addresses is not None and log["address"].lower() not in addresses:
+                    continue
+                if not all(
+                    t is None
+                    or (
+                        log["topics"][i] in t
+                        if isinstance(t, list)
+                        else log["topics"][i] == t
+                    )
+                    for i, t in enumerate(topics)
+                ):
+                    continue
+                logs.append(log)
+
+        return logs
+
+    def txpool_content(self) -> dict[str, dict[str, dict[str, RawTx]]]:
+        head = self.head()
+        in_flight = [
+            {**tx, "blockHash": None, "blockNumber": None, "transactionIndex": None}
+            for number in range(head + 1, head + 1 + TXPOOL_BLOCKS)
+            for tx in self.fixture.blocks.get(number, {}).get("transactions", [])
+        ]
+
+        content: dict[str, dict[str, dict[str, RawTx]]] = {}
+        for section, txs in [
+            ("pending", in_flight + self.fixture.txpool.get("pending", [])),
+            ("queued", self.fixture.txpool.get("queued", [])),
+        ]:
+            by_sender = content.setdefault(section, {})
+            for tx in txs:
+                by_sender.setdefault(tx["from"], {})[str(int(tx["nonce"], 16))] = tx
+
+        return content
+
+    def call(self, method: str, params: list[Any]) -> Any:
+        match method:
+            case "eth_chainId":
+                return hex(self.fixture.chain_id)
+            case "net_version":
+                return str(self.fixture.chain_id)
+            case "web3_clientVersion":
+                return self.fixture.client_version
+            case "eth_blockNumber":
+                head = self.head()
+                served = self.stats.served_blocks
+                if head == self.fixture.end_block and (
+                    self.fixture.end_block - 1 in served
+                    or self.fixture.end_block - 1 not in self.fixture.blocks
+                ):
+                    self.idle.set()
+                return hex(head)
+            case "eth_getBlockByNumber":
+                return self.get_block(params[0], params[1])
+            case "eth_getLogs":
+                return self.get_logs(params[0])
+            case "txpool_content":
+                return self.txpool_content()
+            case "eth_call":
+                key = call_key(params[0]["to"], params[0]["data"])
+                if key not in self.fixture.calls:
+                    raise RpcError(f"eth_call not recorded: {key}")
+                return self.fixture.calls[key]
+            case _:
+                raise RpcError(f"method {method} not supported")
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        method = request["method"]
+        with self._lock:
+            self.stats.calls[method] += 1
+
+        response: dict[str, Any] = {"jsonrpc": "2.0", "id": request.get("id")}
+        try:
+            response["result"] = self.call(method, request.get("params") or [])
+        except RpcError as e:
+            response["error"] = {"code": -32000, "message": str(e)}
+
+        return response
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level="INFO")
+
+    parser = argparse.ArgumentParser(description="Serve a fixture as a json-rpc node.")
+    parser.add_argument("fixture")
+    parser.add_argument("--port", type=int, default=8545)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument(
+        "--blocks-per-second",
+        type=float,
+        default=1.0,
+        help="speed at which the head advances (inf to start at the end)",
+    )
+    args = parser.parse_args()
+
+    node = FakeNode(
+        Fixture.load(args.fixture),
+        latency=args.latency,
+        jitter=args.jitter,
+        blocks_per_second=args.blocks_per_second,
+        port=args.port,
+    )
+    LOGGER.info(f"serving {args.fixture} on {node.start()}")
+    threading.Event().wait()
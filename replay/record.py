@@ -0,0 +1,196 @@
+import argparse
+import asyncio
+import logging
+import os
+from typing import Any
+
+import dotenv
+from eth_utils.address import to_checksum_address
+from web3 import AsyncWeb3, Web3
+from web3.middleware import ExtraDataToPOAMiddleware
+from web3.types import RPCEndpoint
+
+from configuration.config import get_epoch
+from configuration.types import (
+    FLARE_CONTRACT_REGISTRY_ABI,
+    FLARE_CONTRACT_REGISTRY_ADDRESS,
+    Contracts,
+)
+from observer.observer import find_block_by_timestamp
+
+from .fixture import Fixture, call_key
+
+LOGGER = logging.getLogger(__name__)
+
+
+async def request(w: AsyncWeb3, method: str, params: list[Any]) -> Any:
+    response = await w.provider.make_request(RPCEndpoint(method), params)
+    if "error" in response:
+        raise RuntimeError(f"{method} {params} failed: {response['error']}")
+    # a response without an error carries a result
+    return response.get("result")
+
+
+async def record_calls(w: AsyncWeb3, fixture: Fixture) -> list[str]:
+    # contract registry lookups made by Contracts.get_contracts
+    registry = Web3().eth.contract(
+        address=FLARE_CONTRACT_REGISTRY_ADDRESS, abi=FLARE_CONTRACT_REGISTRY_ABI
+    )
+
+    addresses = []
+    for name in [a.name for a in Contracts.__attrs_attrs__]:  # type: ignore
+        data = registry.encode_abi("getContractAddressByName", [name])
+        result = await request(
+            w,
+            "eth_call",
+            [{"to": FLARE_CONTRACT_REGISTRY_ADDRESS, "data": data}, "latest"],
+        )
+        fixture.calls[call_key(FLARE_CONTRACT_REGISTRY_ADDRESS, data)] = result
+        addresses.append(to_checksum_address("0x" + result[-40:]))
+
+    # batched lookup the observer uses to check for moved contracts
+    names = [a.name for a in Contracts.__attrs_attrs__]  # type: ignore
+    data = registry.encode_abi("getContractAddressesByName", [names])
+    fixture.calls[call_key(FLARE_CONTRACT_REGISTRY_ADDRESS, data)] = await request(
+        w, "eth_call", [{"to": FLARE_CONTRACT_REGISTRY_ADDRESS, "data": data}, "latest"]
+    )
+
+    return addresses
+
+
+async def record_blocks(
+    w: AsyncWeb3, fixture: Fixture, start: int, end: int, concurrency: int
+) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(number: int):
+        async with semaphore:
+            fixture.add_block(
+                await request(w, "eth_getBlockByNumber", [hex(number), True])
+            )
+
+    await asyncio.gather(*(fetch(n) for n in range(start, end + 1)))
+
+
+async def record_logs(
+    w: AsyncWeb3,
+    fixture: Fixture,
+    addresses: list[str],
+    start: int,
+    end: int,
+    log_range: int,
+    concurrency: int,
+) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(s: int):
+        async with semaphore:
+            logs = await request(
+                w,
+                "eth_getLogs",
+                [
+                    {
+                        "address": addresses,
+                        "fromBlock": hex(s),
+                        "toBlock": hex(min(s + log_range - 1, end)),
+                    }
+                ],
+            )
+        for log in logs:
+            fixture.add_log(log)
+
+    await asyncio.gather(*(fetch(s) for s in range(start, end + 1, log_range)))
+
+
+async def record_anchor(w: AsyncWeb3, fixture: Fixture, number: int) -> None:
+    block = await request(w, "eth_getBlockByNumber", [hex(number), False])
+    fixture.anchors[number] = int(block["timestamp"], 16)
+
+
+async def record(
+    rpc_url: str,
+    identity_address: str,
+    start_block: int,
+    end_block: int,
+    concurrency: int = 16,
+    log_range: int = 30,
+) -> Fixture:
+    """
+    Record everything the observer reads while following [start_block,
+    end_block]: registry lookups, full blocks and logs of the span, and the
+    logs of the voter registration window of the reward epoch at start_block.
+    """
+    w = AsyncWeb3(
+        AsyncWeb3.AsyncHTTPProvider(rpc_url),
+        middleware=[ExtraDataToPOAMiddleware],
+    )
+
+    chain_id = int(await request(w, "eth_chainId", []), 16)
+    fixture = Fixture(
+        chain_id=chain_id,
+        client_version=await request(w, "web3_clientVersion", []),
+        identity_address=to_checksum_address(identity_address),
+        start_block=start_block,
+        end_block=end_block,
+    )
+
+    addresses = await record_calls(w, fixture)
+
+    LOGGER.info(f"recording blocks [{start_block}, {end_block}]")
+    await record_blocks(w, fixture, start_block, end_block, concurrency)
+    await record_logs(
+        w, fixture, addresses, start_block, end_block, log_range, concurrency
+    )
+
+    # voter registration period is 2h before the reward epoch and lasts 30min,
+    # record it with a margin since the observer only estimates the blocks
+    start_ts = int(fixture.blocks[start_block]["timestamp"], 16)
+    reward_epoch = get_epoch(chain_id).reward_epoch_factory.from_timestamp(start_ts)
+    window_start = await find_block_by_timestamp(
+        w, reward_epoch.start_s - 9000 - 1800, hi=start_block
+    )
+    window_end = await find_block_by_timestamp(
+        w, reward_epoch.start_s - 3600 + 1800, hi=start_block
+    )
+
+    LOGGER.info(f"recording registration window [{window_start}, {window_end}]")
+    await record_logs(
+        w, fixture, addresses, window_start, window_end, log_range, concurrency
+    )
+    for number in range(window_start, window_end + 1, 100):
+        await record_anchor(w, fixture, number)
+
+    return fixture
+
+
+async def main(args: argparse.Namespace) -> None:
+    fixture = await record(
+        args.rpc_url,
+        args.identity_address,
+        args.start_block,
+        args.end_block,
+        args.concurrency,
+        args.log_range,
+    )
+    fixture.save(args.output)
+    LOGGER.info(f"saved {len(fixture.blocks)} blocks to {args.output}")
+
+
+if __name__ == "__main__":
+    dotenv.load_dotenv()
+    logging.basicConfig(level="INFO")
+
+    parser = argparse.ArgumentParser(
+        description="Record json-rpc data for a span of blocks into a fixture."
+    )
+    parser.add_argument("output", help="fixture file (.json.gz)")
+    parser.add_argument("--rpc-url", default=os.environ.get("RPC_URL"))
+    parser.add_argument(
+        "--identity-address", default=os.environ.get("IDENTITY_ADDRESS")
+    )
+    parser.add_argument("--start-block", type=int, required=True)
+    parser.add_argument("--end-block", type=int, required=True)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--log-range", type=int, default=30)
+
+    asyncio.run(main(parser.parse_args()))
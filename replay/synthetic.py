@@ -0,0 +1,555 @@
+import argparse
+import bisect
+import logging
+import random
+from typing import Any, Self
+
+from attrs import define, field, frozen
+from eth_keys.datatypes import PrivateKey
+from eth_typing import ChecksumAddress
+from eth_utils.address import to_checksum_address
+from eth_utils.crypto import keccak
+from web3 import Web3
+
+from configuration.config import ChainId, get_epoch
+from configuration.types import (
+    FLARE_CONTRACT_REGISTRY_ABI,
+    FLARE_CONTRACT_REGISTRY_ADDRESS,
+    Alert,
+    Balance,
+    Configuration,
+    Contract,
+    Contracts,
+    Notification,
+)
+from observer.types import ProtocolMessageRelayed
+
+from .encoding import (
+    encode_call,
+    encode_event,
+    encode_fdc_submit2,
+    encode_ftso_submit2,
+    encode_payload,
+    encode_submit_signatures,
+    ftso_commit,
+    private_key,
+    sign_hash,
+)
+from .fixture import Fixture, RawBlock, RawTx, call_key
+from .node import fake_hash
+
+LOGGER = logging.getLogger(__name__)
+
+# base fee of every block and gas price of included transactions, in wei
+BASE_FEE = 25 * 10**9
+
+
+def address(seed: str) -> ChecksumAddress:
+    return to_checksum_address(keccak(text=seed)[-20:])
+
+
+def make_contracts() -> Contracts:
+    # contracts at made up addresses, served by the generated registry calls
+    names = [a.name for a in Contracts.__attrs_attrs__]  # type: ignore
+    return Contracts(
+        **{
+            name: Contract(name, address(name), f"configuration/artifacts/{name}.json")
+            for name in names
+        }
+    )
+
+
+def make_config(chain_id: int, identity_address: ChecksumAddress) -> Configuration:
+    # configuration that needs no rpc
+    return Configuration(
+        identity_address=identity_address,
+        chain_id=chain_id,
+        contracts=make_contracts(),
+        rpc_url="http://127.0.0.1:0",
+        epoch=get_epoch(chain_id),
+        notification=Notification(None, None, None, None, 0),
+        alert=Alert(None, 0, 0, 0, 0, 0),
+        balance=Balance(0, 0),
+        confirmations=0,
+        history_file=None,
+        profiling=False,
+        status_port=None,
+        mempool_poll_seconds=0,
+        validator_metrics_port=None,
+    )
+
+
+@define
+class Voter:
+    identity_address: ChecksumAddress
+    submit_address: ChecksumAddress
+    submit_signatures_address: ChecksumAddress
+    signing_policy_key: PrivateKey
+    signing_policy_address: ChecksumAddress
+    delegation_address: ChecksumAddress
+
+    @classmethod
+    def make(cls, i: int) -> Self:
+        key = private_key(f"signing_policy:{i}")
+        return cls(
+            identity_address=address(f"identity:{i}"),
+            submit_address=address(f"submit:{i}"),
+            submit_signatures_address=address(f"submit_signatures:{i}"),
+            signing_policy_key=key,
+            signing_policy_address=key.public_key.to_checksum_address(),
+            delegation_address=address(f"delegation:{i}"),
+        )
+
+
+def tx_hash(sender: ChecksumAddress, nonce: int) -> str:
+    return "0x" + keccak(bytes.fromhex(sender[2:]) + nonce.to_bytes(8, "big")).hex()
+
+
+@frozen
+class Spec:
+    chain_id: int = ChainId.FLARE
+    # defaults to the current reward epoch
+    reward_epoch_id: int | None = None
+
+    voters: int = 100
+    feeds: int = 60
+    attestation_requests: int = 20
+    # voting rounds that are completed within the generated span
+    rounds: int = 20
+
+    # average seconds between blocks, with burst_probability a block shares the
+    # timestamp of the previous one, producing bursts followed by gaps
+    block_time: float = 1.0
+    burst_probability: float = 0.0
+    # unrelated transactions per block, eg. fast updates
+    fast_updates_per_block: int = 0
+
+    # probability that a voter skips any of its transactions in a round
+    miss_probability: float = 0.0
+    # signatures of the observed voter (voter 0) are always valid, signing for
+    # every voter is slow and only matters to consumers that check all of them
+    sign_all: bool = False
+    # the observed voter has an underpriced submit2 pending and a submit
+    # signatures queued behind a nonce gap in the txpool
+    stuck_transactions: bool = False
+
+    seed: int = 0
+
+
+@define
+class Tx:
+    timestamp: int
+    sender: ChecksumAddress
+    to: ChecksumAddress
+    data: bytes
+
+
+def raw_tx(tx: Tx, nonce: int, gas_price: int) -> RawTx:
+    return {
+        "hash": tx_hash(tx.sender, nonce),
+        "blockHash": None,
+        "blockNumber": None,
+        "transactionIndex": None,
+        "from": tx.sender,
+        "to": tx.to,
+        "input": "0x" + tx.data.hex(),
+        "nonce": hex(nonce),
+        "value": "0x0",
+        "gas": hex(2_000_000),
+        "gasPrice": hex(gas_price),
+        "type": "0x0",
+    }
+
+
+@define
+class Log:
+    timestamp: int
+    address: ChecksumAddress
+    topics: list[str]
+    data: str
+
+
+@define
+class Generator:
+    spec: Spec
+    fixture: Fixture = field(init=False)
+
+    _random: random.Random = field(init=False)
+    _contracts: Contracts = field(init=False)
+    _voters: list[Voter] = field(init=False)
+    _txs: list[Tx] = field(factory=list)
+    _logs: list[Log] = field(factory=list)
+    _nonces: dict[ChecksumAddress, int] = field(factory=dict)
+    _selectors: dict[str, str] = field(init=False)
+
+    def __attrs_post_init__(self):
+        self._random = random.Random(self.spec.seed)
+        self._contracts = make_contracts()
+        self._voters = [Voter.make(i) for i in range(self.spec.voters)]
+        self._selectors = {
+            name: self._contracts.Submission.functions[name].signature
+            for name in ["submit1", "submit2", "submitSignatures"]
+        }
+        self.fixture = Fixture(
+            chain_id=self.spec.chain_id,
+            client_version="synthetic/1.0",
+            identity_address=self._voters[0].identity_address,
+        )
+
+    def event(self, ts: int, contract: Contract, name: str, **args: Any) -> None:
+        topics, data = encode_event(contract.events[name], args)
+        self._logs.append(Log(ts, contract.address, topics, data))
+
+    def registry_calls(self) -> None:
+        registry = Web3().eth.contract(
+            address=FLARE_CONTRACT_REGISTRY_ADDRESS, abi=FLARE_CONTRACT_REGISTRY_ABI
+        )
+        names = [a.name for a in Contracts.__attrs_attrs__]  # type: ignore
+        for name in names:
+            contract = getattr(self._contracts, name)
+            data = registry.encode_abi("getContractAddressByName", [name])
+            result = "0x" + bytes(12).hex() + contract.address[2:].lower()
+            self.fixture.calls[call_key(FLARE_CONTRACT_REGISTRY_ADDRESS, data)] = result
+
+        # the observer checks all addresses at once for moved contracts
+        data = registry.encode_abi("getContractAddressesByName", [names])
+        addresses = [getattr(self._contracts, name).address for name in names]
+        result = "0x" + Web3().codec.encode(["address[]"], [addresses]).hex()
+        self.fixture.calls[call_key(FLARE_CONTRACT_REGISTRY_ADDRESS, data)] = result
+
+    def signing_policy_events(self, reward_epoch_id: int) -> None:
+        # the observer reads the registration window 2h30min to 1h before the
+        # reward epoch with a tolerance of 10min on both ends
+        c = self._contracts
+        reward_epoch = get_epoch(self.spec.chain_id).reward_epoch(reward_epoch_id)
+        start = reward_epoch.start_s
+
+        self.event(
+            start - 8300,
+            c.FlareSystemsManager,
+            "RandomAcquisitionStarted",
+            rewardEpochId=reward_epoch_id,
+            timestamp=start - 8300,
+        )
+        self.event(
+            start - 8000,
+            c.FlareSystemsManager,
+            "VotePowerBlockSelected",
+            rewardEpochId=reward_epoch_id,
+            votePowerBlock=1,
+            timestamp=start - 8000,
+        )
+
+        n = len(self._voters)
+        for i, v in enumerate(self._voters):
+            ts = start - 7500 + 3000 * i // n
+            self.event(
+                ts,
+                c.VoterRegistry,
+                "VoterRegistered",
+                voter=v.identity_address,
+                rewardEpochId=reward_epoch_id,
+                signingPolicyAddress=v.signing_policy_address,
+                submitAddress=v.submit_address,
+                submitSignaturesAddress=v.submit_signatures_address,
+                publicKeyPart1=bytes(32),
+                publicKeyPart2=bytes(32),
+                registrationWeight=10**6 + i,
+            )
+            self.event(
+                ts,
+                c.FlareSystemsCalculator,
+                "VoterRegistrationInfo",
+                voter=v.identity_address,
+                rewardEpochId=reward_epoch_id,
+                delegationAddress=v.delegation_address,
+                delegationFeeBIPS=2000,
+                wNatWeight=10**24,
+                wNatCappedWeight=10**24,
+                nodeIds=[keccak(text=f"node:{i}")[:20]],
+                nodeWeights=[10**24],
+            )
+
+        self.event(
+            start - 4300,
+            c.Relay,
+            "SigningPolicyInitialized",
+            rewardEpochId=reward_epoch_id,
+            startVotingRoundId=reward_epoch.to_first_voting_epoch().id,
+            threshold=(2**16 - 1) // 2,
+            seed=self._random.getrandbits(256),
+            voters=[v.signing_policy_address for v in self._voters],
+            weights=[(2**16 - 1) // n] * n,
+            signingPolicyBytes=b"",
+            timestamp=start - 4300,
+        )
+
+    def transact(self, ts: int, sender: ChecksumAddress, data: bytes) -> None:
+        self._txs.append(Tx(ts, sender, self._contracts.Submission.address, data))
+
+    def voting_round(self, voting_round_id: int) -> None:
+        spec = self.spec
+        rnd = self._random
+        epoch = get_epoch(spec.chain_id).voting_epoch(voting_round_id)
+        c = self._contracts
+        selectors = self._selectors
+
+        ftso_root = rnd.randbytes(32)
+        fdc_root = rnd.randbytes(32)
+        finalized_at = epoch.next.start_s + rnd.randint(47, 54)
+        ftso = ProtocolMessageRelayed(100, voting_round_id, True, ftso_root.hex(), 0)
+        fdc = ProtocolMessageRelayed(200, voting_round_id, True, fdc_root.hex(), 0)
+        for m in [ftso, fdc]:
+            self.event(
+                finalized_at,
+                c.Relay,
+                "ProtocolMessageRelayed",
+                protocolId=m.protocol_id,
+                votingRoundId=voting_round_id,
+                isSecureRandom=True,
+                merkleRoot=bytes.fromhex(m.merkle_root),
+            )
+
+        bit_vector = [rnd.random() < 0.9 for _ in range(spec.attestation_requests)]
+
+        for i, v in enumerate(self._voters):
+            random_value = rnd.getrandbits(256)
+            values: list[int | None] = [
+                rnd.randint(-(2**20), 2**20) for _ in range(spec.feeds)
+            ]
+            commit = ftso_commit(
+                v.submit_address, voting_round_id, random_value, values
+            )
+
+            if rnd.random() >= spec.miss_probability:
+                self.transact(
+                    epoch.start_s + rnd.randint(1, 80),
+                    v.submit_address,
+                    encode_call(
+                        selectors["submit1"],
+                        encode_payload(100, voting_round_id, commit),
+                    ),
+                )
+
+            if rnd.random() >= spec.miss_probability:
+                self.transact(
+                    epoch.next.start_s + rnd.randint(1, 40),
+                    v.submit_address,
+                    encode_call(
+                        selectors["submit2"],
+                        encode_payload(
+                            100,
+                            voting_round_id,
+                            encode_ftso_submit2(random_value, values),
+                        ),
+                        encode_payload(
+                            200, voting_round_id, encode_fdc_submit2(bit_vector)
+                        ),
+                    ),
+                )
+
+            if rnd.random() >= spec.miss_probability:
+                payloads = []
+                for m, root in [(ftso, ftso_root), (fdc, fdc_root)]:
+                    if i == 0 or spec.sign_all:
+                        signature = sign_hash(v.signing_policy_key, m.to_message())
+                    else:
+                        signature = bytes([27]) + rnd.randbytes(64)
+                    payloads.append(
+                        encode_payload(
+                            m.protocol_id,
+                            voting_round_id,
+                            encode_submit_signatures(
+                                signature, m.protocol_id, voting_round_id, root
+                            ),
+                        )
+                    )
+
+                self.transact(
+                    epoch.next.reveal_deadline() + rnd.randint(1, 8),
+                    v.submit_signatures_address,
+                    encode_call(selectors["submitSignatures"], *payloads),
+                )
+
+    def block_timestamps(self, start_ts: int, end_ts: int) -> list[int]:
+        rnd = self._random
+        timestamps = [start_ts]
+        while timestamps[-1] < end_ts:
+            if rnd.random() < self.spec.burst_probability:
+                timestamps.append(timestamps[-1])
+            else:
+                interval = rnd.expovariate(1 / self.spec.block_time)
+                timestamps.append(timestamps[-1] + max(1, round(interval)))
+        return timestamps
+
+    def build_blocks(self, start_block: int, timestamps: list[int]) -> None:
+        rnd = self._random
+        fixture = self.fixture
+
+        def block_index(ts: int) -> int:
+            # transactions are included in the first block at or after ts
+            return min(bisect.bisect_left(timestamps, ts), len(timestamps) - 1)
+
+        txs_by_block: dict[int, list[Tx]] = {}
+        for tx in self._txs:
+            txs_by_block.setdefault(block_index(tx.timestamp), []).append(tx)
+
+        fast_updater = address("FastUpdater")
+        for i, ts in enumerate(timestamps):
+            number = start_block + i
+            block_hash = fake_hash(number)
+
+            txs = txs_by_block.get(i, [])
+            for _ in range(self.spec.fast_updates_per_block):
+                sender = address(f"fast_updater:{rnd.randrange(1000)}")
+                txs.append(Tx(ts, sender, fast_updater, rnd.randbytes(4 + 96)))
+            rnd.shuffle(txs)
+
+            raw_txs = []
+            for index, tx in enumerate(txs):
+                nonce = self._nonces.get(tx.sender, 0)
+                self._nonces[tx.sender] = nonce + 1
+                raw_txs.append(
+                    {
+                        **raw_tx(tx, nonce, BASE_FEE),
+                        "blockHash": block_hash,
+                        "blockNumber": hex(number),
+                        "transactionIndex": hex(index),
+                    }
+                )
+
+            block: RawBlock = {
+                "number": hex(number),
+                "hash": block_hash,
+                "parentHash": fake_hash(number - 1),
+                "timestamp": hex(ts),
+                "extraData": "0x",
+                "miner": "0x" + bytes(20).hex(),
+                "gasLimit": hex(8_000_000),
+                "gasUsed": hex(21_000 * len(raw_txs)),
+                "baseFeePerGas": hex(BASE_FEE),
+                "transactions": raw_txs,
+            }
+            fixture.add_block(block)
+
+    def add_logs(self, start_block: int, timestamps: list[int]) -> None:
+        start_ts = timestamps[0]
+        log_index: dict[int, int] = {}
+
+        for log in sorted(self._logs, key=lambda log: log.timestamp):
+            if log.timestamp < start_ts:
+                # before the generated span blocks are 1s apart
+                number = start_block - (start_ts - log.timestamp)
+            else:
+                i = bisect.bisect_left(timestamps, log.timestamp)
+                number = start_block + min(i, len(timestamps) - 1)
+
+            index = log_index.get(number, 0)
+            log_index[number] = index + 1
+            self.fixture.add_log(
+                {
+                    "address": log.address,
+                    "topics": log.topics,
+                    "data": log.data,
+                    "blockNumber": hex(number),
+                    "blockHash": fake_hash(number),
+                    "transactionHash": "0x" + keccak(log.data.encode()).hex(),
+                    "transactionIndex": "0x0",
+                    "logIndex": hex(index),
+                    "removed": False,
+                }
+            )
+
+    def stuck_transactions(self, ts: int) -> None:
+        voter = self._voters[0]
+        submission = self._contracts.Submission.address
+        selectors = self._selectors
+        # far above any nonce the voter uses in the generated span
+        nonce = 10**6
+
+        pending = Tx(
+            ts, voter.submit_address, submission, bytes.fromhex(selectors["submit2"])
+        )
+        queued = Tx(
+            ts,
+            voter.submit_signatures_address,
+            submission,
+            bytes.fromhex(selectors["submitSignatures"]),
+        )
+        self.fixture.txpool = {
+            "pending": [raw_tx(pending, nonce, BASE_FEE // 25)],
+            "queued": [raw_tx(queued, nonce + 2, BASE_FEE)],
+        }
+
+    def generate(self) -> Fixture:
+        spec = self.spec
+        epoch = get_epoch(spec.chain_id)
+
+        if spec.reward_epoch_id is None:
+            reward_epoch = epoch.reward_epoch_factory.now()
+        else:
+            reward_epoch = epoch.reward_epoch(spec.reward_epoch_id)
+
+        # the observer starts mid round, waits for the next one and reports a
+        # round once the round after it has ended
+        first = reward_epoch.to_first_voting_epoch().next
+        last = epoch.voting_epoch(first.id + spec.rounds - 1)
+        start_ts = first.previous.start_s + 30
+        end_ts = last.next.end_s + 10
+        assert end_ts < reward_epoch.next.start_s, "rounds exceed the reward epoch"
+
+        self.registry_calls()
+        self.signing_policy_events(reward_epoch.id)
+        for voting_round_id in range(first.id, last.id + 1):
+            self.voting_round(voting_round_id)
+
+        # block numbers roughly match the timestamp so registration window
+        # searches start close to their target
+        start_block = start_ts - epoch.reward_epoch(0).start_s
+        timestamps = self.block_timestamps(start_ts, end_ts)
+        self.build_blocks(start_block, timestamps)
+        self.add_logs(start_block, timestamps)
+        if spec.stuck_transactions:
+            self.stuck_transactions(start_ts)
+
+        fixture = self.fixture
+        fixture.start_block = start_block
+        fixture.end_block = start_block + len(timestamps) - 1
+        # blocks before the span are 1s apart
+        fixture.anchors[0] = start_ts - start_block
+
+        return fixture
+
+
+def generate(spec: Spec) -> Fixture:
+    return Generator(spec).generate()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level="INFO")
+
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic chain fixture for the fake node."
+    )
+    parser.add_argument("output", help="fixture file (.json.gz)")
+    parser.add_argument("--chain-id", type=int, default=ChainId.FLARE)
+    parser.add_argument("--reward-epoch-id", type=int)
+    parser.add_argument("--voters", type=int, default=100)
+    parser.add_argument("--feeds", type=int, default=60)
+    parser.add_argument("--attestation-requests", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--block-time", type=float, default=1.0)
+    parser.add_argument("--burst-probability", type=float, default=0.0)
+    parser.add_argument("--fast-updates-per-block", type=int, default=0)
+    parser.add_argument("--miss-probability", type=float, default=0.0)
+    parser.add_argument("--sign-all", action="store_true")
+    parser.add_argument("--stuck-transactions", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    fixture = generate(Spec(**{k: v for k, v in vars(args).items() if k != "output"}))
+    fixture.save(args.output)
+    LOGGER.info(
+        f"generated blocks [{fixture.start_block}, {fixture.end_block}] "
+        f"for identity_address={fixture.identity_address}"
+    )
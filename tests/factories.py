@@ -0,0 +1,45 @@
+from eth_typing import ChecksumAddress
+from eth_utils.address import to_checksum_address
+
+from configuration.config import ChainId, get_epoch
+from observer.reward_epoch_manager import Entity, EntityMapper, SigningPolicy
+
+EPOCH = get_epoch(ChainId.FLARE)
+
+IDENTITY = to_checksum_address("0x" + "11" * 20)
+OTHER = to_checksum_address("0x" + "22" * 20)
+
+
+def entity(identity_address: ChecksumAddress, weight: int) -> Entity:
+    return Entity(
+        identity_address=identity_address,
+        submit_address=identity_address,
+        submit_signatures_address=identity_address,
+        signing_policy_address=identity_address,
+        delegation_address=identity_address,
+        public_key="",
+        nodes=[],
+        delegation_fee_bips=0,
+        w_nat_weight=weight,
+        w_nat_capped_weight=weight,
+        registration_weight=weight,
+        normalized_weight=weight,
+    )
+
+
+def policy(
+    reward_epoch_id: int, start_voting_round: int, entities: list[Entity]
+) -> SigningPolicy:
+    mapper = EntityMapper()
+    for e in entities:
+        mapper.insert(e)
+    return SigningPolicy(
+        reward_epoch=EPOCH.reward_epoch_factory.make_epoch(reward_epoch_id),
+        vote_power_block=0,
+        start_voting_round=start_voting_round,
+        threshold=0,
+        seed=0,
+        signing_policy_bytes="",
+        entities=entities,
+        entity_mapper=mapper,
+    )
@@ -0,0 +1,72 @@
+from observer.alert_state import AlertStateStore
+from observer.message import Message, MessageLevel
+
+from .factories import EPOCH, IDENTITY
+
+
+def builder(round):
+    return Message.builder().add(
+        round=EPOCH.voting_epoch(round), protocol=100, identity_address=IDENTITY
+    )
+
+
+def missing(round):
+    return builder(round).build(
+        MessageLevel.ERROR, "no submit1 transaction", "submit1_missing"
+    )
+
+
+def test_only_state_changes_are_notified():
+    store = AlertStateStore(None, escalation_rounds=3, suppression_rounds=0)
+
+    assert store.update(builder(1000), [missing(1000)]) == [missing(1000)]
+    assert store.update(builder(1001), [missing(1001)]) == []
+
+    [escalated] = store.update(builder(1002), [missing(1002)])
+    assert escalated.level == MessageLevel.CRITICAL
+    assert "3 consecutive rounds" in escalated.message
+    assert store.update(builder(1003), [missing(1003)]) == []
+
+    [resolved] = store.update(builder(1004), [])
+    assert resolved.level == MessageLevel.INFO
+    assert resolved.check == "submit1_missing"
+    assert store.states[(IDENTITY, 100)] == {}
+
+
+def test_still_failing_check_is_notified_again():
+    store = AlertStateStore(None, escalation_rounds=0, suppression_rounds=2)
+
+    store.update(builder(1000), [missing(1000)])
+    assert store.update(builder(1001), [missing(1001)]) == []
+    [reminder] = store.update(builder(1002), [missing(1002)])
+    assert "still failing since round 1000" in reminder.message
+
+
+def test_issues_without_check_are_always_notified():
+    store = AlertStateStore(None, escalation_rounds=0, suppression_rounds=0)
+    issue = builder(1000).build(MessageLevel.WARNING, "late submit2 transaction")
+
+    assert store.update(builder(1000), [issue]) == [issue]
+    assert store.update(builder(1001), [issue]) == [issue]
+
+
+def test_state_survives_a_restart(tmp_path):
+    path = str(tmp_path / "alert_state.json")
+    store = AlertStateStore.load(path, escalation_rounds=0, suppression_rounds=0)
+    store.update(builder(1000), [missing(1000)])
+    store.update(builder(1001), [missing(1001)])
+    store.save()
+
+    restored = AlertStateStore.load(path, escalation_rounds=0, suppression_rounds=0)
+    assert restored.states == store.states
+    # a round processed before the restart is not counted twice
+    assert restored.update(builder(1001), [missing(1001)]) == []
+    assert restored.states[(IDENTITY, 100)]["submit1_missing"].consecutive == 2
+
+
+def test_unreadable_state_file_starts_empty(tmp_path):
+    path = tmp_path / "alert_state.json"
+    path.write_text("{not json")
+
+    store = AlertStateStore.load(str(path), escalation_rounds=0, suppression_rounds=0)
+    assert store.states == {}
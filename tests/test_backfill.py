@@ -0,0 +1,36 @@
+import asyncio
+from typing import cast
+
+from web3 import AsyncWeb3
+
+from configuration.config import ChainId
+from observer import backfill
+from observer.backfill import resolve_signing_policies
+from replay.synthetic import make_config
+
+from .factories import EPOCH, IDENTITY, entity, policy
+
+CONFIG = make_config(ChainId.FLARE, IDENTITY)
+# get_signing_policy is replaced, the node is never used
+NODE = cast(AsyncWeb3, None)
+
+
+def start_round(reward_epoch_id: int) -> int:
+    reward_epoch = EPOCH.reward_epoch_factory.make_epoch(reward_epoch_id)
+    return EPOCH.voting_epoch_factory.from_timestamp(reward_epoch.start_s).id
+
+
+def test_reward_epoch_without_a_policy_is_skipped(monkeypatch):
+    async def get_signing_policy(w, config, reward_epoch):
+        if reward_epoch.id == 300:
+            # the VoterRegistered event of a voter in the policy is missing
+            raise KeyError("0x" + "33" * 20)
+        return policy(
+            reward_epoch.id, start_round(reward_epoch.id), [entity(IDENTITY, 10)]
+        )
+
+    monkeypatch.setattr(backfill, "get_signing_policy", get_signing_policy)
+
+    first = start_round(300)
+    policies = asyncio.run(resolve_signing_policies(NODE, CONFIG, first, first + 1))
+    assert [p.reward_epoch.id for p in policies] == [299]
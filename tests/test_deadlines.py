@@ -0,0 +1,42 @@
+import time
+
+from observer.deadlines import DeadlineScheduler
+
+from .factories import EPOCH
+
+
+def test_warning_waits_for_processed_blocks():
+    calls = []
+    scheduler = DeadlineScheduler(
+        {"submit2": 10}, lambda e, p, d: calls.append((e.id, p, d))
+    )
+    epoch = EPOCH.voting_epoch(1000)
+    deadline = int(time.time()) + 30
+
+    # the timer fires while the observer is behind the time of the warning
+    scheduler.processed(deadline - 20)
+    scheduler._fire(epoch, "submit2", deadline)
+    assert calls == []
+
+    scheduler.processed(deadline - 11)
+    assert calls == []
+
+    scheduler.processed(deadline - 10)
+    assert calls == [(1000, "submit2", deadline)]
+
+    # up to date, called right away
+    scheduler._fire(epoch, "submit2", deadline)
+    assert len(calls) == 2
+
+
+def test_warning_is_dropped_after_the_deadline():
+    calls = []
+    scheduler = DeadlineScheduler(
+        {"submit2": 10}, lambda e, p, d: calls.append((e.id, p, d))
+    )
+    deadline = int(time.time()) - 1
+
+    scheduler._fire(EPOCH.voting_epoch(1000), "submit2", deadline)
+    scheduler.processed(deadline)
+    assert calls == []
+    assert scheduler.deferred == []
@@ -0,0 +1,70 @@
+from configuration.config import ChainId
+from observer.digest import MessageCoalescer
+from observer.message import Message, MessageLevel
+from observer.notification import format_digest
+
+from .factories import EPOCH, IDENTITY, OTHER
+
+
+def message(level, text, round=1000, identity=IDENTITY):
+    return (
+        Message.builder()
+        .add(
+            network=ChainId.FLARE,
+            round=EPOCH.voting_epoch(round),
+            identity_address=identity,
+        )
+        .build(level, text)
+    )
+
+
+def test_messages_of_a_round_are_coalesced():
+    coalescer = MessageCoalescer(30)
+    a = message(MessageLevel.ERROR, "no submit1 transaction")
+    b = message(MessageLevel.ERROR, "no submit2 transaction")
+    other = message(MessageLevel.ERROR, "no submit1 transaction", identity=OTHER)
+    warning = message(MessageLevel.WARNING, "late submit2 transaction")
+
+    for m in (a, b, other, warning):
+        assert coalescer.add(m, now=100) == []
+
+    batches = coalescer.flush(now=130)
+    assert sorted(batches, key=len) == [[warning], [other], [a, b]]
+    assert coalescer.pending == {}
+
+
+def test_digest_is_held_until_its_window_elapsed():
+    coalescer = MessageCoalescer(30)
+    first = message(MessageLevel.ERROR, "first", round=1000)
+    second = message(MessageLevel.ERROR, "second", round=1001)
+
+    coalescer.add(first, now=100)
+    coalescer.add(second, now=120)
+    assert coalescer.flush(now=129) == []
+    assert coalescer.flush(now=130) == [[first]]
+    assert coalescer.flush(now=140) == []
+    assert coalescer.flush(now=140, force=True) == [[second]]
+
+
+def test_critical_and_disabled_window_bypass():
+    coalescer = MessageCoalescer(30)
+    critical = message(MessageLevel.CRITICAL, "reveal offence")
+    assert coalescer.add(critical, now=100) == [[critical]]
+
+    disabled = MessageCoalescer(0)
+    error = message(MessageLevel.ERROR, "no submit1 transaction")
+    assert disabled.add(error, now=100) == [[error]]
+    assert disabled.flush(now=100, force=True) == []
+
+
+def test_format_digest():
+    a = message(MessageLevel.ERROR, "no submit1 transaction")
+    b = message(MessageLevel.ERROR, "no submit2 transaction")
+
+    assert format_digest([a]) == "ERROR " + a.message
+    assert format_digest([a, b]).splitlines() == [
+        f"ERROR digest (2 messages) network:{ChainId.id_to_name(ChainId.FLARE)} "
+        f"round:1000 identity:{IDENTITY}",
+        f"- {a.message}",
+        f"- {b.message}",
+    ]
@@ -0,0 +1,69 @@
+from hexbytes import HexBytes
+from py_flare_common.fsp.messaging.types import FdcSubmit2, ParsedPayload
+
+from configuration.config import ChainId
+from observer.bitvotes import RoundBitvotes
+from observer.deadlines import submit_2_window
+from observer.observer import validate_fdc
+from observer.reward_epoch_manager import Entity, VotingRound, WTxData
+from observer.types import ProtocolMessageRelayed
+from replay.synthetic import make_config
+
+from .factories import EPOCH, IDENTITY, OTHER, entity
+
+CONFIG = make_config(ChainId.FLARE, IDENTITY)
+ENTITIES = [entity(IDENTITY, 10), entity(OTHER, 20)]
+
+
+def submit_2(round: VotingRound, e: Entity, bit_vector: list[bool]) -> None:
+    epoch = round.voting_epoch
+    payload = ParsedPayload(200, epoch.id, 0, FdcSubmit2(len(bit_vector), bit_vector))
+    tx = WTxData(
+        hash=HexBytes(b""),
+        to_address=None,
+        input=HexBytes(b""),
+        block_number=0,
+        timestamp=submit_2_window(epoch).start,
+        transaction_index=2,
+        from_address=e.submit_address,
+        value=0,
+    )
+    round.fdc.insert_submit_2(e, payload, tx)
+
+
+def voting_round(ours: list[bool], theirs: list[bool], confirmed: bool) -> VotingRound:
+    round = VotingRound(EPOCH.voting_epoch(1000))
+    submit_2(round, ENTITIES[0], ours)
+    submit_2(round, ENTITIES[1], theirs)
+    if confirmed:
+        round.fdc.finalization = ProtocolMessageRelayed(
+            200, 1000, False, "00" * 32, round.voting_epoch.next.end_s
+        )
+    return round
+
+
+def checks(round: VotingRound) -> list[str | None]:
+    bitvotes = RoundBitvotes.from_round(round, ENTITIES)
+    result = validate_fdc(round, ENTITIES[0], CONFIG, bitvotes)
+    return [issue.check for issue in result.issues]
+
+
+def test_bitvote_of_another_length_still_needs_signatures():
+    # the majority voted on 3 requests, a vote on 2 can't be compared to it
+    round = voting_round([True, True], [True, True, True], confirmed=True)
+    assert checks(round) == ["bitvote_length", "reveal_offence"]
+
+
+def test_non_dominating_bitvote_skips_signatures_of_a_confirmed_round():
+    round = voting_round([True, False], [True, True], confirmed=True)
+    assert checks(round) == ["bitvote_not_dominating"]
+
+
+def test_non_dominating_bitvote_of_an_unconfirmed_round_needs_signatures():
+    round = voting_round([True, False], [True, True], confirmed=False)
+    assert checks(round) == ["bitvote_not_dominating", "reveal_offence"]
+
+
+def test_dominating_bitvote_needs_signatures():
+    round = voting_round([True, True], [True, True], confirmed=True)
+    assert checks(round) == ["reveal_offence"]
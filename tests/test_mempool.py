@@ -0,0 +1,86 @@
+from configuration.config import ChainId
+from observer.mempool import MempoolWatcher
+from observer.registry import DispatchTables
+from replay.synthetic import make_config
+
+from .factories import EPOCH, IDENTITY, OTHER, entity
+
+TABLES = DispatchTables.from_config(make_config(ChainId.FLARE, IDENTITY))
+SELECTORS = {f: s for s, f in TABLES.target_function_signatures.items()}
+GWEI = 10**9
+
+
+def watcher():
+    return MempoolWatcher(
+        poll_seconds=1,
+        leads={"submit1": 0, "submit2": 10, "signatures": 10},
+        chain_id=ChainId.FLARE,
+        factory=EPOCH.voting_epoch_factory,
+        target=lambda: (entity(IDENTITY, 10), TABLES),
+        notify=lambda messages: None,
+    )
+
+
+def tx(nonce, function="submit2", sender=IDENTITY, gas_price=30 * GWEI):
+    return {
+        "hash": f"0x{nonce:064x}",
+        "from": sender.lower(),
+        "to": TABLES.submission_address.lower(),
+        "input": "0x" + SELECTORS[function] + "00" * 8,
+        "nonce": hex(nonce),
+        "gasPrice": hex(gas_price),
+    }
+
+
+def pool(pending=(), queued=()):
+    return {
+        "pending": {IDENTITY.lower(): {str(t["nonce"]): t for t in pending}},
+        "queued": {IDENTITY.lower(): {str(t["nonce"]): t for t in queued}},
+    }
+
+
+def inspect(w, content, now, base_fee=25 * GWEI):
+    messages = w.inspect(content, entity(IDENTITY, 10), TABLES, now, base_fee)
+    return [m.message for m in messages]
+
+
+def test_problems_are_reported_once_per_transaction():
+    # past every deadline of the round and the one before it
+    now = EPOCH.voting_epoch(1000).start_s + 60
+    w = watcher()
+    content = pool(pending=[tx(1)], queued=[tx(3, gas_price=20 * GWEI)])
+
+    [queued, underpriced] = inspect(w, content, now)
+    assert "queued at nonce 3" in queued
+    assert "below the base fee" in underpriced
+
+    assert inspect(w, content, now + 29) == []
+    [stuck] = inspect(w, content, now + 30)
+    assert f"{tx(1)['hash']} has been pending for 30s" in stuck
+
+    # a transaction that left the pool is forgotten
+    assert inspect(w, pool(), now + 31) == []
+    assert w.first_seen == {}
+    assert w.reported == set()
+
+
+def test_pending_transaction_is_reported_before_its_deadline():
+    epoch = EPOCH.voting_epoch(1000)
+    # reveals of the previous round are due at the reveal deadline
+    now = epoch.reveal_deadline() - 5
+    w = watcher()
+
+    [deadline] = inspect(w, pool(pending=[tx(1)]), now)
+    assert "not included yet, 5s before the deadline" in deadline
+    # submit1 has no lead configured
+    assert inspect(w, pool(pending=[tx(2, "submit1")]), now) == []
+
+
+def test_other_senders_and_contracts_are_ignored():
+    w = watcher()
+    other = tx(1, sender=OTHER)
+    elsewhere = tx(2) | {"to": OTHER.lower()}
+    content = pool(queued=[elsewhere]) | {"pending": {OTHER.lower(): {"1": other}}}
+
+    assert inspect(w, content, EPOCH.voting_epoch(1000).start_s + 60) == []
+    assert w.first_seen == {}
@@ -0,0 +1,18 @@
+from prometheus_client import Counter, Gauge
+
+from observer.metrics import child
+
+
+def test_only_gauges_are_evicted():
+    gauge = Gauge("test_evicted", "", ["key"], registry=None)
+    counter = Counter("test_kept", "", ["key"], registry=None)
+
+    for key in range(5):
+        child(gauge, key, limit=2).set(key)
+        child(counter, key, limit=2).inc()
+
+    assert [s.labels["key"] for s in next(iter(gauge.collect())).samples] == ["3", "4"]
+    totals = [
+        s for s in next(iter(counter.collect())).samples if s.name == "test_kept_total"
+    ]
+    assert len(totals) == 5
@@ -0,0 +1,56 @@
+import asyncio
+from types import SimpleNamespace
+from typing import cast
+
+from hexbytes import HexBytes
+from web3 import AsyncWeb3
+from web3.types import BlockData
+
+from observer.reorg import Chain, PolicySwap
+from observer.reward_epoch_manager import SigningPolicy
+
+from .factories import IDENTITY, entity, policy
+
+
+def header(number: int, fork: str = "a", since: int = 0) -> BlockData:
+    # blocks from since on are on the given fork
+    parent = fork if number - 1 >= since else "a"
+    block = {
+        "number": number,
+        "hash": HexBytes(f"{fork}{number}".encode()),
+        "parentHash": HexBytes(f"{parent}{number - 1}".encode()),
+    }
+    return cast(BlockData, block)
+
+
+def test_undone_policy_swap_is_returned():
+    previous = policy(300, 1000, [entity(IDENTITY, 10)])
+    builder = SigningPolicy.builder()
+    swap = PolicySwap(policy(301, 1100, [entity(IDENTITY, 20)]), previous, builder)
+
+    chain = Chain()
+    for number in range(1, 5):
+        undo = chain.push(header(number))
+        if number == 3:
+            undo.policy_swap = swap
+
+    def node(since: int) -> AsyncWeb3:
+        async def get_block(number):
+            return header(number, "b", since)
+
+        return cast(
+            AsyncWeb3, SimpleNamespace(eth=SimpleNamespace(get_block=get_block))
+        )
+
+    # blocks 3 and 4 are replaced by another fork
+    number, undone = asyncio.run(chain.rollback(node(3), header(5, "b", 3)))
+    assert number == 3
+    assert undone is swap
+    assert [b.number for b in chain.blocks] == [1, 2]
+
+    # a reorg after the swap leaves it in place
+    chain.push(header(3)).policy_swap = swap
+    chain.push(header(4))
+    number, undone = asyncio.run(chain.rollback(node(4), header(5, "b", 4)))
+    assert number == 4
+    assert undone is None
@@ -0,0 +1,41 @@
+from observer.observer import drop_finished_policies, round_record
+from observer.reward_epoch_manager import VotingRound
+
+from .factories import EPOCH, IDENTITY, OTHER, entity, policy
+
+
+def test_last_round_uses_the_policy_it_ran_in():
+    # the identity is not registered in the next reward epoch
+    current = policy(300, 1000, [entity(IDENTITY, 10), entity(OTHER, 20)])
+    following = policy(301, 1100, [entity(OTHER, 30)])
+    policies = [current, following]
+
+    last = VotingRound(EPOCH.voting_epoch(1099))
+    found = round_record(last, policies, IDENTITY)
+    assert found is not None
+    reward_epoch_id, record = found
+    assert reward_epoch_id == 300
+    assert record.entity.normalized_weight == 10
+    assert record.entities == current.entities
+
+    assert (
+        round_record(VotingRound(EPOCH.voting_epoch(1100)), policies, IDENTITY) is None
+    )
+    assert (
+        round_record(VotingRound(EPOCH.voting_epoch(999)), policies, IDENTITY) is None
+    )
+
+
+def test_policy_is_kept_until_its_last_round_completed():
+    current = policy(300, 1000, [entity(IDENTITY, 10)])
+    following = policy(301, 1100, [entity(IDENTITY, 20)])
+    policies = [current, following]
+
+    drop_finished_policies(policies, 1098)
+    assert policies == [current, following]
+
+    drop_finished_policies(policies, 1099)
+    assert policies == [following]
+
+    drop_finished_policies(policies, 1200)
+    assert policies == [following]
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import socket
+from typing import cast
+
+from web3.types import BlockData
+
+from observer.history import RoundResult
+from observer.message import Message, MessageLevel
+from observer.reward_epoch_manager import VotingRoundManager
+from observer.status import Status, start_status_server
+
+from .factories import EPOCH, IDENTITY, entity, policy
+
+
+def result(voting_round_id, issues=()):
+    return RoundResult(
+        identity_address=IDENTITY,
+        protocol=100,
+        voting_round_id=voting_round_id,
+        submit_1_timestamp=None,
+        submit_2_timestamp=None,
+        submit_signatures_timestamp=None,
+        none_indices=[],
+        signature_valid=None,
+        reveal_offence=False,
+        issues=list(issues),
+    )
+
+
+async def get(port, path, method="GET", headers=""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: x\r\n{headers}\r\n".encode())
+    response = await reader.read()
+    writer.close()
+
+    head, _, body = response.partition(b"\r\n\r\n")
+    status_line, *lines = head.decode().split("\r\n")
+    fields = {k.lower(): v for k, _, v in (line.partition(": ") for line in lines)}
+    return int(status_line.split(" ")[1]), fields, body
+
+
+def test_results_are_served_with_etags():
+    status = Status(IDENTITY, 14)
+    issue = Message(MessageLevel.ERROR, "no submit1 transaction", check="missing")
+    status.add_results([result(1000), result(1001, [issue])])
+
+    async def run():
+        server = await start_status_server(status, 0)
+        # every interface gets its own free port
+        [port] = [
+            s.getsockname()[1] for s in server.sockets if s.family == socket.AF_INET
+        ]
+        try:
+            code, fields, body = await get(port, "/results")
+            assert code == 200
+            assert fields["cache-control"] == "max-age=1"
+            document = json.loads(body)
+            assert [r["voting_round_id"] for r in document[IDENTITY]] == [1001, 1000]
+            assert document[IDENTITY][0]["issues"] == [
+                {"level": "ERROR", "check": "missing", "message": issue.message}
+            ]
+
+            etag = fields["etag"]
+            code, fields, body = await get(
+                port, "/results", headers=f"If-None-Match: {etag}\r\n"
+            )
+            assert (code, fields["etag"], body) == (304, etag, b"")
+
+            status.add_results([result(1002)])
+            code, fields, _ = await get(
+                port, "/results", headers=f"If-None-Match: {etag}\r\n"
+            )
+            assert code == 200
+            assert fields["etag"] != etag
+
+            assert (await get(port, "/missing"))[0] == 404
+            assert (await get(port, "/status", method="POST"))[0] == 405
+        finally:
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_documents_are_rendered_once_per_update():
+    status = Status(IDENTITY, 14)
+    first = status.render("/status")
+    assert first is not None
+    again = status.render("/status")
+    assert again is not None and again[0] is first[0]
+
+    status.add_results([result(1000)])
+    updated = status.render("/status")
+    assert updated is not None and updated[0] is not first[0]
+    assert status.render("/unknown") is None
+
+
+def test_etag_changes_with_the_round_and_results_only():
+    status = Status(IDENTITY, 14)
+    vrm = VotingRoundManager(1000, EPOCH.voting_epoch_factory)
+    sp = policy(300, 1000, [entity(IDENTITY, 10)])
+    start = EPOCH.voting_epoch(1001).start_s
+
+    status.update_block(1, start, 0, sp, vrm)
+    etag = status.etag()
+    status.update_block(2, start + 2, 0, sp, vrm)
+    assert status.etag() == etag
+
+    # the next voting round is reported
+    vrm.finalize(cast(BlockData, {"timestamp": EPOCH.voting_epoch(1002).start_s}))
+    assert status.etag() != etag
+
+    etag = status.etag()
+    status.add_results([result(1000)])
+    assert status.etag() != etag
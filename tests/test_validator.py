@@ -0,0 +1,55 @@
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from configuration.config import ChainId
+from observer.reward_epoch_manager import VotingRound
+from observer.validator import RoundRecord, Validator, ValidatorProcess
+from replay.synthetic import make_config
+
+from .factories import EPOCH, IDENTITY, entity
+
+CONFIG = make_config(ChainId.FLARE, IDENTITY)
+
+
+def record(voting_round_id: int) -> RoundRecord:
+    e = entity(IDENTITY, 10)
+    return RoundRecord(VotingRound(EPOCH.voting_epoch(voting_round_id)), e, [e])
+
+
+def test_worker_that_died_is_replaced():
+    async def run() -> None:
+        # port 0 serves the worker's metrics on any free port
+        validator = ValidatorProcess.start(CONFIG, 0)
+        try:
+            expected = Validator(CONFIG).validate(record(1000))
+            assert await validator.submit(record(1000)) == expected
+
+            first = validator.pool
+            for process in list(first._processes.values()):
+                process.kill()
+                process.join()
+
+            with pytest.raises(BrokenProcessPool):
+                await validator.submit(record(1000))
+            assert validator.pool is not first
+            assert validator.recover(record(1000)) == expected
+
+            assert await validator.submit(record(1000)) == expected
+        finally:
+            validator.pool.shutdown()
+
+    asyncio.run(run())
+
+
+def test_failed_validation_is_not_raised_on_submit():
+    async def run() -> None:
+        validator = Validator(CONFIG)
+        # no entities to take feed medians of
+        broken = RoundRecord(record(1000).round, entity(IDENTITY, 10), [])
+        future = validator.submit(broken)
+        assert future.exception() is not None
+        assert validator.recover(broken) == []
+
+    asyncio.run(run())
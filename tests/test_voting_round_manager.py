@@ -0,0 +1,75 @@
+from typing import cast
+
+from web3.types import BlockData
+
+from observer.deadlines import earliest_deadlines
+from observer.reward_epoch_manager import VotingRoundManager
+
+from .factories import EPOCH
+
+
+def manager(finalized=1000, **kwargs):
+    return VotingRoundManager(finalized, EPOCH.voting_epoch_factory, **kwargs)
+
+
+def block(timestamp: int) -> BlockData:
+    return cast(BlockData, {"timestamp": timestamp})
+
+
+def test_finalized_and_far_ahead_rounds_are_not_stored():
+    vrm = manager(max_ahead=3)
+
+    assert vrm.get(EPOCH.voting_epoch(1000)) is not vrm.get(EPOCH.voting_epoch(1000))
+    assert vrm.get(EPOCH.voting_epoch(1004)) is vrm.get(EPOCH.voting_epoch(1004))
+    vrm.get(EPOCH.voting_epoch(1005))
+    assert list(vrm.rounds) == [EPOCH.voting_epoch(1004)]
+
+
+def test_furthest_round_is_evicted_when_full():
+    vrm = manager(max_ahead=10, max_rounds=2)
+    vrm.get(EPOCH.voting_epoch(1003))
+    vrm.get(EPOCH.voting_epoch(1002))
+
+    # further ahead than every held round, rejected
+    vrm.get(EPOCH.voting_epoch(1004))
+    assert sorted(r.id for r in vrm.rounds) == [1002, 1003]
+
+    # closer than the furthest held round, which is evicted
+    vrm.get(EPOCH.voting_epoch(1001))
+    assert sorted(r.id for r in vrm.rounds) == [1001, 1002]
+
+
+def test_rounds_complete_in_order_after_the_next_epoch():
+    vrm = manager()
+    later = vrm.get(EPOCH.voting_epoch(1002))
+    earlier = vrm.get(EPOCH.voting_epoch(1001))
+
+    end = EPOCH.voting_epoch(1001).next.end_s
+    assert vrm.finalize(block(end)) == []
+    assert vrm.finalize(block(end + 1)) == [earlier]
+    assert vrm.finalized == 1001
+
+    last = EPOCH.voting_epoch(1002).next.end_s + 1
+    assert vrm.finalize(block(last)) == [later]
+    assert vrm.rounds == {}
+    # evicted and rejected rounds never complete
+    assert vrm.finalize(block(last + 1000)) == []
+
+
+def test_phases_are_due_once_their_deadline_passed():
+    vrm = manager()
+    round = vrm.get(EPOCH.voting_epoch(1001))
+    deadlines = earliest_deadlines(round.voting_epoch)
+
+    submit_1 = deadlines["submit1"]
+    assert vrm.due_phases(submit_1) == []
+    assert vrm.due_phases(submit_1 + 1) == [(round, 100, "submit1")]
+    assert vrm.due_phases(submit_1 + 1) == []
+
+    # a deferred phase is due again once its later deadline passed
+    signatures = deadlines["signatures"]
+    due = vrm.due_phases(signatures + 1)
+    assert (round, 200, "signatures") in due
+    vrm.defer_phase(round, 200, "signatures", signatures + 10)
+    assert vrm.due_phases(signatures + 10) == []
+    assert vrm.due_phases(signatures + 11) == [(round, 200, "signatures")]